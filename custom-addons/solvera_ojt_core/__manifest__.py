@@ -9,7 +9,7 @@
     'author': "Solvera Indonesia (Developed with AI Assistant)",
     'website': "https://www.solvera.id",
     'category': 'Human Resources/Recruitment',
-    'version': '18.0.2.1.0',
+    'version': '18.0.2.3.0',
     'depends': [
         'base',
         'hr',
@@ -27,6 +27,8 @@
         'security/ir.model.access.csv',
         'data/hr_recruitment_stage_data.xml',
         'data/ir_sequence.xml',
+        'data/ir_cron.xml',
+        'data/ojt_scoring_policy_data.xml',
         'data/mail_templates/assignment_mail_templates.xml',
         'data/mail_templates/batch_mail_templates.xml',
         'data/mail_templates/certificate_mail_templates.xml',
@@ -40,8 +42,12 @@
         'views/ojt_assignment_views.xml',
         'views/ojt_submission_views.xml',
         'views/ojt_certificate_views.xml',
+        'views/ojt_certificate_job_views.xml',
+        'views/ojt_certificate_key_views.xml',
         'views/hr_applicant_views.xml',
         'views/ojt_reporting_views.xml',
+        'views/ojt_notification_queue_views.xml',
+        'views/ojt_scoring_policy_views.xml',
         'views/menu.xml',
         'wizard/hr_applicant_enroll_views.xml',
         'wizard/generate_certificates_wizard_views.xml',
@@ -52,6 +58,7 @@
         'views/portal_templates/assignment_detail_template.xml',
         'views/portal_templates/batch_selection_template.xml',
         'views/portal_templates/dashboard_template.xml',
+        'views/portal_templates/list_templates.xml',
         'views/portal_templates/misc_template.xml',
         'views/website_templates.xml',
     ],
@@ -4,4 +4,9 @@ from . import ojt_attendance_controller
 from . import ojt_batch_controller
 from . import ojt_certificate_controller
 from . import ojt_event_link_controller
-from . import website_hr_recruitment
\ No newline at end of file
+from . import website_hr_recruitment
+from . import ojt_qr_controller
+from . import ojt_revocation_controller
+from . import ojt_api_controller
+from . import ojt_calendar_controller
+from . import ojt_portal_controller
\ No newline at end of file
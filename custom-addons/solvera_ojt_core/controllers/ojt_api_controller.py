@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+from odoo.addons.solvera_ojt_core.models.ojt_portal_api import DEFAULT_API_LIMIT, PORTAL_API_RESOURCES
+
+
+class OjtApiController(http.Controller):
+
+    @http.route(['/ojt/api/v1/<string:resource>'], type='http', auth="user", methods=['GET'], readonly=True)
+    def ojt_api_list(self, resource, fields=None, cursor=None, limit=None, updated_since=None, **kw):
+        """Data portal peserta dalam JSON, untuk aplikasi mobile.
+
+        Resource: ``batches``, ``agenda``, ``assignments``, ``submissions``, ``attendance``,
+        ``certificates``. Parameter: ``fields`` (dipisah koma), ``limit``, ``cursor``
+        (``next_cursor`` halaman sebelumnya) dan ``updated_since`` (``server_time`` sinkron
+        sebelumnya, UTC).
+        """
+        if resource not in PORTAL_API_RESOURCES:
+            return request.make_json_response(
+                {'error': 'unknown_resource', 'resources': sorted(PORTAL_API_RESOURCES)}, status=404)
+        field_names = [fname.strip() for fname in fields.split(',') if fname.strip()] if fields else None
+        try:
+            result = request.env['ojt.portal.api']._fetch(
+                request.env.user.partner_id.id, resource, field_names=field_names, cursor=cursor,
+                limit=int(limit or DEFAULT_API_LIMIT), updated_since=updated_since)
+        except ValueError as e:
+            return request.make_json_response({'error': 'invalid_request', 'message': str(e)}, status=400)
+        return request.make_json_response(result, headers=[('Cache-Control', 'private, no-cache')])
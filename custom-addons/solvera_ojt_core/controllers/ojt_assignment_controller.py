@@ -4,12 +4,20 @@ import base64
 from odoo import http
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.controllers.ojt_portal_mixin import OjtPortalCacheMixin
 
-class OjtAssignmentController(CustomerPortal):
+class OjtAssignmentController(OjtPortalCacheMixin, CustomerPortal):
 
     @http.route(['/my/assignment/<int:assignment_id>'], 
                 type='http', auth="user", website=True)
     def portal_my_assignment_detail(self, assignment_id, **kw):
+        versions = self._ojt_portal_versions('ojt.assignment', assignment_id)
+        etag = self._ojt_portal_etag(f'assignment/{assignment_id}', [
+            (pid, version) for pid, (_batch_id, version) in versions.items()])
+        not_modified = versions and self._ojt_portal_not_modified(etag)
+        if not_modified:
+            return not_modified
+
         assignment = request.env['ojt.assignment'].browse(assignment_id)
         
         if not assignment.exists():
@@ -45,7 +53,7 @@ class OjtAssignmentController(CustomerPortal):
             'attachment_data': attachment_data,
             'page_name': 'assignment_detail',
         }
-        return request.render("solvera_ojt_core.portal_assignment_detail", values)
+        return self._ojt_portal_render(etag, "solvera_ojt_core.portal_assignment_detail", values)
     
     @http.route(['/my/assignment/submit'], 
                 type='http', auth="user", methods=['POST'], website=True)
@@ -1,63 +1,96 @@
 # -*- coding: utf-8 -*-
 from odoo import http, fields
+from odoo.exceptions import AccessError, UserError
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.models.ojt_attendance import MAX_BULK_SCANS
 from werkzeug.wrappers import Response
 from datetime import timedelta
+import math
+import time
 import pytz
 
 class OjtAttendanceController(CustomerPortal):
 
-    @http.route(['/ojt/attend/<string:access_token>'], type='http', auth="user", website=True)
-    def ojt_qr_checkin(self, access_token, **kw):
-        template = "solvera_ojt_core.portal_template_qr_feedback"
+    @http.route(['/ojt/attend/projector/<int:event_link_id>'], type='http', auth="user")
+    def ojt_qr_projector(self, event_link_id, **kw):
+        """Halaman proyektor untuk QR bertanda tangan; dimuat ulang tepat saat window berganti."""
+        user = request.env.user
+        if not (user.has_group('solvera_ojt_core.ojt_group_mentor')
+                or user.has_group('solvera_ojt_core.ojt_group_coordinator')):
+            raise AccessError("Hanya mentor atau koordinator yang dapat menampilkan QR check-in.")
+        event_link = request.env['ojt.event.link'].sudo().browse(event_link_id).exists()
+        if not event_link:
+            return request.not_found()
+        now = time.time()
+        interval = event_link.qr_rotation_interval
+        response = request.render("solvera_ojt_core.ojt_checkin_projector", {
+            'event_link': event_link,
+            'qr_code_image': event_link.qr_code_image,
+            'refresh_seconds': max(1, math.ceil(interval - now % interval)),
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
 
-        event_link = request.env['ojt.event.link'].sudo().search([
-            ('access_token', '=', access_token)
-        ], limit=1)
+    @http.route(['/ojt/attend/<string:access_token>'], type='http', auth="user")
+    def ojt_qr_checkin(self, access_token, **kw):
+        """Jalur cepat check-in QR: target dan keanggotaan dari cache worker,
+        satu INSERT idempoten, dan halaman hasil tanpa layout website."""
+        template = "solvera_ojt_core.ojt_checkin_feedback"
         user_partner = request.env.user.partner_id
 
-        if not event_link.exists():
-            return request.render(template, {
-                'feedback': 'Error: Sesi tidak ditemukan.'
-            })
-        
-        participant = request.env['ojt.participant'].sudo().search([
-            ('partner_id', '=', user_partner.id),
-            ('batch_id', '=', event_link.batch_id.id),
-            ('state', '=', 'active')
-        ], limit=1)
-
-        if not participant:
+        target = request.env['ojt.event.link'].sudo()._resolve_checkin_token(access_token)
+        if not target:
             return request.render(template, {
-                'feedback': 'Maaf, Anda tidak terdaftar sebagai peserta di sesi ini.'
+                'feedback': 'Error: Sesi tidak ditemukan.',
+                'status': 'danger',
             })
+        event_link_id, batch_id, event_id = target
 
-        existing_attendance = request.env['ojt.attendance'].sudo().search([
-            ('participant_id', '=', participant.id),
-            ('event_link_id', '=', event_link.id)
-        ])
-
-        if existing_attendance:
+        participant_id = request.env['ojt.participant'].sudo()._get_active_participant_id(user_partner.id, batch_id)
+        if not participant_id:
             return request.render(template, {
-                'feedback': f'Terima kasih {user_partner.name}, Anda sudah tercatat hadir pada sesi ini.'
+                'feedback': 'Maaf, Anda tidak terdaftar sebagai peserta di sesi ini.',
+                'status': 'warning',
             })
 
-        request.env['ojt.attendance'].sudo().create({
-            'participant_id': participant.id,
-            'event_link_id': event_link.id,
-            'batch_id': event_link.batch_id.id,
-            'event_id': event_link.event_id.id,
-            'check_in': fields.Datetime.now(),
+        result = request.env['ojt.attendance'].sudo()._upsert_attendance([{
+            'participant_id': participant_id,
+            'event_link_id': event_link_id,
             'presence': 'present',
             'method': 'qr',
-        })
+        }])
+        created = result[(participant_id, event_link_id)][1]
+        if not created:
+            return request.render(template, {
+                'feedback': f'Terima kasih {user_partner.name}, Anda sudah tercatat hadir pada sesi ini.',
+                'status': 'info',
+            })
 
-        feedback_message = f'Absensi berhasil! Selamat datang, {user_partner.name}.'
         return request.render(template, {
-            'feedback': feedback_message
+            'feedback': f'Absensi berhasil! Selamat datang, {user_partner.name}.',
+            'status': 'success',
         })
     
+    @http.route(['/ojt/attend/bulk'], type='json', auth="user", methods=['POST'])
+    def ojt_bulk_checkin(self, scans=None, **kw):
+        """Unggah massal hasil scan kiosk offline.
+
+        Body JSON-RPC: ``{"params": {"scans": [{"access_token", "participant_id" | "partner_id",
+        "scanned_at"}, ...]}}``. Hanya untuk mentor dan koordinator; mengembalikan satu hasil
+        per scan (``created``, ``existing`` atau ``error`` beserta alasannya).
+        """
+        user = request.env.user
+        if not (user.has_group('solvera_ojt_core.ojt_group_mentor')
+                or user.has_group('solvera_ojt_core.ojt_group_coordinator')):
+            raise AccessError("Hanya mentor atau koordinator yang dapat mengunggah absensi kiosk.")
+        if not isinstance(scans, list):
+            raise UserError("Parameter 'scans' harus berupa list.")
+        attendance = request.env['ojt.attendance'].sudo()
+        if len(scans) > MAX_BULK_SCANS:
+            raise UserError(f"Maksimal {MAX_BULK_SCANS} scan per permintaan.")
+        return {'results': attendance._ingest_scans(scans)}
+
     @http.route(['/my/agenda/join/<int:event_link_id>'], type='http', auth="user", website=True)
     def portal_join_meeting_and_log(self, event_link_id, **kw):
         event_link = request.env['ojt.event.link'].sudo().browse(event_link_id)
@@ -89,37 +122,21 @@ class OjtAttendanceController(CustomerPortal):
             })
 
         user_partner = request.env.user.partner_id
-        participant = request.env['ojt.participant'].sudo().search([
-            ('partner_id', '=', user_partner.id),
-            ('batch_id', '=', event_link.batch_id.id),
-            ('state', '=', 'active')
-        ], limit=1)
+        participant_id = request.env['ojt.participant'].sudo()._get_active_participant_id(
+            user_partner.id, event_link.batch_id.id)
 
-        if not participant:
+        if not participant_id:
             return request.redirect(meeting_url)
 
-        existing_attendance = request.env['ojt.attendance'].sudo().search([
-            ('participant_id', '=', participant.id),
-            ('event_link_id', '=', event_link.id)
-        ], limit=1)
-
-        obj_attendance = {
-            'participant_id': participant.id,
+        attendance = request.env['ojt.attendance'].sudo()
+        # absensi yang sudah ada (mis. bergabung ulang) tidak diubah
+        attendance._upsert_attendance([{
+            'participant_id': participant_id,
             'event_link_id': event_link.id,
-            'batch_id': event_link.batch_id.id,
-            'event_id': event_link.event_id.id,
             'check_in': current_time,
-            'presence': 'present',
+            'presence': attendance._get_presence_at(event_start_time, current_time),
             'method': 'online',
-        }
-
-        if not existing_attendance:
-            late_threshold_time = event_start_time + timedelta(minutes=10)
-            
-            if current_time > late_threshold_time:
-                obj_attendance['presence'] = 'late'
-
-            request.env['ojt.attendance'].sudo().create(obj_attendance)
+        }])
 
         cleaned_url = meeting_url.strip() 
 
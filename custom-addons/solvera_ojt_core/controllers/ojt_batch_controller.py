@@ -1,12 +1,28 @@
 # -*- coding: utf-8 -*-
-from odoo import http
+from odoo import http, fields
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.controllers.ojt_portal_mixin import OjtPortalCacheMixin
 
-class OjtBatchController(CustomerPortal):
+# Jumlah tugas/agenda di dashboard; daftar lengkap ada di /my/assignments dan /my/agenda
+DASHBOARD_LIST_LIMIT = 5
+
+class OjtBatchController(OjtPortalCacheMixin, CustomerPortal):
 
     @http.route(['/my/dashboard'], type='http', auth="user", website=True)
     def portal_my_dashboard(self, participant_id=None, **kw):
+        versions = self._ojt_portal_versions()
+        if participant_id and str(participant_id).isdigit() and int(participant_id) in versions:
+            shown = [(int(participant_id), versions[int(participant_id)][1])]
+        else:
+            shown = [(pid, version) for pid, (_batch_id, version) in versions.items()]
+        # agenda terdekat bergantung pada tanggal, jadi ETag juga berganti setiap hari
+        today = fields.Date.today()
+        etag = self._ojt_portal_etag(f'dashboard:{today}', shown)
+        not_modified = versions and self._ojt_portal_not_modified(etag)
+        if not_modified:
+            return not_modified
+
         user_partner = request.env.user.partner_id
         
         participants = request.env['ojt.participant'].search([
@@ -22,7 +38,7 @@ class OjtBatchController(CustomerPortal):
         elif len(participants) == 1:
             participant_to_show = participants
         else:
-            return request.render("solvera_ojt_core.portal_participant_batch_selection", {
+            return self._ojt_portal_render(etag, "solvera_ojt_core.portal_participant_batch_selection", {
                 'participants': participants,
                 'page_name': 'batch_selection'
             })
@@ -30,54 +46,35 @@ class OjtBatchController(CustomerPortal):
         if not participant_to_show:
             return request.redirect('/my/dashboard')
 
-        assignment_submitted = request.env['ojt.assignment.submit'].search_count([
-            ('participant_id', '=', participant_to_show.id)
-        ])
-        assignment_total = request.env['ojt.assignment'].search_count([
+        # satu baris snapshot; hanya beberapa tugas (yang belum dikumpulkan lebih dulu) di-browse
+        dashboard = request.env['ojt.participant.dashboard']._get_snapshot(participant_to_show)
+        assignment_ids = dashboard.assignment_ids or []
+        submitted_ids = set(dashboard.submitted_assignment_ids or [])
+        shown_assignment_ids = sorted(assignment_ids, key=lambda assignment_id: assignment_id in submitted_ids)
+        agenda_items = request.env['ojt.event.link'].search([
             ('batch_id', '=', participant_to_show.batch_id.id),
-            ('state', '!=', 'draft')
-        ])
+            ('date_end', '>=', fields.Datetime.to_datetime(today)),
+        ], order='date_start, id', limit=DASHBOARD_LIST_LIMIT)
         progress_data = {
-            'assignment_completed_count': assignment_submitted,
-            'assignment_total_count': assignment_total,
+            'assignment_completed_count': dashboard.assignment_completed_count,
+            'assignment_total_count': dashboard.assignment_total_count,
         }
 
-        all_assignments = request.env['ojt.assignment'].search([
-            ('batch_id', '=', participant_to_show.batch_id.id),
-            ('state', '!=', 'draft')
-        ])
-        
-        agenda_items = participant_to_show.batch_id.event_link_ids.sorted(key=lambda r: r.event_id.date_begin)
-
-        surveys_to_check = participant_to_show.batch_id.sudo().survey_id
-
-        survey_data = []
-        if surveys_to_check:
-            user_inputs = request.env['survey.user_input'].sudo().search([
-                ('partner_id', '=', user_partner.id),
-                ('survey_id', 'in', surveys_to_check.ids),
-                ('state', '=', 'done')
-            ])
-            completed_survey_ids = user_inputs.mapped('survey_id').ids
-
-            for survey in surveys_to_check:
-                survey_data.append({
-                    'survey': survey,
-                    'is_done': survey.id in completed_survey_ids,
-                })
-
-        certificate_data = request.env['ojt.certificate'].sudo().search([
-            ('participant_id', '=', participant_to_show.id),
-            ('state', '=', 'issued')
-        ], limit=1)
+        calendar_url = participant_to_show.sudo().calendar_url
+        survey = participant_to_show.batch_id.sudo().survey_id
+        survey_data = [{'survey': survey, 'is_done': dashboard.survey_done}] if survey else []
 
         values = {
             'participant': participant_to_show,
             'progress_data': progress_data,
-            'assignments': all_assignments,
+            'assignments': request.env['ojt.assignment'].browse(shown_assignment_ids[:DASHBOARD_LIST_LIMIT]),
+            'submitted_assignment_ids': submitted_ids,
+            'assignment_more': len(assignment_ids) > DASHBOARD_LIST_LIMIT,
             'agenda_items': agenda_items,
+            'agenda_count': len(dashboard.agenda_ids or []),
             'survey_data': survey_data,
-            'certificate_data': certificate_data,
+            'calendar_subscribe_url': calendar_url and 'webcal://' + calendar_url.split('://', 1)[-1],
+            'certificate_data': dashboard.certificate_id,
             'page_name': 'dashboard',
         }
-        return request.render("solvera_ojt_core.portal_participant_dashboard", values)
\ No newline at end of file
+        return self._ojt_portal_render(etag, "solvera_ojt_core.portal_participant_dashboard", values)
\ No newline at end of file
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from urllib.parse import urlparse
+
+from werkzeug.http import http_date
+
+from odoo import http
+from odoo.http import request
+
+# Baris iCalendar maksimal 75 oktet sebelum dilipat (RFC 5545 3.1)
+ICS_LINE_LIMIT = 75
+
+
+def ics_escape(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,') \
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def ics_datetime(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_line(name, value):
+    """Satu content line berakhiran CRLF, dilipat per 75 oktet tanpa memotong karakter UTF-8."""
+    line = f'{name}:{value}'
+    if len(line.encode()) <= ICS_LINE_LIMIT:
+        return line.encode() + b'\r\n'
+    parts, current, size = [], [], 0
+    for char in line:
+        char_size = len(char.encode())
+        # baris lanjutan diawali spasi, sehingga muat satu oktet lebih sedikit
+        if size + char_size > ICS_LINE_LIMIT - (1 if parts else 0):
+            parts.append(''.join(current))
+            current, size = [], 0
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n '.join(parts).encode() + b'\r\n'
+
+
+def iter_calendar(name, events, base_url):
+    """Feed iCalendar sebagai potongan ``bytes``: header, satu potongan per sesi, lalu penutup."""
+    host = urlparse(base_url).hostname or 'localhost'
+    yield b''.join([
+        ics_line('BEGIN', 'VCALENDAR'),
+        ics_line('VERSION', '2.0'),
+        ics_line('PRODID', '-//Solvera//OJT Agenda//ID'),
+        ics_line('CALSCALE', 'GREGORIAN'),
+        ics_line('METHOD', 'PUBLISH'),
+        ics_line('X-WR-CALNAME', ics_escape(name)),
+        ics_line('X-PUBLISHED-TTL', 'PT15M'),
+        ics_line('REFRESH-INTERVAL;VALUE=DURATION', 'PT15M'),
+    ])
+    for event in events:
+        if not event['date_start']:
+            continue
+        lines = [
+            ics_line('BEGIN', 'VEVENT'),
+            ics_line('UID', f"ojt-session-{event['id']}@{host}"),
+            ics_line('DTSTAMP', ics_datetime(event['write_date'])),
+            ics_line('LAST-MODIFIED', ics_datetime(event['write_date'])),
+            ics_line('DTSTART', ics_datetime(event['date_start'])),
+        ]
+        if event['date_end']:
+            lines.append(ics_line('DTEND', ics_datetime(event['date_end'])))
+        lines.append(ics_line('SUMMARY', ics_escape(event['name'])))
+        if event['location']:
+            lines.append(ics_line('LOCATION', ics_escape(event['location'])))
+        if event['description']:
+            lines.append(ics_line('DESCRIPTION', ics_escape(event['description'])))
+        lines += [
+            ics_line('URL', f"{base_url}/my/agenda/{event['id']}"),
+            ics_line('END', 'VEVENT'),
+        ]
+        yield b''.join(lines)
+    yield ics_line('END', 'VCALENDAR')
+
+
+class CalendarFeedCache:
+    """Cache LRU feed yang sudah jadi, per (database, batch, versi), di memori worker."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is not None:
+                self._feeds.move_to_end(key)
+            return feed
+
+    def set(self, key, feed):
+        with self._lock:
+            self._feeds[key] = feed
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self.max_entries:
+                self._feeds.popitem(last=False)
+
+
+calendar_cache = CalendarFeedCache()
+
+
+class OjtCalendarController(http.Controller):
+
+    def _stream_and_cache(self, key, chunks):
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        calendar_cache.set(key, b''.join(parts))
+
+    @http.route(['/ojt/calendar/<string:token>.ics'], type='http', auth="public", methods=['GET'], readonly=True)
+    def ojt_calendar_feed(self, token, **kw):
+        """Feed agenda batch peserta yang dapat dilanggan aplikasi kalender.
+
+        Revalidasi (``If-None-Match``/``If-Modified-Since``) cukup satu query. Feed untuk
+        versi batch yang sama disimpan di cache worker; jika belum ada, data sesi dibaca
+        sekali lalu feed ditulis bertahap per sesi.
+        """
+        target = request.env['ojt.participant'].sudo()._get_calendar_target(token)
+        if not target:
+            return request.not_found()
+        batch_id, version, last_modified = target
+        base_url = request.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        key = (request.env.cr.dbname, batch_id, version, base_url)
+        etag = '"%s"' % hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        headers = [
+            ('ETag', etag),
+            ('Last-Modified', http_date(last_modified.replace(tzinfo=timezone.utc))),
+            ('Cache-Control', 'private, no-cache'),
+        ]
+
+        httprequest = request.httprequest
+        if_none_match = httprequest.headers.get('If-None-Match')
+        if if_none_match == etag or (not if_none_match and httprequest.if_modified_since
+                                     and httprequest.if_modified_since >= last_modified.replace(tzinfo=timezone.utc)):
+            return request.make_response(b'', headers=headers, status=304)
+
+        headers += [
+            ('Content-Type', 'text/calendar; charset=utf-8'),
+            ('Content-Disposition', 'inline; filename="ojt-agenda.ics"'),
+        ]
+        feed = calendar_cache.get(key)
+        if feed is not None:
+            return request.make_response(feed, headers=headers)
+
+        batch = request.env['ojt.batch'].sudo().browse(batch_id)
+        chunks = iter_calendar(batch.name, batch._get_calendar_events(), base_url)
+        return request.make_response(self._stream_and_cache(key, chunks), headers=headers)
@@ -1,49 +1,89 @@
 from odoo import http
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.controllers.ojt_rate_limit import verification_limiter
+
+DEFAULT_VERIFY_RATE_PER_MINUTE = 30
+DEFAULT_VERIFY_RATE_BURST = 20
+MAX_BULK_VERIFY = 100
 
 class OjtCertificateController(CustomerPortal):
 
     @http.route(['/my/certificate/download/<int:certificate_id>'], 
                 type='http', auth="user", website=True)
     def portal_my_certificate_download(self, certificate_id, **kw):
-        certificate = request.env['ojt.certificate'].sudo().browse(certificate_id)
-        
+        """Unduh PDF sertifikat dari attachment; dirender sekali, lalu dilayani dengan
+        ETag/Last-Modified sehingga unduhan ulang cukup dijawab 304."""
+        certificate = request.env['ojt.certificate'].sudo().browse(certificate_id).exists()
         is_owner = certificate.participant_id.partner_id == request.env.user.partner_id
 
-        if not certificate.exists() or not is_owner or certificate.state != 'issued':
+        if not certificate or not is_owner or certificate.state != 'issued':
             return request.redirect('/my/certificates')
-            
-        report_action = request.env['ir.actions.report'].sudo().search([
-            ('report_name', '=', 'solvera_ojt_core.report_ojt_certificate_document')
-        ], limit=1)
-
-        if not report_action:
-            return request.render('http_routing.http_error', {
-                'status_code': 500, 
-                'status_message': 'Certificate report action not found.'
-            })
-
-        pdf = report_action._render_qweb_pdf(report_action.report_name, res_ids=[certificate.id])[0]
-
-        pdf_http_headers = [
-            ('Content-Type', 'application/pdf'),
-            ('Content-Length', len(pdf)),
-            ('Content-Disposition', f'attachment; filename="Certificate-{certificate.name}.pdf"')
-        ]
-        return request.make_response(pdf, headers=pdf_http_headers)
+
+        stream = request.env['ir.binary']._get_stream_from(certificate._get_pdf_attachment())
+        stream.download_name = f'Certificate-{certificate.name}.pdf'
+        return stream.get_response(as_attachment=True)
     
+    def _check_verify_rate_limit(self, cost=1):
+        """Response 429 jika IP pemanggil melebihi batas verifikasi, atau ``None``."""
+        get_param = request.env['ir.config_parameter'].sudo().get_param
+        retry_after = verification_limiter.consume(
+            request.httprequest.remote_addr,
+            int(get_param('solvera_ojt_core.verify_rate_per_minute', DEFAULT_VERIFY_RATE_PER_MINUTE)),
+            int(get_param('solvera_ojt_core.verify_rate_burst', DEFAULT_VERIFY_RATE_BURST)),
+            cost,
+        )
+        if not retry_after:
+            return None
+        return request.make_json_response(
+            {'error': 'rate_limited', 'retry_after': retry_after},
+            headers=[('Retry-After', str(retry_after))], status=429)
+
     @http.route(['/ojt/cert/verify'], type='http', auth="public", website=True)
     def ojt_certificate_verify(self, token=None, **kw):
-        certificate = None
-        if token:
-            certificate = request.env['ojt.certificate'].sudo().search([
-                ('qr_token', '=', token),
-                ('state', '=', 'issued')
-            ], limit=1)
-
+        limited = self._check_verify_rate_limit()
+        if limited:
+            return limited
+        verification = request.env['ojt.certificate']._verify(token=token)
         values = {
-            'certificate': certificate,
+            'certificate': verification if verification and verification['valid'] else None,
             'token': token,
         }
-        return request.render("solvera_ojt_core.ojt_certificate_verification_page", values)
\ No newline at end of file
+        return request.render("solvera_ojt_core.ojt_certificate_verification_page", values)
+
+    @http.route(['/ojt/cert/verify/json'], type='http', auth="public", methods=['GET'], readonly=True)
+    def ojt_certificate_verify_json(self, token=None, serial=None, **kw):
+        """Verifikasi satu sertifikat: ``?token=...`` atau ``?serial=...``."""
+        limited = self._check_verify_rate_limit()
+        if limited:
+            return limited
+        verification = request.env['ojt.certificate']._verify(token=token, serial=serial)
+        if not verification:
+            return request.make_json_response({'status': 'not_found', 'valid': False}, status=404)
+        return request.make_json_response(verification, headers=[('Cache-Control', 'no-cache')])
+
+    @http.route(['/ojt/cert/verify/bulk'], type='http', auth="public", methods=['POST'], csrf=False, readonly=True)
+    def ojt_certificate_verify_bulk(self, **kw):
+        """Verifikasi banyak sertifikat. Body JSON: ``{"tokens": [...], "serials": [...]}``;
+        setiap item dihitung sebagai satu permintaan untuk rate limit."""
+        try:
+            data = request.get_json_data()
+            tokens, serials = list(data.get('tokens') or []), list(data.get('serials') or [])
+        except (ValueError, AttributeError, TypeError):
+            return request.make_json_response({'error': 'invalid_request'}, status=400)
+        if len(tokens) + len(serials) > MAX_BULK_VERIFY:
+            return request.make_json_response(
+                {'error': 'too_many_items', 'max_items': MAX_BULK_VERIFY}, status=413)
+        limited = self._check_verify_rate_limit(cost=max(1, len(tokens) + len(serials)))
+        if limited:
+            return limited
+        results = request.env['ojt.certificate']._verify_bulk(tokens=tokens, serials=serials)
+        return request.make_json_response({'results': results})
+
+    @http.route(['/ojt/cert/keys.json'], type='http', auth="public", methods=['GET'], readonly=True)
+    def ojt_certificate_keys(self, **kw):
+        """Kunci publik untuk memverifikasi payload bertanda tangan di QR sertifikat."""
+        return request.make_json_response(
+            request.env['ojt.certificate.key']._get_key_set(),
+            headers=[('Cache-Control', 'public, max-age=3600')])
+
@@ -2,11 +2,19 @@
 from odoo import http
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.controllers.ojt_portal_mixin import OjtPortalCacheMixin
 
-class OjtEventLinkController(CustomerPortal):
+class OjtEventLinkController(OjtPortalCacheMixin, CustomerPortal):
 
     @http.route(['/my/agenda/<int:event_link_id>'], type='http', auth="user", website=True)
     def portal_my_agenda_detail(self, event_link_id, **kw):
+        versions = self._ojt_portal_versions('ojt.event.link', event_link_id)
+        etag = self._ojt_portal_etag(f'agenda/{event_link_id}', [
+            (pid, version) for pid, (_batch_id, version) in versions.items()])
+        not_modified = versions and self._ojt_portal_not_modified(etag)
+        if not_modified:
+            return not_modified
+
         event_link = request.env['ojt.event.link'].browse(event_link_id)
         
         if not event_link.exists():
@@ -26,4 +34,4 @@ class OjtEventLinkController(CustomerPortal):
             'event': event_link.event_id,
             'page_name': 'agenda_detail',
         }
-        return request.render("solvera_ojt_core.portal_ojt_agenda_detail", values)
\ No newline at end of file
+        return self._ojt_portal_render(etag, "solvera_ojt_core.portal_ojt_agenda_detail", values)
\ No newline at end of file
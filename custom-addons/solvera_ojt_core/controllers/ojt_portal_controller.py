@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from urllib.parse import urlencode
+
+from odoo import http, fields
+from odoo.http import request
+from odoo.addons.portal.controllers.portal import CustomerPortal
+from odoo.addons.solvera_ojt_core.models.ojt_portal_api import PORTAL_COUNTERS
+
+PORTAL_PAGE_SIZE = 20
+
+
+class OjtPortalListController(CustomerPortal):
+    """Halaman daftar portal peserta dengan paginasi keyset: setiap halaman dilanjutkan dari
+    ``cursor`` (tanggal, id) record terakhir, sehingga biayanya tetap di halaman berapa pun."""
+
+    def _prepare_home_portal_values(self, counters):
+        values = super(OjtPortalListController, self)._prepare_home_portal_values(counters)
+        requested = [counter for counter in PORTAL_COUNTERS if counter in counters]
+        if requested:
+            counts = request.env['ojt.portal.api']._get_counters(request.env.user.partner_id.id)
+            values.update((counter, counts[counter]) for counter in requested)
+        return values
+
+    def _get_list_values(self, url, resource, cursor=None, domain=None, reverse=False, query=None, scope_ids=None):
+        """Nilai template satu halaman ``resource``, atau ``None`` jika ``cursor`` tidak valid."""
+        Api = request.env['ojt.portal.api']
+        partner_id = request.env.user.partner_id.id
+        try:
+            records, next_cursor = Api._search_page(
+                partner_id, resource, cursor=cursor, limit=PORTAL_PAGE_SIZE,
+                domain=domain, reverse=reverse, scope_ids=scope_ids)
+        except ValueError:
+            return None
+        query = {key: value for key, value in (query or {}).items() if value}
+        return {
+            'records': records,
+            'first_url': cursor and (f'{url}?{urlencode(query)}' if query else url),
+            'next_url': next_cursor and f'{url}?{urlencode(dict(query, cursor=next_cursor))}',
+        }
+
+    @http.route(['/my/certificates'], type='http', auth="user", website=True)
+    def portal_my_ojt_certificates(self, cursor=None, **kw):
+        values = self._get_list_values('/my/certificates', 'certificates', cursor=cursor, reverse=True)
+        if values is None:
+            return request.redirect('/my/certificates')
+        values['page_name'] = 'ojt_certificates'
+        return request.render('solvera_ojt_core.portal_my_ojt_certificates', values)
+
+    @http.route(['/my/assignments'], type='http', auth="user", website=True)
+    def portal_my_ojt_assignments(self, cursor=None, filterby='all', **kw):
+        scope_ids = request.env['ojt.portal.api']._get_scope_ids(request.env.user.partner_id.id)
+        own_submissions = [('participant_id', 'in', scope_ids[0])]
+        filters = {
+            'all': [],
+            'submitted': [('submit_ids', 'any', own_submissions)],
+            'pending': [('submit_ids', 'not any', own_submissions)],
+        }
+        filterby = filterby if filterby in filters else 'all'
+        values = self._get_list_values(
+            '/my/assignments', 'assignments', cursor=cursor, domain=filters[filterby], reverse=True,
+            query={'filterby': filterby}, scope_ids=scope_ids)
+        if values is None:
+            return request.redirect('/my/assignments')
+        # status pengumpulan hanya untuk tugas di halaman ini, satu query
+        submissions = request.env['ojt.assignment.submit'].sudo().search_fetch(
+            [('assignment_id', 'in', values['records'].ids)] + own_submissions, ['assignment_id'])
+        values.update({
+            'submitted_ids': set(submissions.assignment_id.ids),
+            'filterby': filterby,
+            'page_name': 'ojt_assignments',
+        })
+        return request.render('solvera_ojt_core.portal_my_ojt_assignments', values)
+
+    @http.route(['/my/agenda'], type='http', auth="user", website=True)
+    def portal_my_ojt_agenda(self, cursor=None, filterby='upcoming', **kw):
+        now = fields.Datetime.now()
+        filters = {
+            'upcoming': ([('date_end', '>=', now)], False),
+            'past': ([('date_end', '<', now)], True),
+            'all': ([], False),
+        }
+        filterby = filterby if filterby in filters else 'upcoming'
+        domain, reverse = filters[filterby]
+        values = self._get_list_values(
+            '/my/agenda', 'agenda', cursor=cursor, domain=domain, reverse=reverse, query={'filterby': filterby})
+        if values is None:
+            return request.redirect('/my/agenda')
+        values.update({'filterby': filterby, 'page_name': 'ojt_agenda'})
+        return request.render('solvera_ojt_core.portal_my_ojt_agenda', values)
+
+    @http.route(['/my/attendance'], type='http', auth="user", website=True)
+    def portal_my_ojt_attendance(self, cursor=None, **kw):
+        values = self._get_list_values('/my/attendance', 'attendance', cursor=cursor, reverse=True)
+        if values is None:
+            return request.redirect('/my/attendance')
+        values['page_name'] = 'ojt_attendance'
+        return request.render('solvera_ojt_core.portal_my_ojt_attendance', values)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import hashlib
+
+from odoo.http import request
+
+
+class OjtPortalCacheMixin:
+    """Revalidasi ETag untuk halaman portal peserta.
+
+    ETag dibentuk dari versi konten peserta (``ojt.participant._get_portal_versions``)
+    ditambah halaman, user, bahasa, session (token CSRF di form) dan versi registry
+    (upgrade modul mengubah template). Permintaan ulang dengan ``If-None-Match`` yang cocok
+    dijawab 304 sebelum record dibaca atau QWeb dirender.
+    """
+
+    def _ojt_portal_versions(self, scope_model=None, scope_id=None):
+        return request.env['ojt.participant'].sudo()._get_portal_versions(
+            request.env.user.partner_id.id, scope_model, scope_id)
+
+    def _ojt_portal_etag(self, page, versions):
+        """ETag untuk ``page`` dari daftar ``(participant_id, versi)``."""
+        raw = '\n'.join([
+            page,
+            str(request.env.uid),
+            request.env.lang or '',
+            request.session.sid or '',
+            str(request.env.registry.registry_sequence),
+        ] + [f'{participant_id}:{version}' for participant_id, version in versions])
+        return '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def _ojt_portal_headers(self, etag):
+        # private: halaman bergantung pada user; no-cache: browser selalu revalidasi
+        return [('ETag', etag), ('Cache-Control', 'private, no-cache')]
+
+    def _ojt_portal_not_modified(self, etag):
+        """Response 304 jika klien sudah memegang ``etag``, atau ``None``."""
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return request.make_response(b'', headers=self._ojt_portal_headers(etag), status=304)
+        return None
+
+    def _ojt_portal_render(self, etag, template, values):
+        response = request.render(template, values)
+        for header, value in self._ojt_portal_headers(etag):
+            response.headers[header] = value
+        return response
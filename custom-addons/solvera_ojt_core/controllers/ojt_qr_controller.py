@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+import base64
+
+from odoo import http
+from odoo.http import request
+
+
+class OjtQrController(http.Controller):
+
+    @http.route(['/ojt/qr/<string:key>.png'], type='http', auth="public", readonly=True)
+    def ojt_qr_image(self, key, **kw):
+        """Gambar QR dari cache ``ojt.qr.image``. Isi untuk satu kunci tidak pernah berubah,
+        sehingga boleh di-cache browser tanpa batas waktu."""
+        etag = f'"{key}"'
+        headers = [
+            ('Cache-Control', 'public, max-age=31536000, immutable'),
+            ('ETag', etag),
+        ]
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return request.make_response(b'', headers=headers, status=304)
+
+        image = request.env['ojt.qr.image'].sudo().search([('key', '=', key)], limit=1)
+        if not image.image:
+            return request.not_found()
+        return request.make_response(base64.b64decode(image.image), headers=headers + [('Content-Type', 'image/png')])
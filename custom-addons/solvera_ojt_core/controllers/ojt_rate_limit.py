@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """Rate limiter token bucket per kunci (mis. IP) di memori worker.
+
+    Jumlah kunci dibatasi; kunci yang paling lama tidak dipakai dibuang lebih dulu.
+    Batas berlaku per proses worker, bukan global untuk seluruh server.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate_per_minute, burst, cost=1):
+        """Ambil ``cost`` token untuk ``key``. Mengembalikan 0 jika diizinkan, atau jumlah
+        detik sampai token cukup tersedia."""
+        rate = rate_per_minute / 60.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                retry_after = 0
+            else:
+                retry_after = max(1, int((cost - tokens) / rate + 0.999)) if rate else 60
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+verification_limiter = TokenBucketLimiter()
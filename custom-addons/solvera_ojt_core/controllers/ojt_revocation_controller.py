@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+
+
+class OjtRevocationController(http.Controller):
+
+    def _snapshot_response(self, data, etag):
+        """Response JSON dengan ETag; 304 jika klien sudah memegang versi yang sama."""
+        headers = [('ETag', etag), ('Cache-Control', 'public, max-age=300')]
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return request.make_response(b'', headers=headers, status=304)
+        return request.make_json_response(data, headers=headers)
+
+    def _unavailable_response(self):
+        """503 selama snapshot pertama belum dibuat oleh cron."""
+        return request.make_json_response(
+            {'error': 'snapshot_unavailable'}, status=503,
+            headers=[('Retry-After', '60'), ('Cache-Control', 'no-store')])
+
+    @http.route(['/ojt/cert/revocations.json'], type='http', auth="public", methods=['GET'])
+    def ojt_revocations(self, since=None, **kw):
+        """Nomor seri sertifikat yang dicabut.
+
+        Tanpa ``since``: daftar lengkap terurut. Dengan ``since=<versi>``: hanya ``added``
+        dan ``removed`` sejak versi tersebut, atau daftar lengkap jika versi itu sudah
+        tidak disimpan (``full: true``).
+        """
+        snapshot = request.env['ojt.revocation.snapshot'].sudo()._get_latest()
+        if not snapshot:
+            return self._unavailable_response()
+        try:
+            since = int(since) if since else None
+        except ValueError:
+            since = None
+        data = {
+            'version': snapshot.version,
+            'generated_at': snapshot.create_date.isoformat(),
+            'count': snapshot.serial_count,
+        }
+        delta = snapshot._get_delta(since) if since is not None else None
+        if delta is not None:
+            data.update(since=since, added=delta[0], removed=delta[1], full=False)
+        else:
+            data.update(serials=snapshot._get_serials(), full=True)
+        # ETag mengikuti isi response: semua permintaan yang dijawab penuh berbagi satu ETag
+        return self._snapshot_response(data, f'"{snapshot.digest[:32]}-{since if delta is not None else "full"}"')
+
+    @http.route(['/ojt/cert/revocations/bloom.json'], type='http', auth="public", methods=['GET'])
+    def ojt_revocations_bloom(self, **kw):
+        """Bloom filter nomor seri yang dicabut. Untuk setiap ``i < hashes``, posisi bit adalah
+        ``(h1 + i * h2) mod bits`` dengan h1/h2 = dua 64 bit pertama SHA-256(serial), big-endian;
+        bit ``p`` ada di byte ``p // 8``, bit ``p % 8``. Hasil positif dipastikan lewat
+        ``revocations.json`` atau endpoint verifikasi."""
+        snapshot = request.env['ojt.revocation.snapshot'].sudo()._get_latest()
+        if not snapshot:
+            return self._unavailable_response()
+        return self._snapshot_response(snapshot._get_bloom_values(), f'"{snapshot.digest[:32]}-bloom"')
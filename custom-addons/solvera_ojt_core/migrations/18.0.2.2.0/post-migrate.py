@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+import secrets
+
+
+def migrate(cr, version):
+    """Beri setiap sesi ``qr_secret`` sendiri. Kolom baru diisi dengan satu nilai default
+    yang sama untuk semua baris, sehingga secret yang kosong atau dipakai bersama diganti."""
+    cr.execute("""
+        SELECT id
+          FROM ojt_event_link
+         WHERE qr_secret IS NULL
+            OR qr_secret IN (SELECT qr_secret FROM ojt_event_link GROUP BY qr_secret HAVING count(*) > 1)
+    """)
+    for (link_id,) in cr.fetchall():
+        cr.execute("UPDATE ojt_event_link SET qr_secret = %s WHERE id = %s", (secrets.token_hex(32), link_id))
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+import secrets
+
+
+def migrate(cr, version):
+    """Beri token portal (link kalender) ke peserta yang dibuat sebelum token punya default."""
+    cr.execute("""
+        SELECT id
+          FROM ojt_participant
+         WHERE portal_token IS NULL
+            OR portal_token IN (SELECT portal_token FROM ojt_participant GROUP BY portal_token HAVING count(*) > 1)
+    """)
+    for (participant_id,) in cr.fetchall():
+        cr.execute("UPDATE ojt_participant SET portal_token = %s WHERE id = %s",
+                   (secrets.token_urlsafe(32), participant_id))
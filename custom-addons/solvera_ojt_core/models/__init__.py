@@ -1,11 +1,24 @@
 # -*- coding: utf-8 -*-
+from . import ojt_counter_mixin
+from . import ojt_qr_image
+from . import ojt_versioned_cache
 from . import ojt_batch
 from . import ojt_participant
+from . import ojt_participant_dashboard
+from . import ojt_portal_api
 from . import ojt_event_link
 from . import ojt_certificate
+from . import ojt_certificate_key
+from . import ojt_revocation_snapshot
+from . import ojt_certificate_job
 from . import ojt_assignment
 from . import ojt_assignment_submit
 from . import ojt_attendance
 from . import event_event
 from . import hr_applicant
-from . import survey_survey
\ No newline at end of file
+from . import res_partner
+from . import survey_survey
+from . import survey_user_input
+from . import ojt_notification_queue
+from . import ojt_notification_digest
+from . import ojt_scoring_policy
\ No newline at end of file
@@ -8,4 +8,11 @@ class EventEvent(models.Model):
         'ojt.event.link', 
         'event_id', 
         string='OJT Batch Links',
-        help="Shows which OJT Batches this event is a part of.")
\ No newline at end of file
+        help="Shows which OJT Batches this event is a part of.")
+
+    def write(self, vals):
+        res = super(EventEvent, self).write(vals)
+        if 'date_begin' in vals:
+            # urutan agenda di dashboard peserta mengikuti tanggal mulai event
+            self.env['ojt.participant.dashboard']._refresh_batches(self.sudo().event_link_ids.batch_id)
+        return res
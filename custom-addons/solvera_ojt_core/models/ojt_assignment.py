@@ -2,6 +2,7 @@
 import logging
 from odoo.exceptions import ValidationError
 from odoo import models, fields, api
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_ASSIGNMENT_FIELDS
 
 _logger = logging.getLogger(__name__)
 
@@ -18,6 +19,7 @@ class OjtAssignment(models.Model):
         store=True, 
         readonly=False, 
         required=True, 
+        index=True,
         domain="[('state', '=', 'ongoing')]"
     )
     company_id = fields.Many2one(
@@ -62,6 +64,7 @@ class OjtAssignment(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         assignments = super(OjtAssignment, self).create(vals_list)
+        self.env['ojt.participant.dashboard']._refresh_batches(assignments.batch_id)
         return assignments
     
     def write(self, vals):
@@ -69,13 +72,35 @@ class OjtAssignment(models.Model):
         if vals.get('state') == 'open':
             assignments_to_notify = self.filtered(lambda a: a.state != 'open')
 
+        submissions, before = self.env['ojt.assignment.submit'], None
+        if 'weight' in vals or 'max_score' in vals:
+            submissions = self.submit_ids.filtered(lambda s: s.state == 'scored')
+            before = submissions._score_contribution()
+
+        batches = self.batch_id if DASHBOARD_ASSIGNMENT_FIELDS.intersection(vals) else None
+
         res = super(OjtAssignment, self).write(vals)
 
+        if batches is not None:
+            self.env['ojt.participant.dashboard']._refresh_batches(batches | self.batch_id)
+
+        if before is not None:
+            self.env['ojt.participant']._apply_score_deltas(before, submissions._score_contribution())
+
         if assignments_to_notify:
             assignments_to_notify._send_new_assignment_notification()
             
         return res
 
+    def unlink(self):
+        # submission ikut terhapus lewat ON DELETE CASCADE, tanpa melalui ORM
+        before = self.submit_ids._score_contribution()
+        batches = self.batch_id
+        res = super(OjtAssignment, self).unlink()
+        self.env['ojt.participant']._apply_score_deltas(before, {})
+        self.env['ojt.participant.dashboard']._refresh_batches(batches)
+        return res
+
     def _compute_access_url(self):
         super(OjtAssignment, self)._compute_access_url()
         for assignment in self:
@@ -88,31 +113,32 @@ class OjtAssignment(models.Model):
         except ValueError:
             return
 
-        for assignment in self:
-            if not assignment.batch_id:
-                continue
-
-            portal_url = assignment.get_portal_url()
-            if not portal_url:
-                continue
-
-            for participant in assignment.batch_id.participant_ids:
-                if not participant.partner_id.email:
-                    continue
+        self.env['ojt.notification.queue']._enqueue_fanout(
+            template, self.filtered('batch_id'), '_notification_messages_new_assignment', broadcast=True)
 
-                email_penerima = participant.partner_id.email
-
-                template_ctx = {
-                    'url_portal_assignment': portal_url,
-                    'participant_name': participant.name,
-                }
-
-                template.with_context(template_ctx).send_mail(
-                    assignment.id,
-                    force_send=True,
-                    email_values={'email_to': email_penerima} 
-                )
+    def _notification_messages_new_assignment(self, template, context):
+        """Fan-out antrian notifikasi: satu email tugas baru per peserta batch."""
+        self.ensure_one()
+        portal_url = self.get_portal_url()
+        if not portal_url:
+            return []
 
+        messages = []
+        for participant in self.batch_id.participant_ids:
+            if not participant.partner_id.email:
+                continue
+            messages.append({
+                'res_id': self.id,
+                'context': dict(context, url_portal_assignment=portal_url, participant_name=participant.name),
+                'email_values': {'email_to': participant.partner_id.email},
+                'digest': {
+                    'participant_id': participant.id,
+                    'event_type': 'assignment',
+                    'title': self.name,
+                    'url': portal_url,
+                },
+            })
+        return messages
 
     def action_open(self):
         for assignment in self:
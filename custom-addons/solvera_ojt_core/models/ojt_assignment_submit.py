@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_SUBMIT_FIELDS
+
+# Field submission yang memengaruhi akumulator nilai peserta
+SCORE_CONTRIBUTION_FIELDS = {'participant_id', 'assignment_id', 'score', 'state'}
 
 class OjtAssignmentSubmit(models.Model):
     _name = 'ojt.assignment.submit'
     _description = 'OJT Assignment Submission'
     _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin']
 
-    assignment_id = fields.Many2one('ojt.assignment', string='Assignment', required=True, ondelete='cascade')
-    participant_id = fields.Many2one('ojt.participant', string='Participant', required=True, ondelete='cascade')
+    assignment_id = fields.Many2one('ojt.assignment', string='Assignment', required=True, ondelete='cascade', index=True)
+    participant_id = fields.Many2one('ojt.participant', string='Participant', required=True, ondelete='cascade', index=True)
     
     submitted_on = fields.Datetime(string='Submitted On', default=fields.Datetime.now, readonly=True)
     
@@ -46,18 +52,59 @@ class OjtAssignmentSubmit(models.Model):
         super(OjtAssignmentSubmit, self)._compute_access_url()
         for submission in self:
             submission.access_url = f'/my/assignment/{submission.id}'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        submissions = super(OjtAssignmentSubmit, self).create(vals_list)
+        self.env['ojt.participant']._apply_score_deltas({}, submissions._score_contribution())
+        self.env['ojt.participant.dashboard']._refresh(submissions.participant_id)
+        return submissions
     
     def write(self, vals):
         submissions_to_notify = self.browse()
         if vals.get('state') == 'scored':
             submissions_to_notify = self.filtered(lambda s: s.state != 'scored')
 
+        before = self._score_contribution() if SCORE_CONTRIBUTION_FIELDS.intersection(vals) else None
+        participants = self.participant_id if DASHBOARD_SUBMIT_FIELDS.intersection(vals) else None
+
         res = super(OjtAssignmentSubmit, self).write(vals)
 
+        if before is not None:
+            self.env['ojt.participant']._apply_score_deltas(before, self._score_contribution())
+        if participants is not None:
+            self.env['ojt.participant.dashboard']._refresh(participants | self.participant_id)
+
         if submissions_to_notify:
             submissions_to_notify._send_scored_notification()
             
         return res
+
+    def unlink(self):
+        before = self._score_contribution()
+        participants = self.participant_id
+        res = super(OjtAssignmentSubmit, self).unlink()
+        self.env['ojt.participant']._apply_score_deltas(before, {})
+        self.env['ojt.participant.dashboard']._refresh(participants)
+        return res
+
+    def _score_contribution(self):
+        """Kontribusi submission ke nilai tugas peserta.
+
+        Mengembalikan ``{participant_id: (jumlah nilai ternormalisasi x bobot, jumlah bobot)}``
+        dengan aturan yang sama seperti ``ojt.participant._get_assignment_score_sums``.
+        """
+        contributions = defaultdict(lambda: (0.0, 0.0))
+        for submission in self:
+            assignment = submission.assignment_id
+            if submission.state != 'scored' or assignment.max_score <= 0 or assignment.weight <= 0:
+                continue
+            weighted_sum, weight_total = contributions[submission.participant_id.id]
+            contributions[submission.participant_id.id] = (
+                weighted_sum + (submission.score / assignment.max_score) * 100.0 * assignment.weight,
+                weight_total + assignment.weight,
+            )
+        return dict(contributions)
     
     def _send_scored_notification(self):
         """Mengirim notifikasi email saat tugas sudah dinilai."""
@@ -65,14 +112,21 @@ class OjtAssignmentSubmit(models.Model):
         if not template:
             return
 
+        messages = []
         for submission in self:
             if submission.participant_id.partner_id.email:
                 portal_url = submission.get_portal_url()
-                template_ctx = {'url_portal_submission': portal_url}
-                template.with_context(template_ctx).send_mail(
-                    submission.id,
-                    force_send=True
-                )
+                messages.append({
+                    'res_id': submission.id,
+                    'context': {'url_portal_submission': portal_url},
+                    'digest': {
+                        'participant_id': submission.participant_id.id,
+                        'event_type': 'score',
+                        'title': f"{submission.assignment_id.name}: {submission.score:g} / {submission.assignment_id.max_score:g}",
+                        'url': portal_url,
+                    },
+                })
+        self.env['ojt.notification.queue']._enqueue(template, messages)
 
     def action_mark_as_scored(self):
         """
@@ -1,5 +1,14 @@
 # -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+import pytz
+
 from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Peserta yang check-in lebih dari sekian menit setelah sesi dimulai dicatat 'late'
+LATE_THRESHOLD_MINUTES = 10
+MAX_BULK_SCANS = 10000
 
 class OjtAttendance(models.Model):
     _name = 'ojt.attendance'
@@ -57,12 +66,159 @@ class OjtAttendance(models.Model):
             else:
                 rec.duration_minutes = 0.0
 
-    @api.constrains('participant_id', 'event_link_id')
-    def _check_unique_attendance(self):
-        for rec in self:
-            if self.search_count([
-                ('participant_id', '=', rec.participant_id.id),
-                ('event_link_id', '=', rec.event_link_id.id),
-                ('id', '!=', rec.id)
-            ]) > 0:
-                raise models.ValidationError("Peserta ini sudah tercatat absensinya untuk sesi ini.")
\ No newline at end of file
+    @api.model
+    def _upsert_attendance(self, vals_list, overwrite=False):
+        """Simpan banyak absensi (peserta, sesi) dengan satu ``INSERT ... ON CONFLICT``.
+
+        Setiap item ``vals_list`` berisi ``participant_id`` dan ``event_link_id``, serta opsional
+        ``presence``, ``method`` dan ``check_in``; ``batch_id``/``event_id`` diambil dari sesi.
+        Keunikan dijamin oleh constraint ``participant_event_link_uniq``. Baris yang sudah ada
+        tidak diubah kecuali ``overwrite=True``, atau hanya baris ``absent`` jika
+        ``overwrite='absent'``. Pasangan duplikat di ``vals_list`` memakai item pertama.
+
+        Mengembalikan ``{(participant_id, event_link_id): (attendance_id, created)}``.
+        """
+        rows = {}
+        for vals in vals_list:
+            key = (vals['participant_id'], vals['event_link_id'])
+            rows.setdefault(key, vals)
+        if not rows:
+            return {}
+
+        now = fields.Datetime.now()
+        values = SQL(", ").join(
+            SQL("(%s, %s, %s::timestamp, %s, %s)",
+                participant_id, event_link_id, vals.get('check_in') or now,
+                vals.get('presence') or 'present', vals.get('method') or 'manual')
+            for (participant_id, event_link_id), vals in rows.items()
+        )
+        if overwrite:
+            replace = SQL("ojt_attendance.presence = 'absent'") if overwrite == 'absent' else SQL("TRUE")
+            on_conflict = SQL("""
+                UPDATE SET check_in = CASE WHEN %(replace)s THEN EXCLUDED.check_in ELSE ojt_attendance.check_in END,
+                           presence = CASE WHEN %(replace)s THEN EXCLUDED.presence ELSE ojt_attendance.presence END,
+                           method = CASE WHEN %(replace)s THEN EXCLUDED.method ELSE ojt_attendance.method END,
+                           write_uid = EXCLUDED.write_uid,
+                           write_date = EXCLUDED.write_date
+            """, replace=replace)
+        else:
+            # update tanpa perubahan agar baris yang sudah ada tetap dikembalikan oleh RETURNING
+            on_conflict = SQL("UPDATE SET presence = ojt_attendance.presence")
+
+        self.env['ojt.event.link'].flush_model(['batch_id', 'event_id'])
+        self.flush_model(['participant_id', 'event_link_id', 'check_in', 'presence', 'method'])
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO ojt_attendance (participant_id, event_link_id, batch_id, event_id, check_in,
+                                        presence, method, create_uid, create_date, write_uid, write_date)
+                 SELECT v.participant_id, v.event_link_id, l.batch_id, l.event_id, v.check_in,
+                        v.presence, v.method, %(uid)s, %(now)s, %(uid)s, %(now)s
+                   FROM (VALUES %(values)s) AS v(participant_id, event_link_id, check_in, presence, method)
+                   JOIN ojt_event_link l ON l.id = v.event_link_id
+            ON CONFLICT ON CONSTRAINT ojt_attendance_participant_event_link_uniq DO %(on_conflict)s
+              RETURNING id, participant_id, event_link_id, (xmax = 0)
+            """, values=values, on_conflict=on_conflict, uid=self.env.uid, now=now,
+        ))
+        result = {(participant_id, event_link_id): (attendance_id, created)
+                  for attendance_id, participant_id, event_link_id, created in self.env.cr.fetchall()}
+
+        # beri tahu ORM agar field turunan (mis. attendance_rate peserta) dihitung ulang
+        created = self.browse([attendance_id for attendance_id, is_new in result.values() if is_new])
+        updated = self.browse([attendance_id for attendance_id, is_new in result.values() if not is_new])
+        self.env['ojt.participant'].browse({key[0] for key in result}).invalidate_recordset(['attendance_ids'])
+        created.modified(['participant_id', 'event_link_id', 'presence'], create=True)
+        if overwrite and updated:
+            updated.invalidate_recordset(['check_in', 'presence', 'method', 'write_uid', 'write_date'])
+            updated.modified(['check_in', 'presence', 'method'])
+        return result
+
+    @api.model
+    def _get_presence_at(self, date_start, check_in):
+        """Status kehadiran untuk check-in pada ``check_in`` di sesi yang mulai ``date_start``."""
+        if date_start and check_in > date_start + timedelta(minutes=LATE_THRESHOLD_MINUTES):
+            return 'late'
+        return 'present'
+
+    @api.model
+    def _ingest_scans(self, scans):
+        """Simpan hasil scan kiosk offline secara massal.
+
+        Setiap scan berisi ``access_token``, ``participant_id`` atau ``partner_id``, dan
+        ``scanned_at`` (ISO 8601, tanpa zona waktu dianggap UTC). Token QR bertanda tangan
+        diverifikasi terhadap window pada ``scanned_at``. Token dan peserta
+        diresolusi sekaligus, status hadir/terlambat dihitung dari waktu scan, lalu semua
+        baris disimpan dengan satu :meth:`_upsert_attendance`. Scan paling awal per
+        (peserta, sesi) yang dipakai; absensi ``absent`` digantikan oleh scan.
+
+        Mengembalikan satu dict hasil per scan, dengan urutan yang sama.
+        """
+        results = [{'index': index, 'status': 'error'} for index in range(len(scans))]
+        parsed = []
+        for index, scan in enumerate(scans):
+            try:
+                scanned_at = datetime.fromisoformat(str(scan['scanned_at']))
+                if scanned_at.tzinfo:
+                    scanned_at = scanned_at.astimezone(pytz.utc).replace(tzinfo=None)
+                parsed.append((index, str(scan['access_token']), int(scan.get('participant_id') or 0),
+                               int(scan.get('partner_id') or 0), scanned_at))
+            except (KeyError, TypeError, ValueError):
+                results[index]['error'] = 'invalid_scan'
+
+        EventLink = self.env['ojt.event.link'].sudo()
+        static_tokens, signed_tokens = set(), {}
+        for _index, token, _participant, _partner, scanned_at in parsed:
+            if '.' not in token:
+                static_tokens.add(token)
+            elif (token, scanned_at) not in signed_tokens:
+                target = EventLink._resolve_checkin_token(token, at=scanned_at.replace(tzinfo=pytz.utc).timestamp())
+                signed_tokens[token, scanned_at] = target and target[0]
+        event_links = {
+            link.access_token: link
+            for link in EventLink.search([('access_token', 'in', list(static_tokens)), ('qr_mode', '=', 'static')])
+        }
+        signed_ids = [link_id for link_id in signed_tokens.values() if link_id]
+        for (token, scanned_at), link_id in signed_tokens.items():
+            if link_id:
+                event_links[token, scanned_at] = EventLink.browse(link_id).with_prefetch(signed_ids)
+        batch_ids = list({link.batch_id.id for link in event_links.values()})
+        participants = self.env['ojt.participant'].sudo().search([
+            ('batch_id', 'in', batch_ids),
+            ('state', '=', 'active'),
+            '|',
+            ('id', 'in', [participant_id for _i, _t, participant_id, _p, _s in parsed if participant_id]),
+            ('partner_id', 'in', [partner_id for _i, _t, _pa, partner_id, _s in parsed if partner_id]),
+        ])
+        by_id = {participant.id: participant for participant in participants}
+        by_partner = {(participant.partner_id.id, participant.batch_id.id): participant for participant in participants}
+
+        vals_list, pending = [], []
+        for index, token, participant_id, partner_id, scanned_at in sorted(parsed, key=lambda scan: scan[4]):
+            event_link = event_links.get(token) or event_links.get((token, scanned_at))
+            if not event_link:
+                results[index]['error'] = 'unknown_session'
+                continue
+            participant = by_id.get(participant_id) if participant_id else by_partner.get((partner_id, event_link.batch_id.id))
+            if not participant or participant.batch_id != event_link.batch_id:
+                results[index]['error'] = 'not_registered'
+                continue
+            presence = self._get_presence_at(event_link.date_start, scanned_at)
+            vals_list.append({
+                'participant_id': participant.id,
+                'event_link_id': event_link.id,
+                'check_in': scanned_at,
+                'presence': presence,
+                'method': 'qr',
+            })
+            pending.append((index, participant.id, event_link.id))
+
+        upserted = self._upsert_attendance(vals_list, overwrite='absent')
+        first_scan = set()
+        for index, participant_id, event_link_id in pending:
+            attendance_id, created = upserted[(participant_id, event_link_id)]
+            is_first = (participant_id, event_link_id) not in first_scan
+            first_scan.add((participant_id, event_link_id))
+            results[index].update({
+                'status': 'created' if created and is_first else 'existing',
+                'attendance_id': attendance_id,
+            })
+        return results
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+import logging
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
 
 class OjtBatch(models.Model):
     _name = 'ojt.batch'
     _description = 'OJT Program Batch'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'ojt.counter.mixin']
 
     name = fields.Char(
         string='Batch Name', 
@@ -59,10 +62,29 @@ class OjtBatch(models.Model):
         ('cancel', 'Cancelled')
     ], string='Status', default='draft', tracking=True)
 
+    notification_mode = fields.Selection([
+        ('instant', 'Instant'),
+        ('digest', 'Daily Digest'),
+    ], string='Notification Mode', default='instant', required=True,
+        help="Daily Digest bundles agenda, assignment, score and survey notifications "
+             "into one email per participant per day.")
+
+    scoring_policy_id = fields.Many2one(
+        'ojt.scoring.policy', string='Scoring Policy', tracking=True,
+        default=lambda self: self.env.ref('solvera_ojt_core.ojt_scoring_policy_default', raise_if_not_found=False),
+        help="Component weights and grade bands used for final scores and certificates. "
+             "Without a policy the standard 70/20/10 weights apply.")
+
     certificate_rule_attendance = fields.Float(string='Min. Attendance (%)', default=80.0)
     certificate_rule_score = fields.Float(string='Min. Final Score', default=70.0)
+    certificate_signed_qr = fields.Boolean(
+        string='Offline-Verifiable QR',
+        help="Embed an Ed25519-signed summary (serial, participant, batch, issue date, grade) "
+             "in the certificate QR code so it can be verified with the published keys. "
+             "Requires the 'cryptography' Python library; without it the QR stays online-only.")
     
-    progress_ratio = fields.Float(string='Average Progress', compute='_compute_progress_ratio', store=True)
+    # Dihitung saat dibaca dengan satu query berkelompok: penilaian peserta tidak menulis baris batch
+    progress_ratio = fields.Float(string='Average Progress', compute='_compute_progress_ratio')
     
     color = fields.Integer(string='Color Index')
     company_id = fields.Many2one(
@@ -85,6 +107,8 @@ class OjtBatch(models.Model):
             if vals.get('code', '/') == '/':
                 vals['code'] = self.env['ir.sequence'].next_by_code('ojt.batch') or '/'
         batches = super(OjtBatch, self).create(vals_list)
+        if any(batches.mapped('certificate_signed_qr')):
+            self.env['ojt.certificate.key']._ensure_signing_key()
         
         batches_with_survey = batches.filtered(lambda b: b.survey_id)
         if batches_with_survey:
@@ -109,27 +133,25 @@ class OjtBatch(models.Model):
                     if participants_to_revert:
                         participants_to_revert.write({'state': 'active'})
         
+        if vals.get('certificate_signed_qr'):
+            self.env['ojt.certificate.key']._ensure_signing_key()
+
         res = super(OjtBatch, self).write(vals)
 
         if batches_starting:
             template = self.env.ref('solvera_ojt_core.mail_template_batch_ongoing', raise_if_not_found=False)
-            if template:
-                for batch in batches_starting:
-                    for participant in batch.participant_ids:
-                        if participant.partner_id.email:
-                            participant.sudo()._compute_access_url()
-                            portal_url = participant.get_portal_url(query_string=f'participant_id={participant.id}')
-                            email_context = {
-                                'url_portal_batch': portal_url
-                            }
-                            template.with_context(**email_context).send_mail(
-                                participant.id, 
-                                force_send=True
-                            )
+            self.env['ojt.notification.queue']._enqueue_fanout(
+                template, batches_starting, '_notification_messages_portal_batch')
 
         if batches_with_new_survey:
             batches_with_new_survey._send_survey_notification()
 
+        if 'survey_id' in vals:
+            self.env['ojt.participant.dashboard']._refresh(self.participant_ids)
+
+        if 'name' in vals:
+            self.env['ojt.certificate']._invalidate_verification([('batch_id', 'in', self.ids)])
+
         return res
     
     def _send_survey_notification(self):
@@ -139,38 +161,80 @@ class OjtBatch(models.Model):
             _logger.error("Template email 'mail_template_batch_survey' tidak ditemukan.")
             return
 
-        for batch in self:
-            if not batch.survey_id:
+        self.env['ojt.notification.queue']._enqueue_fanout(
+            template, self.filtered('survey_id'), '_notification_messages_survey')
+
+    def _notification_messages_portal_batch(self, template, context):
+        """Fan-out antrian notifikasi: satu email per peserta dengan link dashboard portal."""
+        self.ensure_one()
+        messages = []
+        for participant in self.participant_ids:
+            if not participant.partner_id.email:
                 continue
+            participant.sudo()._compute_access_url()
+            portal_url = participant.get_portal_url(query_string=f'participant_id={participant.id}')
+            messages.append({
+                'res_id': participant.id,
+                'context': dict(context, url_portal_batch=portal_url),
+            })
+        return messages
 
-            survey_url = batch.survey_id.get_start_url()
-            
-            for participant in batch.participant_ids:
-                if participant.partner_id.email:
-                    email_context = {'url_survey': survey_url}
-                    template.with_context(**email_context).send_mail(
-                        participant.id, 
-                        force_send=True
-                    )
+    def _notification_messages_survey(self, template, context):
+        """Fan-out antrian notifikasi: undangan survei untuk setiap peserta."""
+        self.ensure_one()
+        if not self.survey_id:
+            return []
+        survey_url = self.survey_id.get_start_url()
+        return [{
+            'res_id': participant.id,
+            'context': dict(context, url_survey=survey_url),
+            'digest': {
+                'participant_id': participant.id,
+                'event_type': 'survey',
+                'title': self.survey_id.title,
+                'url': survey_url,
+            },
+        } for participant in self.participant_ids if participant.partner_id.email]
 
     @api.depends('participant_ids.batch_id', 'event_link_ids.batch_id')
     def _compute_counts(self):
+        participant_counts = self._read_counts('ojt.participant', 'batch_id')
+        event_link_counts = self._read_counts('ojt.event.link', 'batch_id')
         for batch in self:
-            batch.participant_count = self.env['ojt.participant'].search_count(
-                [('batch_id', '=', batch.id)]
-            )
-            batch.event_link_count = self.env['ojt.event.link'].search_count(
-                [('batch_id', '=', batch.id)]
-            )
+            batch.participant_count = participant_counts.get(batch._origin.id, 0)
+            batch.event_link_count = event_link_counts.get(batch._origin.id, 0)
 
     @api.depends('participant_ids.score_final')
     def _compute_progress_ratio(self):
+        batch_ids = [bid for bid in self._origin.ids if bid]
+        groups = self.env['ojt.participant']._read_group(
+            [('batch_id', 'in', batch_ids)], ['batch_id'], ['score_final:avg']) if batch_ids else []
+        averages = {batch.id: average for batch, average in groups}
         for batch in self:
-            if batch.participant_ids:
-                average_score = sum(batch.participant_ids.mapped('score_final')) / len(batch.participant_ids)
-                batch.progress_ratio = average_score
-            else:
-                batch.progress_ratio = 0.0
+            batch.progress_ratio = averages.get(batch._origin.id) or 0.0
+
+    def action_rebuild_scores(self):
+        """Bangun ulang seluruh akumulator nilai peserta dari data sumber."""
+        self.participant_ids._rebuild_scores()
+        return True
+
+    def _get_calendar_events(self):
+        """Data sesi batch untuk feed iCalendar, terurut per tanggal mulai; nilai biasa
+        (bukan record) sehingga feed dapat ditulis setelah cursor request ditutup."""
+        self.ensure_one()
+        links = self.env['ojt.event.link'].sudo().search_fetch(
+            [('batch_id', '=', self.id)],
+            ['event_id', 'date_start', 'date_end', 'online_meeting_url', 'notes', 'write_date'],
+            order='date_start, id')
+        return [{
+            'id': link.id,
+            'name': link.event_id.name,
+            'date_start': link.date_start,
+            'date_end': link.date_end,
+            'location': link.online_meeting_url or link.event_id.address_id.name or '',
+            'description': link.notes or '',
+            'write_date': max(link.write_date, link.event_id.write_date),
+        } for link in links]
 
     def action_recruit(self):
         return self.write({'state': 'recruit'})
@@ -190,19 +254,8 @@ class OjtBatch(models.Model):
         if not template:
             return
 
-        for batch in self:
-            for participant in batch.participant_ids:
-                if not participant.partner_id.email:
-                    continue 
-
-                participant.sudo()._compute_access_url()
-                portal_url = participant.get_portal_url(query_string=f'participant_id={participant.id}')
-                
-                template_ctx = {'url_portal_batch': portal_url}
-                template.with_context(template_ctx).send_mail(
-                    participant.id,
-                    force_send=True
-                )
+        self.env['ojt.notification.queue']._enqueue_fanout(
+            template, self, '_notification_messages_portal_batch')
 
     @api.model
     def _cron_update_batch_states(self):
@@ -218,6 +271,26 @@ class OjtBatch(models.Model):
         
         return True
 
+    def action_export_certificates(self):
+        """Buat pekerjaan ekspor semua sertifikat terbit; format dari konteks ``export_format``."""
+        self.ensure_one()
+        certificates = self.env['ojt.certificate'].search([('batch_id', '=', self.id), ('state', '=', 'issued')])
+        if not certificates:
+            raise UserError("Belum ada sertifikat terbit untuk batch ini.")
+        job = self.env['ojt.certificate.job'].create({
+            'batch_id': self.id,
+            'export_format': self.env.context.get('export_format', 'pdf'),
+            'certificate_ids': [Command.set(certificates.ids)],
+            'total_count': len(certificates),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Certificate Export',
+            'res_model': 'ojt.certificate.job',
+            'res_id': job.id,
+            'view_mode': 'form',
+        }
+
     def action_open_generate_certificates_wizard(self):
         return {
             'type': 'ir.actions.act_window',
@@ -1,14 +1,28 @@
 # -*- coding: utf-8 -*-
 import base64
-import io
+import hashlib
+import logging
 import uuid
 
-try:
-    import qrcode
-except ImportError:
-    qrcode = None
-
 from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_CERTIFICATE_FIELDS
+from odoo.addons.solvera_ojt_core.models.ojt_qr_image import render_qr_png
+from odoo.addons.solvera_ojt_core.models.ojt_versioned_cache import VersionedCache
+
+_logger = logging.getLogger(__name__)
+
+CERTIFICATE_REPORT = 'solvera_ojt_core.report_ojt_certificate_document'
+# Field yang tampil di PDF sertifikat; perubahannya membuang PDF yang sudah dirender
+CERTIFICATE_PDF_FIELDS = {
+    'name', 'serial', 'qr_token', 'issued_date', 'final_score', 'grade', 'signed_payload',
+    'participant_id', 'batch_id', 'state',
+}
+# Field yang dikembalikan oleh verifikasi publik; perubahannya membersihkan cache verifikasi
+VERIFICATION_FIELDS = CERTIFICATE_PDF_FIELDS
+# ('qr_token' | 'serial', nilai) -> hasil verifikasi publik sertifikat terbit/dicabut
+verification_cache = VersionedCache('ojt.certificate.verification', max_entries=2048)
+
 
 class OjtCertificate(models.Model):
     _name = 'ojt.certificate'
@@ -50,6 +64,16 @@ class OjtCertificate(models.Model):
     
     notes = fields.Text(string='Internal Notes')
     qr_code_image = fields.Binary("Verification QR Code", compute='_compute_qr_code')
+    qr_code_url = fields.Char("Verification QR Code URL", compute='_compute_qr_code')
+    signed_payload = fields.Char(
+        string='Signed Payload', compute='_compute_signed_payload', store=True, copy=False,
+        help="Compact Ed25519-signed claims embedded in the QR code, verifiable offline "
+             "with the published public keys.")
+    pdf_attachment_id = fields.Many2one(
+        'ir.attachment', string='Certificate PDF', readonly=True, copy=False, ondelete='set null')
+    pdf_fingerprint = fields.Char(
+        string='PDF Fingerprint', readonly=True, copy=False,
+        help="Hash of the values printed on the cached PDF; a mismatch triggers a new render.")
 
     access_url = fields.Char('Portal URL', compute='_compute_access_url')
 
@@ -78,17 +102,19 @@ class OjtCertificate(models.Model):
             if vals.get('serial', '/') == '/':
                 vals['serial'] = self.env['ir.sequence'].next_by_code('ojt.certificate') or '/'
         
-        return super(OjtCertificate, self).create(vals_list)
+        # hasil "tidak ditemukan" tidak pernah disimpan, jadi cache verifikasi tidak perlu dibuang
+        certificates = super(OjtCertificate, self).create(vals_list)
+        certificates._ensure_qr_images()
+        self.env['ojt.participant.dashboard']._refresh(certificates.participant_id)
+        return certificates
 
     @api.depends('final_score')
     def _compute_grade(self):
-        for cert in self:
-            if cert.final_score >= 85:
-                cert.grade = 'A'
-            elif cert.final_score >= 75:
-                cert.grade = 'B'
-            else:
-                cert.grade = 'C'
+        # grade adalah snapshot saat sertifikat dibuat; perubahan kebijakan tidak mengubah sertifikat lama
+        for policy, certificates in self.grouped(lambda c: c.batch_id.scoring_policy_id).items():
+            evaluator = policy._get_evaluator()
+            for cert in certificates:
+                cert.grade = evaluator.grade(cert.final_score)
 
     def action_issue(self):
         return self.write({
@@ -96,18 +122,207 @@ class OjtCertificate(models.Model):
             'issued_date': fields.Date.context_today(self),
         })
 
-    @api.depends('qr_token')
+    def write(self, vals):
+        old_qr_payloads = [cert._get_verify_url() for cert in self] if 'qr_token' in vals else []
+        stale_pdfs = self.env['ir.attachment']
+        if CERTIFICATE_PDF_FIELDS.intersection(vals):
+            stale_pdfs = self.sudo().pdf_attachment_id
+            vals = dict(vals, pdf_attachment_id=False)
+        participants = self.participant_id if DASHBOARD_CERTIFICATE_FIELDS.intersection(vals) else None
+        res = super(OjtCertificate, self).write(vals)
+        if participants is not None:
+            self.env['ojt.participant.dashboard']._refresh(participants | self.participant_id)
+        stale_pdfs.unlink()
+        if VERIFICATION_FIELDS.intersection(vals):
+            verification_cache.invalidate(self.env)
+        if 'state' in vals or 'serial' in vals:
+            self.env['ojt.revocation.snapshot']._trigger_rebuild()
+        if old_qr_payloads:
+            self.env['ojt.qr.image']._drop_images(old_qr_payloads)
+        if CERTIFICATE_PDF_FIELDS.intersection(vals):
+            self._ensure_qr_images()
+        return res
+
+    def unlink(self):
+        participants = self.participant_id
+        res = super(OjtCertificate, self).unlink()
+        verification_cache.invalidate(self.env)
+        self.env['ojt.participant.dashboard']._refresh(participants)
+        return res
+
+    def _get_verification_values(self):
+        self.ensure_one()
+        return {
+            'status': self.state,
+            'valid': self.state == 'issued',
+            'serial': self.serial,
+            'name': self.name,
+            'participant': self.partner_id.name,
+            'batch': self.batch_id.name,
+            'issued_date': self.issued_date and fields.Date.to_string(self.issued_date),
+            'final_score': self.final_score,
+            'grade': self.grade,
+        }
+
+    @api.model
+    def _verify(self, token=None, serial=None):
+        """Status verifikasi publik untuk token QR atau nomor seri, atau ``None``."""
+        key_field, value = ('qr_token', token) if token else ('serial', serial)
+        if not value:
+            return None
+        values = self._get_verification_status(key_field, str(value))
+        return dict(values) if values else None
+
+    @api.model
+    def _invalidate_verification(self, domain):
+        """Buang cache verifikasi jika ada sertifikat yang cocok dengan ``domain``; dipanggil
+        saat nama peserta atau batch yang tampil di hasil verifikasi berubah."""
+        if self.sudo().search_count(domain, limit=1):
+            verification_cache.invalidate(self.env)
+
+    @api.model
+    def _get_verification_status(self, key_field, value):
+        """Hasil verifikasi sebagai tuple (tidak bisa diubah pemanggil), atau ``None``.
+        Hanya sertifikat yang ditemukan disimpan di cache, sehingga token acak tidak
+        mendesak entri lain keluar."""
+        def compute():
+            certificate = self.sudo().search([(key_field, '=', value), ('state', 'in', ('issued', 'revoked'))], limit=1)
+            return tuple(certificate._get_verification_values().items()) if certificate else None
+        return verification_cache.get(self.env, (key_field, value), compute)
+
+    @api.model
+    def _verify_bulk(self, tokens=(), serials=()):
+        """Verifikasi banyak token dan nomor seri dengan satu pencarian."""
+        tokens = [str(token) for token in tokens if token]
+        serials = [str(serial) for serial in serials if serial]
+        certificates = self.sudo().search([
+            ('state', 'in', ('issued', 'revoked')),
+            '|', ('qr_token', 'in', tokens), ('serial', 'in', serials),
+        ]) if tokens or serials else self.browse()
+        by_token = {certificate.qr_token: certificate for certificate in certificates}
+        by_serial = {certificate.serial: certificate for certificate in certificates}
+        results = []
+        for kind, values, index in (('token', tokens, by_token), ('serial', serials, by_serial)):
+            for value in values:
+                certificate = index.get(value)
+                results.append(dict(
+                    certificate._get_verification_values() if certificate else {'status': 'not_found', 'valid': False},
+                    **{kind: value}
+                ))
+        return results
+
+    @api.model
+    def _reserve_serials(self, count):
+        """Ambil ``count`` nomor seri sekaligus.
+
+        Sequence standar tanpa rentang tanggal dipesan dengan satu ``nextval`` atas
+        ``generate_series``; implementasi lain tetap memakai ``next_by_id`` per nomor.
+        """
+        if count <= 0:
+            return []
+        sequence = self.env['ir.sequence'].sudo().search([('code', '=', 'ojt.certificate')], limit=1)
+        if not sequence:
+            return ['/'] * count
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            return [sequence.next_by_id() for _index in range(count)]
+        self.env.cr.execute(SQL(
+            "SELECT nextval(%s) FROM generate_series(1, %s)", f'ir_sequence_{sequence.id:03d}', count,
+        ))
+        return [sequence.get_next_char(number) for number, in self.env.cr.fetchall()]
+
+    def action_revoke(self):
+        return self.write({'state': 'revoked'})
+
+    def _get_pdf_fingerprint(self):
+        """Hash nilai yang tercetak di PDF, termasuk nama peserta/batch, nilai hasil compute
+        (grade, payload bertanda tangan) dan URL verifikasi yang bisa berubah tanpa
+        menulis sertifikat."""
+        self.ensure_one()
+        values = (
+            self.name, self.serial, self.state, self.issued_date and fields.Date.to_string(self.issued_date),
+            self.final_score, self.grade, self.partner_id.name, self.batch_id.name, self._get_verify_url(),
+        )
+        return hashlib.sha256(repr(values).encode()).hexdigest()
+
+    def _needs_pdf_render(self):
+        """Sertifikat yang belum punya PDF atau PDF-nya tidak sesuai lagi dengan datanya."""
+        return self.filtered(lambda c: not c.pdf_attachment_id or c.pdf_fingerprint != c._get_pdf_fingerprint())
+
+    def _get_pdf_attachment(self):
+        """PDF sertifikat yang sudah dirender; dirender ulang hanya jika isinya berubah."""
+        self.ensure_one()
+        certificate = self.sudo()
+        if certificate._needs_pdf_render():
+            fingerprint = certificate._get_pdf_fingerprint()
+            stale_pdf = certificate.pdf_attachment_id
+            pdf, _report_type = self.env['ir.actions.report'].sudo()._render_qweb_pdf(
+                CERTIFICATE_REPORT, res_ids=certificate.ids)
+            certificate.write({
+                'pdf_attachment_id': self.env['ir.attachment'].sudo().create({
+                    'name': f'Certificate-{certificate.serial}.pdf',
+                    'type': 'binary',
+                    'raw': pdf,
+                    'mimetype': 'application/pdf',
+                    'res_model': self._name,
+                    'res_id': certificate.id,
+                }).id,
+                'pdf_fingerprint': fingerprint,
+            })
+            stale_pdf.unlink()
+        return certificate.pdf_attachment_id
+
+    @api.depends('state', 'serial', 'issued_date', 'grade', 'partner_id.name', 'batch_id.name',
+                 'batch_id.certificate_signed_qr')
+    def _compute_signed_payload(self):
+        to_sign = self.filtered(lambda c: c.state == 'issued' and c.batch_id.certificate_signed_qr)
+        key = self.env['ojt.certificate.key']._get_signing_key() if to_sign else None
+        if to_sign and not key:
+            _logger.warning("Tidak ada kunci tanda tangan aktif; sertifikat %s diterbitkan dengan QR tanpa tanda tangan.",
+                            to_sign.ids)
+        for cert in self:
+            cert.signed_payload = key._sign_claims(cert._get_signed_claims()) if key and cert in to_sign else False
+
+    def _get_signed_claims(self):
+        self.ensure_one()
+        return {
+            's': self.serial,
+            'n': self.partner_id.name,
+            'b': self.batch_id.name,
+            'd': self.issued_date and fields.Date.to_string(self.issued_date),
+            'g': self.grade,
+        }
+
+    @api.depends('qr_token', 'signed_payload')
     def _compute_qr_code(self):
+        # hanya membaca; QR yang belum disimpan (mis. payload berubah karena nama peserta
+        # atau batch diganti) dirender langsung tanpa menulis ke database
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        images = self.env['ojt.qr.image']._get_images(
+            [rec._get_verify_url(base_url) for rec in self if rec.qr_token])
         for rec in self:
-            if qrcode and rec.qr_token:
-                qr_url = f'{base_url}/ojt/cert/verify?token={rec.qr_token}'
-                img = qrcode.make(qr_url)
-                temp = io.BytesIO()
-                img.save(temp, format="PNG")
-                rec.qr_code_image = base64.b64encode(temp.getvalue())
+            rec.qr_code_image = rec.qr_code_url = False
+            if not rec.qr_token:
+                continue
+            image = images.get(rec._get_verify_url(base_url))
+            if image:
+                rec.qr_code_image = image.image
+                rec.qr_code_url = image._get_url()
             else:
-                rec.qr_code_image = False
+                png = render_qr_png(rec._get_verify_url(base_url))
+                rec.qr_code_image = png and base64.b64encode(png)
+
+    def _ensure_qr_images(self):
+        """Simpan gambar QR verifikasi agar compute ``qr_code_*`` cukup membaca."""
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        self.env['ojt.qr.image']._ensure_images(
+            [cert._get_verify_url(base_url) for cert in self if cert.qr_token])
+
+    def _get_verify_url(self, base_url=None):
+        self.ensure_one()
+        base_url = base_url or self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        url = f'{base_url}/ojt/cert/verify?token={self.qr_token}'
+        # fragment tidak dikirim ke server; verifier offline membacanya langsung dari QR
+        return f'{url}#{self.signed_payload}' if self.signed_payload else url
 
     def _compute_access_url(self):
         super(OjtCertificate, self)._compute_access_url()
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from odoo import models, fields, api, Command
+from odoo.tools import SQL, split_every
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_RENDER_CHUNK_SIZE = 20
+DEFAULT_GENERATE_CHUNK_SIZE = 500
+# Hasil ekspor disimpan di memori sampai ukuran ini, selebihnya di file sementara
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Jumlah kegagalan render yang dicatat di last_error
+MAX_REPORTED_ERRORS = 20
+
+
+class OjtCertificateJob(models.Model):
+    """Pekerjaan sertifikat massal yang dijalankan oleh cron.
+
+    ``generate`` membuat dan menerbitkan sertifikat per chunk peserta; setiap chunk
+    di-commit sendiri sehingga pekerjaan yang terhenti dilanjutkan dari peserta berikutnya.
+    ``export`` merender PDF paralel per chunk; setiap thread memakai cursor sendiri
+    dan menyimpan hasilnya di ``ojt.certificate.pdf_attachment_id`` sehingga ekspor
+    berikutnya cukup menggabungkan PDF yang sudah ada.
+    """
+    _name = 'ojt.certificate.job'
+    _description = 'OJT Certificate Bulk Job'
+    _order = 'id desc'
+
+    batch_id = fields.Many2one('ojt.batch', string='OJT Batch', required=True, ondelete='cascade', index=True)
+    job_type = fields.Selection([
+        ('generate', 'Generate'),
+        ('export', 'Export'),
+    ], string='Type', default='export', required=True)
+    export_format = fields.Selection([
+        ('pdf', 'Merged PDF'),
+        ('zip', 'ZIP Archive'),
+    ], string='Format', default='pdf', required=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+
+    certificate_ids = fields.Many2many('ojt.certificate', string='Certificates')
+    participant_ids = fields.Many2many('ojt.participant', string='Participants')
+    overwrite_existing = fields.Boolean(string='Overwrite Existing Certificates')
+    total_count = fields.Integer(string='Total', readonly=True)
+    done_count = fields.Integer(string='Processed', readonly=True)
+    progress = fields.Float(string='Progress (%)', compute='_compute_progress')
+    attachment_id = fields.Many2one('ir.attachment', string='Result', readonly=True, ondelete='set null')
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    @api.depends('done_count', 'total_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done_count / job.total_count if job.total_count else 0.0
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        jobs = super(OjtCertificateJob, self).create(vals_list)
+        self._trigger_worker()
+        return jobs
+
+    @api.model
+    def _trigger_worker(self):
+        cron = self.env.ref('solvera_ojt_core.ir_cron_ojt_certificate_job', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _get_render_params(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (
+            int(get_param('solvera_ojt_core.certificate_render_workers', 0)) or os.cpu_count() or 1,
+            int(get_param('solvera_ojt_core.certificate_render_chunk_size', DEFAULT_RENDER_CHUNK_SIZE)),
+            int(get_param('solvera_ojt_core.certificate_generate_chunk_size', DEFAULT_GENERATE_CHUNK_SIZE)),
+        )
+
+    @api.model
+    def _process_jobs(self):
+        """Jalankan pekerjaan yang menunggu, satu per satu; setiap pekerjaan di-commit sendiri.
+
+        Cron tidak pernah berjalan paralel dengan dirinya sendiri, sehingga pekerjaan yang
+        masih ``running`` berasal dari proses yang terhenti dan dilanjutkan.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for job in self.search([('state', 'in', ('pending', 'running'))], order='id'):
+            job.write({'state': 'running', 'last_error': False})
+            if auto_commit:
+                self.env.cr.commit()
+            try:
+                job._run(auto_commit)
+            except Exception as e:
+                if not auto_commit:
+                    raise
+                _logger.exception("OJT certificate job %s failed", job.id)
+                self.env.cr.rollback()
+                job.write({'state': 'failed', 'last_error': str(e)})
+            if auto_commit:
+                self.env.cr.commit()
+        return True
+
+    def _run(self, auto_commit=True):
+        self.ensure_one()
+        if self.job_type == 'generate':
+            self._run_generate(auto_commit)
+        else:
+            self._run_export(auto_commit)
+
+    def _run_generate(self, auto_commit=True):
+        """Buat, terbitkan dan antrekan email sertifikat per chunk peserta."""
+        _workers, _render_chunk_size, chunk_size = self._get_render_params()
+        template = self.env.ref('solvera_ojt_core.mail_template_certificate_issued', raise_if_not_found=False)
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        Certificate = self.env['ojt.certificate'].sudo()
+
+        remaining = self.participant_ids - self.certificate_ids.participant_id
+        self.write({'total_count': len(self.participant_ids), 'done_count': len(self.participant_ids) - len(remaining)})
+        for participant_ids in split_every(chunk_size, remaining.ids):
+            participants = remaining.browse(participant_ids)
+            existing = Certificate.search([('participant_id', 'in', participants.ids)]) - self.certificate_ids
+            if self.overwrite_existing:
+                existing.unlink()
+            else:
+                participants -= existing.participant_id
+
+            serials = Certificate._reserve_serials(len(participants))
+            access_tokens = [str(uuid.uuid4()) for _participant in participants]
+            certificates = Certificate.create([{
+                'name': f"Certificate for {participant.name}",
+                'participant_id': participant.id,
+                'batch_id': self.batch_id.id,
+                'serial': serial,
+                'access_token': access_token,
+            } for participant, serial, access_token in zip(participants, serials, access_tokens)])
+            certificates.action_issue()
+
+            if template:
+                self.env['ojt.notification.queue']._enqueue(template, [{
+                    'res_id': certificate.id,
+                    'context': {
+                        'url_certificate_download':
+                            f"{base_url}/my/certificate/download/{certificate.id}?access_token={access_token}",
+                    },
+                } for certificate, access_token in zip(certificates, access_tokens)])
+
+            self.write({
+                'certificate_ids': [Command.link(certificate.id) for certificate in certificates],
+                'done_count': self.done_count + len(participant_ids),
+            })
+            if auto_commit:
+                self.env.cr.commit()
+        self.state = 'done'
+
+    def _run_export(self, auto_commit=True):
+        certificates = self.certificate_ids.sudo().filtered(lambda c: c.state == 'issued').sorted('serial')
+        self.write({'total_count': len(certificates), 'done_count': 0})
+        errors = self._render_missing_pdfs(certificates, auto_commit)
+        if errors:
+            self.write({
+                'state': 'failed',
+                'last_error': '\n'.join(errors[:MAX_REPORTED_ERRORS]),
+            })
+            return
+        if self.export_format == 'zip':
+            self._build_zip(certificates)
+        else:
+            self._build_merged_pdf(certificates)
+        self.write({'state': 'done', 'done_count': len(certificates)})
+
+    def _render_missing_pdfs(self, certificates, auto_commit):
+        """Render PDF yang belum ada di cache secara paralel per chunk.
+
+        wkhtmltopdf berjalan sebagai proses terpisah, sehingga beberapa thread yang
+        masing-masing menunggu prosesnya cukup untuk memakai semua core. Kegagalan
+        render dicatat per sertifikat; mengembalikan daftar pesan kesalahan.
+        """
+        workers, chunk_size, _generate_chunk_size = self._get_render_params()
+        missing = certificates._needs_pdf_render()
+        self.done_count = len(certificates) - len(missing)
+        chunks = list(split_every(chunk_size, missing.ids))
+        if not chunks:
+            return []
+
+        errors = []
+        if not auto_commit or workers <= 1:
+            # tes berjalan dalam satu transaksi yang tidak boleh di-commit
+            for chunk in chunks:
+                errors += self._render_certificates(missing.browse(chunk))
+                self.done_count += len(chunk)
+            return errors
+
+        self.env.cr.commit()
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = {executor.submit(self._render_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    errors += future.result()
+                except Exception as e:
+                    _logger.exception("OJT certificate job %s: rendering chunk failed", self.id)
+                    errors.append(f"Certificates {futures[future]}: {e}")
+                self.done_count += len(futures[future])
+                self.env.cr.commit()
+        certificates.invalidate_recordset(['pdf_attachment_id', 'pdf_fingerprint'])
+        return errors
+
+    def _render_chunk(self, certificate_ids):
+        with self.env.registry.cursor() as cr:
+            threading.current_thread().dbname = cr.dbname
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            return self.with_env(env)._render_certificates(env['ojt.certificate'].sudo().browse(certificate_ids))
+
+    def _render_certificates(self, certificates):
+        """Render PDF setiap sertifikat dalam savepoint sendiri; satu kegagalan tidak
+        menghentikan sertifikat lain di chunk yang sama."""
+        errors = []
+        for certificate in certificates:
+            try:
+                with self.env.cr.savepoint():
+                    certificate._get_pdf_attachment()
+            except Exception as e:
+                _logger.exception("OJT certificate job %s: rendering certificate %s failed", self.id, certificate.id)
+                errors.append(f"{certificate.serial or certificate.id}: {e}")
+        return errors
+
+    def _open_pdf(self, attachment):
+        """PDF sertifikat sebagai file object, dibaca dari filestore bila tersedia."""
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _build_merged_pdf(self, certificates):
+        """Gabungkan PDF per chunk ke file sementara, lalu gabungkan bagian-bagiannya;
+        hanya satu chunk PDF sumber yang dibaca ke memori sekaligus. Writer tetap
+        memegang semua halaman hasil gabungan sampai ditulis; untuk batch yang sangat
+        besar gunakan format ZIP."""
+        _workers, chunk_size, _generate_chunk_size = self._get_render_params()
+        parts = []
+        try:
+            for chunk in split_every(chunk_size, certificates.ids):
+                part = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+                parts.append(part)
+                writer = PdfFileWriter()
+                for certificate in certificates.browse(chunk):
+                    # halaman dibaca saat writer.write, jadi isi PDF sumber disalin sebelum file ditutup
+                    with self._open_pdf(certificate.pdf_attachment_id) as stream:
+                        self._append_pages(writer, io.BytesIO(stream.read()))
+                writer.write(part)
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+                writer = PdfFileWriter()
+                for part in parts:
+                    part.seek(0)
+                    self._append_pages(writer, part)
+                if parts:
+                    writer.write(output)
+                self._set_result(f'Certificates-{self.batch_id.name}.pdf', output, 'application/pdf')
+        finally:
+            for part in parts:
+                part.close()
+
+    def _append_pages(self, writer, stream):
+        reader = PdfFileReader(stream, strict=False)
+        for page in range(reader.getNumPages()):
+            writer.addPage(reader.getPage(page))
+
+    def _build_zip(self, certificates):
+        """Tulis setiap PDF langsung ke arsip di file sementara."""
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+            # PDF sudah terkompresi; ZIP_STORED menghindari kompresi ulang yang tidak berguna
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+                for certificate in certificates:
+                    name = f'{certificate.serial}-{certificate.partner_id.name or certificate.id}'.replace('/', '-')
+                    with self._open_pdf(certificate.pdf_attachment_id) as stream, \
+                            archive.open(f'{name}.pdf', 'w') as entry:
+                        shutil.copyfileobj(stream, entry)
+            self._set_result(f'Certificates-{self.batch_id.name}.zip', output, 'application/zip')
+
+    def _set_result(self, name, output, mimetype):
+        """Simpan ``output`` (file object hasil ekspor) sebagai lampiran hasil pekerjaan.
+
+        Dengan penyimpanan filestore isinya disalin bertahap ke filestore, tanpa dibaca
+        utuh ke memori; penyimpanan di database tetap membutuhkan seluruh isi file.
+        """
+        output.seek(0)
+        Attachment = self.env['ir.attachment'].sudo()
+        self.attachment_id.sudo().unlink()
+        vals = {
+            'name': name,
+            'type': 'binary',
+            'mimetype': mimetype,
+            'res_model': self._name,
+            'res_id': self.id,
+        }
+        if Attachment._storage() != 'file':
+            self.attachment_id = Attachment.create(dict(vals, raw=output.read()))
+            return
+        fname, checksum, file_size = self._write_filestore(output)
+        attachment = Attachment.create(vals)
+        # create() mengabaikan store_fname, checksum dan file_size dari vals
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET store_fname = %s, checksum = %s, file_size = %s WHERE id = %s",
+            fname, checksum, file_size, attachment.id,
+        ))
+        attachment.invalidate_recordset(['store_fname', 'checksum', 'file_size'])
+        self.attachment_id = attachment
+
+    def _write_filestore(self, output):
+        """Salin ``output`` ke filestore per blok; kembalikan ``(store_fname, checksum, file_size)``
+        dengan tata letak yang sama seperti ``ir.attachment._file_write``."""
+        Attachment = self.env['ir.attachment']
+        filestore = Attachment._filestore()
+        os.makedirs(filestore, exist_ok=True)
+        sha, file_size = hashlib.sha1(), 0
+        with tempfile.NamedTemporaryFile(dir=filestore, delete=False) as temp:
+            try:
+                for block in iter(lambda: output.read(1024 * 1024), b''):
+                    sha.update(block)
+                    file_size += len(block)
+                    temp.write(block)
+            except Exception:
+                os.unlink(temp.name)
+                raise
+        checksum = sha.hexdigest()
+        fname = f'{checksum[:2]}/{checksum}'
+        full_path = Attachment._full_path(fname)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(temp.name, full_path)
+        # file tanpa lampiran (transaksi dibatalkan) dibersihkan oleh GC filestore
+        Attachment._mark_for_gc(fname)
+        return fname, checksum, file_size
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
+
+    def action_retry(self):
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'pending'})
+        self._trigger_worker()
+        return True
+
+    @api.autovacuum
+    def _gc_old_jobs(self):
+        jobs = self.search([('create_date', '<', fields.Datetime.now() - timedelta(days=30))])
+        jobs.attachment_id.sudo().unlink()
+        jobs.unlink()
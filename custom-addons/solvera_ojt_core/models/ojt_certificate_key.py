@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+import logging
+import secrets
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+except ImportError:
+    Ed25519PrivateKey = Ed25519PublicKey = serialization = None
+    InvalidSignature = ValueError
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Prefix versi format payload bertanda tangan di QR sertifikat
+SIGNED_PAYLOAD_PREFIX = 'ojt1'
+
+
+def _b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64url_decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class OjtCertificateKey(models.Model):
+    """Kunci Ed25519 untuk menandatangani payload sertifikat yang dapat diverifikasi offline.
+
+    Kunci ``active`` terbaru dipakai untuk menandatangani; kunci yang sudah dipensiunkan
+    tetap dipublikasikan agar sertifikat lama tetap dapat diverifikasi.
+    """
+    _name = 'ojt.certificate.key'
+    _description = 'OJT Certificate Signing Key'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, default='Certificate Signing Key')
+    kid = fields.Char(
+        string='Key ID', required=True, readonly=True, copy=False,
+        default=lambda self: secrets.token_hex(4))
+    public_key = fields.Char(string='Public Key', readonly=True, copy=False)
+    private_key = fields.Char(string='Private Key', readonly=True, copy=False, groups='base.group_system')
+    state = fields.Selection([
+        ('active', 'Active'),
+        ('retired', 'Retired'),
+    ], string='Status', default='active', required=True)
+
+    _sql_constraints = [
+        ('kid_uniq', 'unique(kid)', 'The key ID must be unique!'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if not Ed25519PrivateKey:
+            raise UserError("Library Python 'cryptography' dibutuhkan untuk membuat kunci tanda tangan.")
+        for vals in vals_list:
+            if not vals.get('private_key'):
+                private_key = Ed25519PrivateKey.generate()
+                vals['private_key'] = _b64url_encode(private_key.private_bytes(
+                    serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()))
+                vals['public_key'] = _b64url_encode(private_key.public_key().public_bytes(
+                    serialization.Encoding.Raw, serialization.PublicFormat.Raw))
+        return super(OjtCertificateKey, self).create(vals_list)
+
+    def action_retire(self):
+        return self.write({'state': 'retired'})
+
+    @api.model
+    def _get_signing_key(self):
+        """Kunci aktif terbaru, atau recordset kosong."""
+        if not Ed25519PrivateKey:
+            return self.browse()
+        return self.sudo().search([('state', '=', 'active')], limit=1)
+
+    @api.model
+    def _ensure_signing_key(self):
+        """Kunci aktif, dibuat jika belum ada. Tanpa library 'cryptography' kembalikan
+        recordset kosong: QR sertifikat tetap diterbitkan tanpa tanda tangan."""
+        if not Ed25519PrivateKey:
+            _logger.warning("Library Python 'cryptography' tidak tersedia; QR sertifikat diterbitkan tanpa tanda tangan.")
+            return self.browse()
+        return self._get_signing_key() or self.sudo().create({})
+
+    # Objek kunci di-cache per (id, write_date): perubahan atau penghapusan kunci cukup
+    # membuat kunci cache baru, tanpa mengosongkan ormcache registry
+    @api.model
+    @tools.ormcache('key_id', 'write_date')
+    def _load_signer(self, key_id, write_date):
+        key = self.sudo().browse(key_id)
+        return Ed25519PrivateKey.from_private_bytes(_b64url_decode(key.private_key))
+
+    @api.model
+    @tools.ormcache('key_id', 'write_date')
+    def _load_verifier(self, key_id, write_date):
+        key = self.sudo().browse(key_id)
+        return Ed25519PublicKey.from_public_bytes(_b64url_decode(key.public_key))
+
+    @api.model
+    def _get_verifier(self, kid):
+        key = self.sudo().search_fetch([('kid', '=', kid)], ['write_date'], limit=1)
+        return self._load_verifier(key.id, key.write_date) if key and Ed25519PublicKey else None
+
+    def _sign_claims(self, claims):
+        """``ojt1.<payload>.<signature>``: payload JSON ringkas dengan kunci ``k`` = key ID."""
+        self.ensure_one()
+        payload = json.dumps(dict(claims, k=self.kid), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        encoded = _b64url_encode(payload.encode())
+        signature = self._load_signer(self.id, self.write_date).sign(f'{SIGNED_PAYLOAD_PREFIX}.{encoded}'.encode())
+        return f'{SIGNED_PAYLOAD_PREFIX}.{encoded}.{_b64url_encode(signature)}'
+
+    @api.model
+    def _verify_signed_payload(self, token):
+        """Klaim dalam ``token`` jika tanda tangannya valid untuk kunci yang dipublikasikan,
+        atau ``None``. Sama dengan langkah yang dilakukan verifier offline."""
+        try:
+            prefix, encoded, signature = token.split('.')
+            claims = json.loads(_b64url_decode(encoded))
+            verifier = prefix == SIGNED_PAYLOAD_PREFIX and self._get_verifier(str(claims['k']))
+            if not verifier:
+                return None
+            verifier.verify(_b64url_decode(signature), f'{prefix}.{encoded}'.encode())
+        except (ValueError, KeyError, TypeError, InvalidSignature):
+            return None
+        return claims
+
+    @api.model
+    def _get_key_set(self):
+        """Kunci publik dalam format JWK Set (RFC 8037)."""
+        return {'keys': [{
+            'kty': 'OKP',
+            'crv': 'Ed25519',
+            'alg': 'EdDSA',
+            'use': 'sig',
+            'kid': key.kid,
+            'x': key.public_key,
+            'status': key.state,
+        } for key in self.sudo().search([])]}
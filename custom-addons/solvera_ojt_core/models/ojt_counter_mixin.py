@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api
+
+
+class OjtCounterMixin(models.AbstractModel):
+    _name = 'ojt.counter.mixin'
+    _description = 'OJT Smart Button Counters'
+
+    def _read_counts(self, model, field, domain=None):
+        """Hitung record ``model`` per record di ``self`` dengan satu query berkelompok.
+
+        ``field`` adalah Many2one di ``model`` yang mengarah ke model ini.
+        Mengembalikan ``{record_id: jumlah}``; record tanpa data tidak ada di dict.
+        """
+        record_ids = [rid for rid in self._origin.ids if rid]
+        if not record_ids:
+            return {}
+        groups = self.env[model]._read_group(
+            [(field, 'in', record_ids)] + (domain or []), [field], ['__count'])
+        return {record.id: count for record, count in groups}
+
+    @api.model
+    def _read_grouped_counts(self, model, domain, groupby):
+        """Hitung record ``model`` per kombinasi ``groupby`` dengan satu query berkelompok.
+
+        Mengembalikan ``{(id, id, ...): jumlah}`` sesuai urutan ``groupby``.
+        """
+        groups = self.env[model]._read_group(domain, groupby, ['__count'])
+        return {tuple(record.id for record in group[:-1]): group[-1] for group in groups}
@@ -1,26 +1,41 @@
 # -*- coding: utf-8 -*-
 import uuid
 import base64
-import io
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from datetime import timedelta
 
-try:
-    import qrcode
-except ImportError:
-    qrcode = None
-
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.addons.solvera_ojt_core.models.ojt_qr_image import render_qr_png
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_EVENT_LINK_FIELDS
+from odoo.addons.solvera_ojt_core.models.ojt_versioned_cache import VersionedCache
+
+_logger = logging.getLogger(__name__)
+
+# Field yang disimpan di cache target check-in QR
+CHECKIN_TARGET_FIELDS = {'access_token', 'batch_id', 'event_id', 'qr_mode', 'qr_secret', 'qr_rotation_interval'}
+# ('static', access_token) / ('signed', event_link_id) -> target check-in QR
+checkin_target_cache = VersionedCache('ojt.event.link.checkin_target')
+# Menit setelah sesi berakhir sebelum cron menandai peserta yang tidak hadir
+DEFAULT_ABSENTEE_GRACE_MINUTES = 60
+ABSENTEE_CRON_BATCH_SIZE = 500
 
 class OjtEventLink(models.Model):
     _name = 'ojt.event.link'
     _description = 'OJT Batch to Event Link'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'ojt.counter.mixin']
 
     batch_id = fields.Many2one(
         'ojt.batch', 
         string='OJT Batch', 
         required=True, 
         ondelete='cascade',
+        index=True,
         domain="[('state', '=', 'ongoing')]"
     )
     event_id = fields.Many2one(
@@ -42,11 +57,15 @@ class OjtEventLink(models.Model):
         help="Override/shortcut for the meeting link. If empty, the link from the event will be used.")
 
     title = fields.Char(string='Title', related='event_id.name', readonly=True)
-    date_start = fields.Datetime(string='Date Start', related='event_id.date_begin', readonly=True)
-    date_end = fields.Datetime(string='Date End', related='event_id.date_end', readonly=True)
+    date_start = fields.Datetime(string='Date Start', related='event_id.date_begin', readonly=True, store=True)
+    date_end = fields.Datetime(string='Date End', related='event_id.date_end', readonly=True, store=True, index=True)
+    absentees_marked = fields.Boolean(
+        string='Absentees Marked', readonly=True, copy=False,
+        help="Participants without attendance have been recorded as absent for this session.")
     instructor_id = fields.Many2one('res.partner', string='Instructor / Speaker')
     notes = fields.Text(string='Notes')
     qr_code_image = fields.Binary("QR Code", compute='_compute_qr_code')
+    qr_code_url = fields.Char("QR Code URL", compute='_compute_qr_code')
 
     participant_count = fields.Integer(compute='_compute_related_counts')
     attendance_count = fields.Integer(compute='_compute_related_counts')
@@ -60,6 +79,24 @@ class OjtEventLink(models.Model):
         copy=False,
         default=lambda self: str(uuid.uuid4())
     )
+    qr_mode = fields.Selection([
+        ('static', 'Static Token'),
+        ('signed', 'Rotating Signed Token'),
+    ], string='QR Mode', default='static', required=True,
+        help="Rotating Signed Token: the QR carries the session and a time window signed with a "
+             "per-session secret. It expires after the window and is shown on the projector page.")
+    qr_rotation_interval = fields.Integer(
+        string='QR Rotation (seconds)', default=30,
+        help="Validity window of a signed QR token. The previous window is also accepted.")
+    qr_secret = fields.Char(
+        string='QR Secret', copy=False, groups='base.group_system',
+        default=lambda self: secrets.token_hex(32))
+
+    @api.constrains('qr_rotation_interval')
+    def _check_qr_rotation_interval(self):
+        for record in self:
+            if record.qr_rotation_interval < 5:
+                raise ValidationError("Interval rotasi QR minimal 5 detik.")
 
     @api.constrains('date_start', 'date_end')
     def _check_dates(self):
@@ -70,43 +107,178 @@ class OjtEventLink(models.Model):
 
     @api.depends('batch_id.participant_ids', 'event_id')
     def _compute_related_counts(self):
+        participant_counts = self.batch_id._read_counts('ojt.participant', 'batch_id')
+        attendance_counts = self._read_counts('ojt.attendance', 'event_link_id')
+        assignment_counts = self._read_counts('ojt.assignment', 'event_link_id')
         for rec in self:
-            rec.participant_count = rec.batch_id.participant_count
-            rec.attendance_count = self.env['ojt.attendance'].search_count([('event_link_id', '=', rec.id)])
-            rec.assignment_count = self.env['ojt.assignment'].search_count([('event_link_id', '=', rec.id)])
+            rec.participant_count = participant_counts.get(rec.batch_id.id, 0)
+            rec.attendance_count = attendance_counts.get(rec._origin.id, 0)
+            rec.assignment_count = assignment_counts.get(rec._origin.id, 0)
 
+    @api.depends('access_token', 'qr_mode')
     def _compute_qr_code(self):
+        # QR token statis dibaca dari cache ojt.qr.image yang diisi saat token berubah; QR
+        # bertanda tangan berganti setiap window, dan gambar yang belum disimpan, dibuat
+        # langsung tanpa menulis ke database
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        static_links = self.filtered(lambda link: link.id and link.qr_mode == 'static')
+        images = self.env['ojt.qr.image']._get_images(
+            [link._get_checkin_url(base_url) for link in static_links])
         for rec in self:
-            if qrcode and rec.id:
-                qr_url = f'{base_url}/ojt/attend/{rec.access_token}'
-                img = qrcode.make(qr_url)
-                temp = io.BytesIO()
-                img.save(temp, format="PNG")
-                rec.qr_code_image = base64.b64encode(temp.getvalue())
+            rec.qr_code_image = rec.qr_code_url = False
+            if not rec.id:
+                continue
+            image = rec in static_links and images.get(rec._get_checkin_url(base_url))
+            if image:
+                rec.qr_code_image = image.image
+                rec.qr_code_url = image._get_url()
             else:
-                rec.qr_code_image = False
+                png = render_qr_png(rec._get_checkin_url(base_url))
+                rec.qr_code_image = png and base64.b64encode(png)
+
+    def _ensure_qr_images(self):
+        """Simpan gambar QR token statis agar compute ``qr_code_*`` cukup membaca."""
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        self.env['ojt.qr.image']._ensure_images(
+            [link._get_checkin_url(base_url) for link in self if link.qr_mode == 'static'])
+
+    def _get_checkin_url(self, base_url=None):
+        self.ensure_one()
+        base_url = base_url or self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return f'{base_url}/ojt/attend/{self._get_checkin_token()}'
 
     @api.model_create_multi
     def create(self, vals):
+        # sesi baru tidak perlu membuang cache check-in: hasil kosong tidak pernah disimpan
         new_event_link = super(OjtEventLink, self).create(vals)
+        new_event_link._ensure_qr_images()
+        self.env['ojt.participant.dashboard']._refresh_batches(new_event_link.batch_id)
 
         template = self.env.ref('solvera_ojt_core.mail_template_new_ojt_agenda', raise_if_not_found=False)
-        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-        
-        if template and new_event_link.batch_id.participant_ids:
-            for participant in new_event_link.batch_id.participant_ids:
-                if participant.partner_id.email:
-                    autolog_url = f"{base_url}/my/agenda/join/{new_event_link.id}"
-                    email_context = {
-                        'participant_name_placeholder': participant.partner_id.name,
-                        'participant_email_placeholder': participant.partner_id.email,
-                        'autolog_join_url': autolog_url
-                    }
-                    template.with_context(**email_context).send_mail(new_event_link.id, force_send=True)
+        self.env['ojt.notification.queue']._enqueue_fanout(
+            template, new_event_link, '_notification_messages_new_agenda', broadcast=True)
 
         return new_event_link
 
+    def write(self, vals):
+        old_qr_payloads = [link._get_checkin_url() for link in self if link.qr_mode == 'static'] \
+            if 'access_token' in vals else []
+        batches = self.batch_id if DASHBOARD_EVENT_LINK_FIELDS.intersection(vals) else None
+        res = super(OjtEventLink, self).write(vals)
+        if batches is not None:
+            self.env['ojt.participant.dashboard']._refresh_batches(batches | self.batch_id)
+        if old_qr_payloads:
+            self.env['ojt.qr.image']._drop_images(old_qr_payloads)
+        if 'access_token' in vals or 'qr_mode' in vals:
+            self._ensure_qr_images()
+        if CHECKIN_TARGET_FIELDS.intersection(vals):
+            checkin_target_cache.invalidate(self.env)
+        return res
+
+    def unlink(self):
+        batches = self.batch_id
+        res = super(OjtEventLink, self).unlink()
+        checkin_target_cache.invalidate(self.env)
+        self.env['ojt.participant.dashboard']._refresh_batches(batches)
+        return res
+
+    @api.model
+    def _get_checkin_target(self, access_token):
+        """``(event_link_id, batch_id, event_id)`` untuk token QR, atau ``None``.
+
+        Disimpan di cache worker agar check-in massal tidak mencari token ke database
+        setiap kali; entri sesi dibuang saat sesi diubah atau dihapus.
+        """
+        def compute():
+            event_link = self.sudo().search([('access_token', '=', access_token), ('qr_mode', '=', 'static')], limit=1)
+            return event_link and (event_link.id, event_link.batch_id.id, event_link.event_id.id) or None
+        return checkin_target_cache.get(self.env, ('static', access_token), compute)
+
+    @api.model
+    def _get_signed_checkin_config(self, event_link_id):
+        """``(secret, interval, batch_id, event_id)`` untuk sesi mode token bertanda tangan,
+        atau ``None``. Disimpan di cache worker sehingga verifikasi token cukup membaca versi cache."""
+        def compute():
+            event_link = self.sudo().browse(event_link_id).exists()
+            if not event_link or event_link.qr_mode != 'signed' or not event_link.qr_secret:
+                return None
+            return event_link.qr_secret, event_link.qr_rotation_interval, event_link.batch_id.id, event_link.event_id.id
+        return checkin_target_cache.get(self.env, ('signed', event_link_id), compute)
+
+    @api.model
+    def _sign_checkin_window(self, secret, event_link_id, window):
+        message = f'{event_link_id}.{window}'.encode()
+        return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+    def _get_checkin_token(self, at=None):
+        """Token yang dikodekan di QR: ``access_token`` statis, atau
+        ``<id>.<window>.<signature>`` untuk mode token bertanda tangan."""
+        self.ensure_one()
+        if self.qr_mode != 'signed':
+            return self.access_token
+        link = self.sudo()
+        window = int(at if at is not None else time.time()) // link.qr_rotation_interval
+        return f'{self.id}.{window}.{self._sign_checkin_window(link.qr_secret, self.id, window)}'
+
+    @api.model
+    def _resolve_checkin_token(self, token, at=None):
+        """``(event_link_id, batch_id, event_id)`` untuk token QR statis atau bertanda tangan.
+
+        Token bertanda tangan hanya berlaku pada window saat ``at`` (timestamp, default sekarang)
+        dan satu window sebelumnya. Token statis ditolak untuk sesi mode bertanda tangan.
+        """
+        parts = token.split('.')
+        if len(parts) != 3:
+            return self._get_checkin_target(token)
+        try:
+            event_link_id, window = int(parts[0]), int(parts[1])
+        except ValueError:
+            return None
+        config = self._get_signed_checkin_config(event_link_id)
+        if not config:
+            return None
+        secret, interval, batch_id, event_id = config
+        current_window = int(at if at is not None else time.time()) // interval
+        if window not in (current_window, current_window - 1):
+            return None
+        if not hmac.compare_digest(parts[2], self._sign_checkin_window(secret, event_link_id, window)):
+            return None
+        return event_link_id, batch_id, event_id
+
+    def action_open_qr_projector(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/ojt/attend/projector/{self.id}',
+            'target': 'new',
+        }
+
+    def action_rotate_qr_secret(self):
+        for link in self.sudo():
+            link.qr_secret = secrets.token_hex(32)
+        return True
+
+    def _notification_messages_new_agenda(self, template, context):
+        """Fan-out antrian notifikasi: satu email agenda baru per peserta batch."""
+        self.ensure_one()
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        autolog_url = f"{base_url}/my/agenda/join/{self.id}"
+        return [{
+            'res_id': self.id,
+            'context': dict(
+                context,
+                participant_name_placeholder=participant.partner_id.name,
+                participant_email_placeholder=participant.partner_id.email,
+                autolog_join_url=autolog_url,
+            ),
+            'digest': {
+                'participant_id': participant.id,
+                'event_type': 'agenda',
+                'title': self.event_id.name,
+                'url': f"{base_url}/my/agenda/{self.id}",
+            },
+        } for participant in self.batch_id.participant_ids if participant.partner_id.email]
+
     def action_view_participants(self):
         self.ensure_one()
         return {
@@ -121,43 +293,79 @@ class OjtEventLink(models.Model):
             'view_mode': 'list,form', 'domain': [('event_link_id', '=', self.id)],
         }
 
-    def action_mark_absentees(self):
-        attendance = self.env['ojt.attendance']
-        for session in self:
-            if not session.batch_id:
-                continue
+    def _mark_absentees(self):
+        """Catat ``absent`` untuk setiap peserta batch yang belum punya absensi di sesi ini.
+
+        Satu ``INSERT ... SELECT`` anti-join untuk semua sesi sekaligus; sesi ditandai
+        ``absentees_marked``. Mengembalikan ``{event_link_id: jumlah absensi baru}``.
+        """
+        if not self:
+            return {}
+        Attendance = self.env['ojt.attendance']
+        self.flush_recordset(['batch_id', 'event_id'])
+        self.env['ojt.participant'].flush_model(['batch_id'])
+        Attendance.flush_model(['participant_id', 'event_link_id'])
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO ojt_attendance (participant_id, event_link_id, batch_id, event_id, check_in, presence, method,
+                                        create_uid, create_date, write_uid, write_date)
+                 SELECT p.id, l.id, l.batch_id, l.event_id, %(now)s, 'absent', 'manual',
+                        %(uid)s, %(now)s, %(uid)s, %(now)s
+                   FROM ojt_event_link l
+                   JOIN ojt_participant p ON p.batch_id = l.batch_id
+                  WHERE l.id = ANY(%(ids)s)
+                    AND NOT EXISTS (SELECT 1
+                                      FROM ojt_attendance a
+                                     WHERE a.participant_id = p.id
+                                       AND a.event_link_id = l.id)
+            ON CONFLICT ON CONSTRAINT ojt_attendance_participant_event_link_uniq DO NOTHING
+              RETURNING id, participant_id, event_link_id
+            """, ids=self.ids, uid=self.env.uid, now=now,
+        ))
+        rows = self.env.cr.fetchall()
+        self.write({'absentees_marked': True})
+
+        counts = dict.fromkeys(self.ids, 0)
+        for _attendance_id, _participant_id, event_link_id in rows:
+            counts[event_link_id] += 1
+        # beri tahu ORM agar field turunan (mis. attendance_rate peserta) dihitung ulang
+        self.env['ojt.participant'].browse({row[1] for row in rows}).invalidate_recordset(['attendance_ids'])
+        Attendance.browse([row[0] for row in rows]).modified(['participant_id', 'event_link_id', 'presence'], create=True)
+        return counts
+
+    @api.model
+    def _cron_mark_absentees(self, limit=ABSENTEE_CRON_BATCH_SIZE):
+        """Tandai peserta yang tidak hadir setelah sesi berakhir ditambah masa tenggang.
 
-            all_participants = session.batch_id.participant_ids
-
-            attended_participant_ids = attendance.search([
-                ('event_link_id', '=', session.id)
-            ]).mapped('participant_id')
-
-            absentee_participants = all_participants - attended_participant_ids
-
-            if not absentee_participants:
-                raise models.UserError("Semua peserta sudah tercatat kehadirannya.")
-
-            attendance_vals_list = []
-            for participant in absentee_participants:
-                attendance_vals_list.append({
-                    'participant_id': participant.id,
-                    'event_link_id': session.id,
-                    'batch_id': session.batch_id.id,
-                    'event_id': session.event_id.id,
-                    'check_in': fields.Datetime.now(),
-                    'presence': 'absent',
-                    'method': 'manual',
-                })
-
-            attendance.create(attendance_vals_list)
-
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Proses Selesai',
-                    'message': f'{len(absentee_participants)} peserta telah ditandai sebagai "Absent".',
-                    'type': 'success',
-                }
-            }
\ No newline at end of file
+        Hanya sesi batch yang sedang berjalan; sesi lama di batch selesai atau dibatalkan
+        tidak diisi absensi secara massal.
+        """
+        grace = int(self.env['ir.config_parameter'].sudo().get_param(
+            'solvera_ojt_core.absentee_grace_minutes', DEFAULT_ABSENTEE_GRACE_MINUTES))
+        domain = [
+            ('absentees_marked', '=', False),
+            ('batch_id.state', '=', 'ongoing'),
+            ('date_end', '<=', fields.Datetime.now() - timedelta(minutes=grace)),
+        ]
+        sessions = self.search(domain, order='date_end, id', limit=limit)
+        counts = sessions._mark_absentees()
+        _logger.info("OJT: marked %s absentees for %s sessions", sum(counts.values()), len(sessions))
+        if len(sessions) == limit:
+            self.env['ir.cron']._notify_progress(done=len(sessions), remaining=self.search_count(domain))
+        return True
+
+    def action_mark_absentees(self):
+        counts = self.filtered('batch_id')._mark_absentees()
+        total = sum(counts.values())
+        if not total:
+            raise UserError("Semua peserta sudah tercatat kehadirannya.")
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Proses Selesai',
+                'message': f'{total} peserta dari {len(counts)} sesi telah ditandai sebagai "Absent".',
+                'type': 'success',
+            }
+        }
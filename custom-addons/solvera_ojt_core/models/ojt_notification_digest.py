@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+
+class OjtNotificationDigest(models.Model):
+    _name = 'ojt.notification.digest'
+    _description = 'OJT Notification Digest Item'
+    _order = 'participant_id, id'
+    _rec_name = 'title'
+
+    participant_id = fields.Many2one(
+        'ojt.participant', string='Participant', required=True, index=True, ondelete='cascade')
+    event_type = fields.Selection([
+        ('agenda', 'New Agenda'),
+        ('assignment', 'New Assignment'),
+        ('score', 'Score'),
+        ('survey', 'Survey'),
+    ], string='Event', required=True)
+    title = fields.Char(string='Title', required=True)
+    url = fields.Char(string='URL')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+    ], string='Status', default='pending', required=True, index=True)
+
+    @api.model
+    def _divert_messages(self, messages):
+        """Simpan message milik peserta dengan mode digest ke buffer.
+
+        Message yang memiliki kunci ``digest`` (``participant_id``, ``event_type``,
+        ``title``, ``url``) dan pesertanya memakai mode digest tidak dikirim langsung.
+        Mengembalikan message yang tetap harus dikirim.
+        """
+        participant_ids = {message['digest']['participant_id'] for message in messages if message.get('digest')}
+        if not participant_ids:
+            return messages
+        digest_ids = set(self.env['ojt.participant'].sudo().browse(participant_ids)._filter_digest().ids)
+        if not digest_ids:
+            return messages
+
+        to_send, vals_list = [], []
+        for message in messages:
+            digest = message.get('digest')
+            if digest and digest['participant_id'] in digest_ids:
+                vals_list.append({
+                    'participant_id': digest['participant_id'],
+                    'event_type': digest['event_type'],
+                    'title': digest['title'],
+                    'url': digest.get('url'),
+                })
+            else:
+                to_send.append(message)
+        self.sudo().create(vals_list)
+        return to_send
+
+    @api.model
+    def _cron_send_digests(self):
+        """Kirim satu email ringkasan per peserta untuk semua item yang tertunda."""
+        template = self.env.ref('solvera_ojt_core.mail_template_ojt_digest', raise_if_not_found=False)
+        if not template:
+            return True
+
+        items = self.search([('state', '=', 'pending')])
+        event_labels = dict(self._fields['event_type']._description_selection(self.env))
+        messages = []
+        for participant, participant_items in items.grouped('participant_id').items():
+            if not participant.partner_id.email:
+                continue
+            messages.append({
+                'res_id': participant.id,
+                'context': {
+                    'digest_items': [{
+                        'event_type': event_labels[item.event_type],
+                        'title': item.title,
+                        'url': item.url,
+                    } for item in participant_items],
+                },
+            })
+        self.env['ojt.notification.queue']._enqueue(template, messages)
+        items.write({'state': 'sent'})
+        return True
+
+    @api.autovacuum
+    def _gc_sent_digest_items(self):
+        limit_date = fields.Datetime.now() - timedelta(days=30)
+        self.search([('state', '=', 'sent'), ('write_date', '<', limit_date)]).unlink()
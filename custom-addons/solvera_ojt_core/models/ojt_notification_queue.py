@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+from datetime import timedelta
+
+from markupsafe import escape
+
+from odoo import models, fields, api, Command
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 60  # detik, dikalikan dua setiap percobaan gagal
+
+# Field template yang dirender, sama seperti mail.template.send_mail()
+BROADCAST_RENDER_FIELDS = (
+    'attachment_ids', 'auto_delete', 'body_html', 'email_cc', 'email_from', 'email_to',
+    'mail_server_id', 'model', 'partner_to', 'reply_to', 'report_template_ids', 'res_id',
+    'scheduled_date', 'subject',
+)
+BROADCAST_SUBSTITUTE_FIELDS = ('subject', 'email_to', 'email_cc', 'reply_to')
+
+
+class OjtNotificationQueue(models.Model):
+    _name = 'ojt.notification.queue'
+    _description = 'OJT Notification Outbox'
+    _order = 'id desc'
+    _rec_name = 'template_id'
+
+    template_id = fields.Many2one('mail.template', string='Template', required=True, ondelete='cascade')
+    res_model = fields.Char(string='Model', required=True)
+    res_id = fields.Many2oneReference(string='Record ID', model_field='res_model', required=True)
+    context = fields.Json(string='Render Context')
+    email_values = fields.Json(string='Email Values')
+    fanout_method = fields.Char(
+        string='Fan-out Method',
+        help="If set, this row is expanded by the worker into one row per recipient "
+             "by calling this method on the source record.")
+    broadcast = fields.Boolean(
+        string='Broadcast',
+        help="Render the template once for the source record and personalize it per recipient, "
+             "instead of rendering a full email for every recipient.")
+
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    next_attempt = fields.Datetime(string='Next Attempt', default=fields.Datetime.now, index=True)
+    sent_date = fields.Datetime(string='Sent On', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    @api.model
+    def _enqueue(self, template, messages):
+        """Antrikan satu email per item ``messages``.
+
+        Setiap item adalah dict dengan kunci ``res_id`` dan opsional ``context``,
+        ``email_values`` serta ``res_model`` (default: model template). Item dengan
+        kunci ``digest`` dialihkan ke buffer digest jika pesertanya memakai mode digest.
+        """
+        if not template or not messages:
+            return self.browse()
+        messages = self.env['ojt.notification.digest']._divert_messages(messages)
+        if not messages:
+            return self.browse()
+        vals_list = [{
+            'template_id': template.id,
+            'res_model': message.get('res_model') or template.model,
+            'res_id': message['res_id'],
+            'context': message.get('context') or {},
+            'email_values': message.get('email_values') or {},
+        } for message in messages]
+        jobs = self.sudo().create(vals_list)
+        self._trigger_worker()
+        return jobs
+
+    @api.model
+    def _enqueue_fanout(self, template, records, method, context=None, broadcast=False):
+        """Antrikan satu baris per record sumber; penerima dihitung oleh worker.
+
+        ``method`` dipanggil pada record sumber dengan ``(template, context)`` dan harus
+        mengembalikan list message seperti pada :meth:`_enqueue`. Dengan begitu biaya di
+        sisi request tidak bergantung pada jumlah peserta.
+
+        Dengan ``broadcast=True`` semua message harus memakai ``res_id`` record sumber;
+        worker merender template sekali lalu mempersonalisasi hasilnya per penerima
+        (lihat :meth:`_render_broadcast`).
+        """
+        if not template or not records:
+            return self.browse()
+        jobs = self.sudo().create([{
+            'template_id': template.id,
+            'res_model': records._name,
+            'res_id': record.id,
+            'context': context or {},
+            'fanout_method': method,
+            'broadcast': broadcast,
+        } for record in records])
+        self._trigger_worker()
+        return jobs
+
+    @api.model
+    def _trigger_worker(self):
+        cron = self.env.ref('solvera_ojt_core.ir_cron_ojt_notification_queue', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _get_queue_params(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (
+            int(get_param('solvera_ojt_core.notification_chunk_size', DEFAULT_CHUNK_SIZE)),
+            int(get_param('solvera_ojt_core.notification_max_attempts', DEFAULT_MAX_ATTEMPTS)),
+            int(get_param('solvera_ojt_core.notification_retry_delay', DEFAULT_RETRY_DELAY)),
+        )
+
+    def _claim_chunk(self, limit):
+        """Ambil baris yang siap dikirim, melewati baris yang sedang dikunci worker lain."""
+        self.flush_model(['state', 'next_attempt'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT id FROM ojt_notification_queue
+             WHERE state = 'pending' AND next_attempt <= %s
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+            """, fields.Datetime.now(), limit,
+        ))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _process_queue(self, chunk_size=None):
+        """Kirim antrian per chunk; setiap chunk di-commit sendiri."""
+        default_chunk_size, max_attempts, retry_delay = self._get_queue_params()
+        chunk_size = chunk_size or default_chunk_size
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+
+        while True:
+            jobs = self._claim_chunk(chunk_size)
+            if not jobs:
+                break
+            jobs._send(max_attempts, retry_delay)
+            if auto_commit:
+                self.env.cr.commit()
+            remaining = self.search_count([('state', '=', 'pending'), ('next_attempt', '<=', fields.Datetime.now())])
+            self.env['ir.cron']._notify_progress(done=len(jobs), remaining=remaining)
+        return True
+
+    def _send(self, max_attempts=DEFAULT_MAX_ATTEMPTS, retry_delay=DEFAULT_RETRY_DELAY):
+        done = self.browse()
+        for job in self:
+            try:
+                with self.env.cr.savepoint():
+                    job._dispatch()
+            except Exception as e:
+                attempts = job.attempts + 1
+                _logger.warning("OJT notification %s failed (attempt %s): %s", job.id, attempts, e)
+                job.write({
+                    'attempts': attempts,
+                    'last_error': str(e),
+                    'state': 'failed' if attempts >= max_attempts else 'pending',
+                    'next_attempt': fields.Datetime.now() + timedelta(seconds=retry_delay * 2 ** (attempts - 1)),
+                })
+            else:
+                done |= job
+        for attempts, jobs in done.grouped('attempts').items():
+            jobs.write({
+                'state': 'sent',
+                'attempts': attempts + 1,
+                'sent_date': fields.Datetime.now(),
+                'last_error': False,
+            })
+
+    def _dispatch(self):
+        self.ensure_one()
+        record = self.env[self.res_model].browse(self.res_id).exists()
+        if not record:
+            return
+        if self.res_model == 'mail.mail':
+            # penerima broadcast yang gagal: kirim ulang mail.mail yang sudah dirender
+            mail = record.sudo()
+            if mail.state == 'exception':
+                mail.mark_outgoing()
+            mail.send(raise_exception=True)
+            return
+        if self.fanout_method:
+            messages = getattr(record, self.fanout_method)(self.template_id, self.context or {})
+            if self.broadcast:
+                self._send_broadcast(self.template_id, self.res_id, messages)
+            else:
+                self._enqueue(self.template_id, messages)
+            return
+        self.template_id.with_context(**(self.context or {})).send_mail(
+            self.res_id,
+            force_send=True,
+            raise_exception=True,
+            email_values=self.email_values or None,
+        )
+
+    @api.model
+    def _render_broadcast(self, template, res_id, messages):
+        """Render ``template`` sekali untuk ``res_id`` dan hasilkan nilai ``mail.mail``
+        untuk setiap message.
+
+        Nilai context yang sama untuk semua penerima dipakai apa adanya; nilai yang
+        berbeda diganti token saat render lalu disubstitusi per penerima. Karena itu
+        nilai personal hanya boleh dipakai sebagai teks di template, bukan sebagai kondisi.
+        """
+        if not messages:
+            return []
+        contexts = [message.get('context') or {} for message in messages]
+        keys = {key for ctx in contexts for key in ctx}
+        render_ctx, tokens = {}, {}
+        for key in keys:
+            first = contexts[0].get(key)
+            if all(ctx.get(key) == first for ctx in contexts[1:]):
+                render_ctx[key] = first
+            else:
+                tokens[key] = f'__ojt_broadcast_{key}__'
+                render_ctx[key] = tokens[key]
+
+        values = template.with_context(**render_ctx)._generate_template([res_id], BROADCAST_RENDER_FIELDS)[res_id]
+        values['recipient_ids'] = [Command.link(pid) for pid in values.pop('partner_ids', [])]
+        # lampiran laporan dibuat sekali di record sumber dan dipakai bersama semua email
+        attachment_ids = list(values.get('attachment_ids', []))
+        for name, datas in values.pop('attachments', []):
+            attachment_ids.append(self.env['ir.attachment'].sudo().create({
+                'name': name,
+                'datas': datas,
+                'type': 'binary',
+                'res_model': template.model,
+                'res_id': res_id,
+            }).id)
+        values['attachment_ids'] = [Command.link(aid) for aid in attachment_ids]
+        if values.get('body_html'):
+            values['body_html'] = self._render_broadcast_layout(template, res_id, values['body_html'])
+
+        vals_list = []
+        for message, ctx in zip(messages, contexts):
+            mail_values = dict(values)
+            for key, token in tokens.items():
+                value = ctx.get(key) or ''
+                if mail_values.get('body_html'):
+                    mail_values['body_html'] = mail_values['body_html'].replace(token, escape(value))
+                for fname in BROADCAST_SUBSTITUTE_FIELDS:
+                    if mail_values.get(fname):
+                        mail_values[fname] = mail_values[fname].replace(token, str(value))
+            mail_values.update(message.get('email_values') or {})
+            if 'email_from' in mail_values and not mail_values.get('email_from'):
+                mail_values.pop('email_from')
+            vals_list.append(mail_values)
+        return vals_list
+
+    @api.model
+    def _render_broadcast_layout(self, template, res_id, body):
+        """Bungkus ``body`` dengan ``email_layout_xmlid`` template, seperti ``send_mail``."""
+        if not template.email_layout_xmlid:
+            return body
+        record = self.env[template.model].browse(res_id)
+        company = record.company_id if 'company_id' in record and record.company_id else self.env.company
+        layout = self.env['ir.qweb']._render(template.email_layout_xmlid, {
+            'message': self.env['mail.message'].sudo().new({'body': body, 'record_name': record.display_name}),
+            'model_description': self.env['ir.model']._get(record._name).display_name,
+            'company': company,
+        }, minimal_qcontext=True, raise_if_not_found=False)
+        if not layout:
+            _logger.warning("OJT broadcast: layout %s not found, sending without layout", template.email_layout_xmlid)
+            return body
+        return self.env['mail.render.mixin']._replace_local_links(layout)
+
+    @api.model
+    def _send_broadcast(self, template, res_id, messages):
+        """Kirim semua email broadcast sekaligus; email yang gagal diantrikan ulang satu per
+        satu sehingga mengikuti percobaan ulang dan backoff outbox."""
+        messages = self.env['ojt.notification.digest']._divert_messages(messages)
+        if not messages:
+            return self.env['mail.mail']
+        mails = self.env['mail.mail'].sudo().create(self._render_broadcast(template, res_id, messages))
+        mails.send(raise_exception=False)
+        self._enqueue_failed_mails(template, mails.exists().filtered(lambda mail: mail.state == 'exception'))
+        return mails
+
+    @api.model
+    def _enqueue_failed_mails(self, template, mails):
+        if not mails:
+            return self.browse()
+        _default_chunk_size, _max_attempts, retry_delay = self._get_queue_params()
+        return self.sudo().create([{
+            'template_id': template.id,
+            'res_model': 'mail.mail',
+            'res_id': mail.id,
+            'attempts': 1,
+            'last_error': mail.failure_reason,
+            'next_attempt': fields.Datetime.now() + timedelta(seconds=retry_delay),
+        } for mail in mails])
+
+    def action_retry(self):
+        self.filtered(lambda j: j.state == 'failed').write({
+            'state': 'pending',
+            'attempts': 0,
+            'next_attempt': fields.Datetime.now(),
+        })
+        self._trigger_worker()
+        return True
+
+    def action_process_now(self):
+        self._trigger_worker()
+        return True
+
+    @api.autovacuum
+    def _gc_sent_notifications(self):
+        limit_date = fields.Datetime.now() - timedelta(days=30)
+        self.search([('state', '=', 'sent'), ('sent_date', '<', limit_date)]).unlink()
@@ -1,17 +1,30 @@
 # -*- coding: utf-8 -*-
+import secrets
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL, float_compare
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_PARTICIPANT_FIELDS
+from odoo.addons.solvera_ojt_core.models.ojt_versioned_cache import VersionedCache
+
+# Field yang disimpan di cache keanggotaan check-in QR
+CHECKIN_MEMBERSHIP_FIELDS = {'partner_id', 'batch_id', 'state'}
+# (partner_id, batch_id) -> id peserta aktif, untuk jalur check-in QR
+active_participant_cache = VersionedCache('ojt.participant.active')
+
+# Field survey.user_input yang perubahannya dapat mengubah score_quiz peserta
+QUIZ_SCORE_INPUT_FIELDS = {'partner_id', 'survey_id', 'state', 'scoring_percentage'}
 
 class OjtParticipant(models.Model):
     _name = 'ojt.participant'
     _description = 'OJT Participant'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin', 'ojt.counter.mixin']
 
     name = fields.Char(string='Name', compute='_compute_name', store=True, index=True)
     
     batch_id = fields.Many2one('ojt.batch', string='OJT Batch', required=True, ondelete='cascade', tracking=True)
     partner_id = fields.Many2one(
-        'res.partner', string='Participant', required=True, tracking=True,
+        'res.partner', string='Participant', required=True, tracking=True, index=True,
         help="Link to the contact record of the participant.")
     applicant_id = fields.Many2one(
         'hr.applicant', string='Recruitment Applicant', 
@@ -39,14 +52,31 @@ class OjtParticipant(models.Model):
     attendance_rate = fields.Float(string="Attendance Rate (%)", compute='_compute_attendance_rate', store=True, group_operator="avg")
     score_avg = fields.Float(string='Average Score', compute='_compute_scores', store=True, digits=(16, 2))
     score_final = fields.Float(string='Final Score', compute='_compute_scores', store=True, digits=(16, 2))
+    score_quiz = fields.Float(string='Quiz Score', compute='_compute_score_quiz', store=True, digits=(16, 2))
+    # Akumulator nilai tugas, diperbarui secara delta oleh ojt.assignment.submit dan ojt.assignment
+    score_weighted_sum = fields.Float(compute='_compute_score_accumulators', store=True, readonly=True)
+    score_weight_total = fields.Float(compute='_compute_score_accumulators', store=True, readonly=True)
+    # Kontribusi tugas dengan nilai terendah, hanya terisi jika kebijakan batch membuang nilai terendah
+    score_drop_sum = fields.Float(compute='_compute_score_drop', store=True, readonly=True)
+    score_drop_weight = fields.Float(compute='_compute_score_drop', store=True, readonly=True)
     
     assignment_submit_count = fields.Integer(compute='_compute_related_counts')
     certificate_count = fields.Integer(compute='_compute_related_counts')
     course_count = fields.Integer(compute='_compute_related_counts')
     survey_count = fields.Integer(compute='_compute_related_counts')
 
+    notification_mode = fields.Selection([
+        ('batch', 'Follow Batch'),
+        ('instant', 'Instant'),
+        ('digest', 'Daily Digest'),
+    ], string='Notification Mode', default='batch', required=True)
+
     mentor_score = fields.Float(string="Mentor Score", tracking=True, help="Nilai akhir atau evaluasi dari mentor terhadap peserta.")
-    portal_token = fields.Char(string='Portal Access Token', index=True, copy=False)
+    portal_token = fields.Char(
+        string='Portal Access Token', index=True, copy=False, default=lambda self: secrets.token_urlsafe(32))
+    calendar_url = fields.Char(
+        string='Calendar Feed URL', compute='_compute_calendar_url',
+        help="Subscribable iCalendar feed of the batch agenda, authenticated by the portal token.")
     notes = fields.Text(string='Internal Notes')
     company_id = fields.Many2one('res.company', string='Company', required=True, default=lambda self: self.env.company)
 
@@ -59,6 +89,19 @@ class OjtParticipant(models.Model):
         for participant in self:
             participant.access_url = '/my/dashboard'
 
+    @api.depends('portal_token')
+    def _compute_calendar_url(self):
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        for participant in self:
+            participant.calendar_url = participant.portal_token and \
+                f'{base_url}/ojt/calendar/{participant.portal_token}.ics'
+
+    def action_reset_portal_token(self):
+        """Ganti token portal; link kalender lama tidak berlaku lagi."""
+        for participant in self:
+            participant.portal_token = secrets.token_urlsafe(32)
+        return True
+
     def write(self, vals):
         participants_to_notify = self.browse()
         if 'mentor_score' in vals and vals.get('mentor_score'):
@@ -66,25 +109,136 @@ class OjtParticipant(models.Model):
 
         res = super(OjtParticipant, self).write(vals)
 
+        if CHECKIN_MEMBERSHIP_FIELDS.intersection(vals):
+            active_participant_cache.invalidate(self.env)
+
+        if 'partner_id' in vals:
+            # partner_id sertifikat adalah related tersimpan, dihitung ulang tanpa write()
+            self.env['ojt.certificate']._invalidate_verification([('participant_id', 'in', self.ids)])
+
+        if DASHBOARD_PARTICIPANT_FIELDS.intersection(vals):
+            self.env['ojt.participant.dashboard']._refresh(self)
+
         if participants_to_notify:
             participants_to_notify._send_mentor_score_notification()
             
         return res
-    
+
+    def unlink(self):
+        res = super(OjtParticipant, self).unlink()
+        active_participant_cache.invalidate(self.env)
+        return res
+
+    @api.model
+    def _get_active_participant_id(self, partner_id, batch_id):
+        """ID peserta aktif untuk partner di batch, atau ``None``; disimpan di cache worker
+        untuk jalur check-in QR dan dibuang saat keanggotaan peserta berubah."""
+        def compute():
+            return self.sudo().search([
+                ('partner_id', '=', partner_id),
+                ('batch_id', '=', batch_id),
+                ('state', '=', 'active'),
+            ], limit=1).id or None
+        return active_participant_cache.get(self.env, (partner_id, batch_id), compute)
+
+    @api.model
+    def _get_calendar_target(self, portal_token):
+        """``(batch_id, versi, last_modified)`` agenda batch peserta aktif/selesai dengan
+        ``portal_token``, atau ``None``; satu query. Versi berubah setiap kali batch, sesi
+        atau event sesi ditulis, dibuat atau dihapus."""
+        if not portal_token:
+            return None
+        for model in ('ojt.participant', 'ojt.batch', 'ojt.event.link', 'event.event'):
+            self.env[model].flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT p.batch_id,
+                   GREATEST(b.write_date, MAX(l.write_date), MAX(e.write_date)),
+                   COUNT(l.id)
+              FROM ojt_participant p
+              JOIN ojt_batch b ON b.id = p.batch_id
+         LEFT JOIN ojt_event_link l ON l.batch_id = p.batch_id
+         LEFT JOIN event_event e ON e.id = l.event_id
+             WHERE p.portal_token = %(token)s
+               AND p.state IN ('active', 'completed')
+          GROUP BY p.id, p.batch_id, b.write_date
+             LIMIT 1
+            """, token=portal_token,
+        ))
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+        batch_id, last_modified, count = row
+        last_modified = last_modified.replace(microsecond=0)
+        return batch_id, f'{last_modified.isoformat()}-{count}', last_modified
+
+    @api.model
+    def _get_portal_versions(self, partner_id, scope_model=None, scope_id=None):
+        """Versi konten portal per peserta aktif/selesai milik ``partner_id``, dalam satu query.
+
+        Versi berubah setiap kali peserta, submission, absensi, snapshot dashboard, batch,
+        atau tugas dan sesi batch ditulis, dibuat atau dihapus (jumlah baris ikut dihitung).
+        ``scope_model``/``scope_id`` membatasi ke batch milik record tersebut, misalnya sesi
+        ``ojt.event.link`` yang sedang dibuka. Mengembalikan ``{participant_id: (batch_id, versi)}``.
+        """
+        for model in ('ojt.participant', 'ojt.participant.dashboard', 'ojt.batch', 'ojt.assignment.submit',
+                      'ojt.attendance', 'ojt.assignment', 'ojt.event.link', 'event.event'):
+            self.env[model].flush_model()
+        scope = SQL("TRUE")
+        if scope_model:
+            scope = SQL("p.batch_id = (SELECT batch_id FROM %s WHERE id = %s)",
+                        SQL.identifier(self.env[scope_model]._table), scope_id)
+        self.env.cr.execute(SQL(
+            """
+            SELECT p.id, p.batch_id,
+                   concat_ws('|', p.write_date, b.write_date, d.write_date,
+                             s.changed, s.total, a.changed, a.total, t.changed, t.total, l.changed, l.total)
+              FROM ojt_participant p
+              JOIN ojt_batch b ON b.id = p.batch_id
+         LEFT JOIN ojt_participant_dashboard d ON d.participant_id = p.id
+             CROSS JOIN LATERAL (SELECT MAX(write_date), COUNT(*) FROM ojt_assignment_submit
+                                  WHERE participant_id = p.id) s(changed, total)
+             CROSS JOIN LATERAL (SELECT MAX(write_date), COUNT(*) FROM ojt_attendance
+                                  WHERE participant_id = p.id) a(changed, total)
+             CROSS JOIN LATERAL (SELECT MAX(write_date), COUNT(*) FROM ojt_assignment
+                                  WHERE batch_id = p.batch_id) t(changed, total)
+             CROSS JOIN LATERAL (SELECT MAX(GREATEST(ol.write_date, e.write_date)), COUNT(*)
+                                   FROM ojt_event_link ol
+                                   JOIN event_event e ON e.id = ol.event_id
+                                  WHERE ol.batch_id = p.batch_id) l(changed, total)
+             WHERE p.partner_id = %(partner_id)s
+               AND p.state IN ('active', 'completed')
+               AND %(scope)s
+          ORDER BY p.id
+            """, partner_id=partner_id, scope=scope,
+        ))
+        return {participant_id: (batch_id, version) for participant_id, batch_id, version in self.env.cr.fetchall()}
+
     def _send_mentor_score_notification(self):
         template = self.env.ref('solvera_ojt_core.mail_template_mentor_score', raise_if_not_found=False)
         if not template:
             return
 
+        messages = []
         for participant in self:
             if participant.partner_id.email:
                 portal_url = participant.get_portal_url(query_string=f'participant_id={participant.id}')
-                
-                template_ctx = {'url_portal_dashboard': portal_url}
-                template.with_context(template_ctx).send_mail(
-                    participant.id,
-                    force_send=True
-                )
+                messages.append({
+                    'res_id': participant.id,
+                    'context': {'url_portal_dashboard': portal_url},
+                    'digest': {
+                        'participant_id': participant.id,
+                        'event_type': 'score',
+                        'title': f"Evaluasi Mentor: {participant.mentor_score:g} / 100",
+                        'url': portal_url,
+                    },
+                })
+        self.env['ojt.notification.queue']._enqueue(template, messages)
+
+    def _filter_digest(self):
+        """Peserta yang notifikasinya dikumpulkan dalam digest harian."""
+        return self.filtered(lambda p: p.notification_mode == 'digest' or (
+            p.notification_mode == 'batch' and p.batch_id.notification_mode == 'digest'))
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -98,7 +252,10 @@ class OjtParticipant(models.Model):
                         f"because its status is '{batch.state}'."
                     )
                     
-        return super(OjtParticipant, self).create(vals_list)
+        # peserta baru tidak perlu membuang cache check-in: hasil kosong tidak pernah disimpan
+        participants = super(OjtParticipant, self).create(vals_list)
+        self.env['ojt.participant.dashboard']._create_snapshots(participants)
+        return participants
     
     @api.depends('partner_id.name', 'batch_id.name')
     def _compute_name(self):
@@ -108,62 +265,239 @@ class OjtParticipant(models.Model):
     @api.depends('submission_ids', 'certificate_ids', 'course_ids', 'partner_id', 'batch_id.survey_id')
     def _compute_related_counts(self):
         """ Efficiently computes all smart button counters in one go. """
+        submission_counts = self._read_counts('ojt.assignment.submit', 'participant_id')
+        certificate_counts = self._read_counts('ojt.certificate', 'participant_id')
+        survey_counts = {}
+        if self.batch_id.survey_id and self.partner_id:
+            survey_counts = self._read_grouped_counts('survey.user_input', [
+                ('partner_id', 'in', self.partner_id.ids),
+                ('survey_id', 'in', self.batch_id.survey_id.ids),
+            ], ['partner_id', 'survey_id'])
         for rec in self:
-            rec.assignment_submit_count = len(rec.submission_ids)
-            rec.certificate_count = len(rec.certificate_ids)
+            rec.assignment_submit_count = submission_counts.get(rec._origin.id, 0)
+            rec.certificate_count = certificate_counts.get(rec._origin.id, 0)
             rec.course_count = len(rec.course_ids)
-            if rec.partner_id and rec.batch_id.survey_id:
-                rec.survey_count = self.env['survey.user_input'].search_count([
-                    ('partner_id', '=', rec.partner_id.id),
-                    ('survey_id', '=', rec.batch_id.survey_id.id)
-                ])
-            else:
-                rec.survey_count = 0
-
-    @api.depends('attendance_ids.presence', 'batch_id.event_link_ids.is_mandatory')
+            rec.survey_count = survey_counts.get((rec.partner_id.id, rec.batch_id.survey_id.id), 0)
+
+    @api.depends('batch_id', 'attendance_ids.presence', 'attendance_ids.event_link_id',
+                 'batch_id.event_link_ids.is_mandatory')
     def _compute_attendance_rate(self):
+        attendance_data = self._get_attendance_data()
         for rec in self:
-            mandatory_sessions = rec.batch_id.event_link_ids.filtered(lambda l: l.is_mandatory)
-            total_mandatory_sessions = len(mandatory_sessions)
-            
-            present_attendances = rec.attendance_ids.filtered(
-                lambda a: a.event_link_id.is_mandatory and a.presence in ('present', 'late'))
-            rec.attendance_count = len(present_attendances)
+            present_count, mandatory_count = attendance_data.get(rec._origin.id, (0, 0))
+            rec.attendance_count = present_count
+            rec.attendance_rate = (present_count / mandatory_count) * 100.0 if mandatory_count > 0 else 0.0
 
-            rec.attendance_rate = (rec.attendance_count / total_mandatory_sessions) * 100.0 if total_mandatory_sessions > 0 else 0.0
-            
-    @api.depends('submission_ids.score', 'submission_ids.state', 
-                    'submission_ids.assignment_id.weight', 'submission_ids.assignment_id.max_score', 
-                    'mentor_score', 'batch_id.survey_id')
+    def _get_attendance_data(self):
+        """``{participant_id: (jumlah hadir di sesi wajib, jumlah sesi wajib batch)}`` dalam satu query."""
+        participant_ids = [pid for pid in self._origin.ids if pid]
+        if not participant_ids:
+            return {}
+        self.flush_model(['batch_id'])
+        self.env['ojt.attendance'].flush_model(['participant_id', 'event_link_id', 'presence'])
+        self.env['ojt.event.link'].flush_model(['batch_id', 'is_mandatory'])
+        self.env.cr.execute(SQL(
+            """
+            WITH mandatory AS (
+                SELECT l.batch_id, COUNT(*) AS total
+                  FROM ojt_event_link l
+                 WHERE l.is_mandatory
+                   AND l.batch_id IN (SELECT batch_id FROM ojt_participant WHERE id = ANY(%(ids)s))
+              GROUP BY l.batch_id
+            ), present AS (
+                SELECT a.participant_id, COUNT(*) AS total
+                  FROM ojt_attendance a
+                  JOIN ojt_event_link l ON l.id = a.event_link_id
+                 WHERE a.participant_id = ANY(%(ids)s)
+                   AND l.is_mandatory
+                   AND a.presence IN ('present', 'late')
+              GROUP BY a.participant_id
+            )
+            SELECT p.id, COALESCE(present.total, 0), COALESCE(mandatory.total, 0)
+              FROM ojt_participant p
+         LEFT JOIN mandatory ON mandatory.batch_id = p.batch_id
+         LEFT JOIN present ON present.participant_id = p.id
+             WHERE p.id = ANY(%(ids)s)
+            """, ids=participant_ids,
+        ))
+        return {pid: (present_count, mandatory_count) for pid, present_count, mandatory_count in self.env.cr.fetchall()}
+
+    @api.depends('score_weighted_sum', 'score_weight_total', 'score_drop_sum', 'score_drop_weight',
+                 'mentor_score', 'score_quiz', 'batch_id.scoring_policy_id.version')
     def _compute_scores(self):
-        weight_assignment, weight_mentor, weight_quiz = 0.7, 0.2, 0.1
+        """Evaluasi nilai akhir per kebijakan penilaian, satu kali untuk semua peserta di kebijakan tersebut."""
+        for policy, participants in self.grouped(lambda p: p.batch_id.scoring_policy_id).items():
+            evaluator = policy._get_evaluator()
+            averages = []
+            for participant in participants:
+                weight_total = participant.score_weight_total - participant.score_drop_weight
+                weighted_sum = participant.score_weighted_sum - participant.score_drop_sum
+                averages.append(weighted_sum / weight_total if weight_total > 0 else 0.0)
+            finals = evaluator.evaluate(zip(averages, participants.mapped('mentor_score'), participants.mapped('score_quiz')))
+            for participant, score_avg, score_final in zip(participants, averages, finals):
+                participant.score_avg = score_avg
+                participant.score_final = score_final
+
+    @api.depends()
+    def _compute_score_accumulators(self):
+        """Dihitung penuh hanya saat record/kolom dibuat; selanjutnya dijaga lewat
+        :meth:`_apply_score_deltas` atau dibangun ulang dengan :meth:`_rebuild_scores`."""
+        assignment_scores = self._get_assignment_score_sums()
         for participant in self:
-            scored_submissions = participant.submission_ids.filtered(lambda s: s.state == 'scored')
-            total_weighted_score, total_weight = 0.0, 0.0
-            if scored_submissions:
-                for sub in scored_submissions:
-                    assignment = sub.assignment_id
-                    if assignment.max_score > 0 and assignment.weight > 0:
-                        normalized_score = (sub.score / assignment.max_score) * 100.0
-                        total_weighted_score += normalized_score * assignment.weight
-                        total_weight += assignment.weight
-                participant.score_avg = total_weighted_score / total_weight if total_weight > 0 else 0.0
-            else:
-                participant.score_avg = 0.0
-            
-            quiz_score = 0.0
-            if participant.batch_id.survey_id and participant.partner_id:
-                survey_input = self.env['survey.user_input'].search([
-                    ('survey_id', '=', participant.batch_id.survey_id.id),
-                    ('partner_id', '=', participant.partner_id.id),
-                    ('state', '=', 'done')
-                ], limit=1, order='create_date desc')
-                if survey_input:
-                    quiz_score = survey_input.scoring_percentage
-
-            participant.score_final = (participant.score_avg * weight_assignment) + \
-                                      (participant.mentor_score * weight_mentor) + \
-                                      (quiz_score * weight_quiz)
+            participant.score_weighted_sum, participant.score_weight_total = \
+                assignment_scores.get(participant._origin.id, (0.0, 0.0))
+
+    @api.depends('batch_id.scoring_policy_id.drop_lowest')
+    def _compute_score_drop(self):
+        """Dihitung penuh saat kebijakan berubah; perubahan submission dijaga oleh :meth:`_apply_score_deltas`."""
+        lowest = self._filter_drop_lowest()._get_lowest_assignment_scores()
+        for participant in self:
+            participant.score_drop_sum, participant.score_drop_weight = lowest.get(participant._origin.id, (0.0, 0.0))
+
+    def _filter_drop_lowest(self):
+        return self.filtered(lambda p: p.batch_id.scoring_policy_id.drop_lowest)
+
+    @api.depends('batch_id.survey_id', 'partner_id')
+    def _compute_score_quiz(self):
+        quiz_scores = self._get_quiz_scores()
+        for participant in self:
+            participant.score_quiz = quiz_scores.get((participant.batch_id.survey_id.id, participant.partner_id.id), 0.0)
+
+    @api.model
+    def _refresh_quiz_scores(self, partners, surveys):
+        """Perbarui score_quiz peserta ``partners`` di batch yang memakai ``surveys`` setelah
+        jawaban survei berubah; score_final ikut dihitung ulang."""
+        if not partners or not surveys:
+            return
+        participants = self.sudo().search([
+            ('partner_id', 'in', partners.ids),
+            ('batch_id.survey_id', 'in', surveys.ids),
+        ])
+        quiz_scores = participants._get_quiz_scores()
+        for participant in participants:
+            score_quiz = quiz_scores.get((participant.batch_id.survey_id.id, participant.partner_id.id), 0.0)
+            if float_compare(participant.score_quiz, score_quiz, precision_digits=2):
+                participant.write({'score_quiz': score_quiz})
+
+    @api.model
+    def _apply_score_deltas(self, before, after):
+        """Terapkan selisih kontribusi nilai tugas ke akumulator peserta.
+
+        ``before`` dan ``after`` berbentuk ``{participant_id: (jumlah nilai x bobot, jumlah bobot)}``,
+        lihat ``ojt.assignment.submit._score_contribution``.
+        """
+        field_sum = self._fields['score_weighted_sum']
+        participants = self.browse(set(before) | set(after)).exists()
+        dropping = participants._filter_drop_lowest()
+        lowest = dropping._get_lowest_assignment_scores()
+        for participant in participants:
+            old_sum, old_weight = before.get(participant.id, (0.0, 0.0))
+            new_sum, new_weight = after.get(participant.id, (0.0, 0.0))
+            if (old_sum, old_weight) == (new_sum, new_weight) or self.env.is_to_compute(field_sum, participant):
+                # akumulator yang belum dihitung akan membaca data terbaru langsung dari database
+                continue
+            vals = {
+                'score_weighted_sum': participant.score_weighted_sum + new_sum - old_sum,
+                'score_weight_total': participant.score_weight_total + new_weight - old_weight,
+            }
+            if participant in dropping:
+                # nilai minimum tidak bisa dijaga secara delta, ambil ulang untuk peserta ini saja
+                vals['score_drop_sum'], vals['score_drop_weight'] = lowest.get(participant.id, (0.0, 0.0))
+            participant.write(vals)
+
+    def _rebuild_scores(self):
+        """Bangun ulang akumulator nilai dari data submission dan survei (perbaikan data)."""
+        assignment_scores, quiz_scores = self._get_score_components()
+        lowest = self._filter_drop_lowest()._get_lowest_assignment_scores()
+        for participant in self:
+            weighted_sum, weight_total = assignment_scores.get(participant.id, (0.0, 0.0))
+            drop_sum, drop_weight = lowest.get(participant.id, (0.0, 0.0))
+            vals = {
+                'score_weighted_sum': weighted_sum,
+                'score_weight_total': weight_total,
+                'score_drop_sum': drop_sum,
+                'score_drop_weight': drop_weight,
+                'score_quiz': quiz_scores.get((participant.batch_id.survey_id.id, participant.partner_id.id), 0.0),
+            }
+            if any(participant[fname] != value for fname, value in vals.items()):
+                participant.write(vals)
+        return True
+
+    def _get_score_components(self):
+        """Ambil komponen nilai untuk seluruh recordset dengan query berkelompok.
+
+        Mengembalikan ``(assignment_scores, quiz_scores)``, lihat
+        :meth:`_get_assignment_score_sums` dan :meth:`_get_quiz_scores`.
+        Jumlah query tidak bergantung pada jumlah peserta.
+        """
+        return self._get_assignment_score_sums(), self._get_quiz_scores()
+
+    def _get_assignment_score_sums(self):
+        """``{participant_id: (jumlah nilai ternormalisasi x bobot, jumlah bobot)}``"""
+        participant_ids = [pid for pid in self._origin.ids if pid]
+        if not participant_ids:
+            return {}
+        self.env['ojt.assignment.submit'].flush_model(['participant_id', 'assignment_id', 'score', 'state'])
+        self.env['ojt.assignment'].flush_model(['max_score', 'weight'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT s.participant_id,
+                   SUM(s.score / a.max_score * 100.0 * a.weight),
+                   SUM(a.weight)
+              FROM ojt_assignment_submit s
+              JOIN ojt_assignment a ON a.id = s.assignment_id
+             WHERE s.participant_id = ANY(%s)
+               AND s.state = 'scored'
+               AND a.max_score > 0
+               AND a.weight > 0
+          GROUP BY s.participant_id
+            """, participant_ids,
+        ))
+        return {pid: (weighted_sum, weight_total) for pid, weighted_sum, weight_total in self.env.cr.fetchall()}
+
+    def _get_lowest_assignment_scores(self):
+        """``{participant_id: (nilai ternormalisasi x bobot, bobot)}`` dari tugas dengan nilai
+        terendah, hanya untuk peserta dengan minimal dua tugas ter-nilai."""
+        participant_ids = [pid for pid in self._origin.ids if pid]
+        if not participant_ids:
+            return {}
+        self.env['ojt.assignment.submit'].flush_model(['participant_id', 'assignment_id', 'score', 'state'])
+        self.env['ojt.assignment'].flush_model(['max_score', 'weight'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT s.participant_id,
+                   (array_agg(s.score / a.max_score * 100.0 * a.weight ORDER BY s.score / a.max_score, s.id))[1],
+                   (array_agg(a.weight ORDER BY s.score / a.max_score, s.id))[1]
+              FROM ojt_assignment_submit s
+              JOIN ojt_assignment a ON a.id = s.assignment_id
+             WHERE s.participant_id = ANY(%s)
+               AND s.state = 'scored'
+               AND a.max_score > 0
+               AND a.weight > 0
+          GROUP BY s.participant_id
+            HAVING COUNT(*) > 1
+            """, participant_ids,
+        ))
+        return {pid: (weighted_score, weight) for pid, weighted_score, weight in self.env.cr.fetchall()}
+
+    def _get_quiz_scores(self):
+        """``{(survey_id, partner_id): scoring_percentage survey terakhir yang selesai}``"""
+        survey_ids = list(set(self.batch_id.survey_id.ids))
+        partner_ids = list(set(self.partner_id.ids))
+        if not survey_ids or not partner_ids:
+            return {}
+        self.env['survey.user_input'].flush_model(['survey_id', 'partner_id', 'state', 'scoring_percentage'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT DISTINCT ON (survey_id, partner_id) survey_id, partner_id, scoring_percentage
+              FROM survey_user_input
+             WHERE survey_id = ANY(%s)
+               AND partner_id = ANY(%s)
+               AND state = 'done'
+          ORDER BY survey_id, partner_id, create_date DESC, id DESC
+            """, survey_ids, partner_ids,
+        ))
+        return {(survey_id, partner_id): percentage or 0.0 for survey_id, partner_id, percentage in self.env.cr.fetchall()}
 
     def action_open_assignments(self):
         self.ensure_one()
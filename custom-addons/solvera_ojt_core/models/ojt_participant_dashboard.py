@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import models, fields, api
+from odoo.tools import SQL, split_every
+
+# Field yang perubahannya mengubah isi snapshot dashboard, per model
+DASHBOARD_ASSIGNMENT_FIELDS = {'batch_id', 'state'}
+DASHBOARD_SUBMIT_FIELDS = {'participant_id', 'assignment_id'}
+DASHBOARD_EVENT_LINK_FIELDS = {'batch_id', 'event_id'}
+DASHBOARD_CERTIFICATE_FIELDS = {'participant_id', 'state'}
+DASHBOARD_PARTICIPANT_FIELDS = {'batch_id', 'partner_id'}
+DASHBOARD_SURVEY_INPUT_FIELDS = {'partner_id', 'survey_id', 'state'}
+
+
+class OjtParticipantDashboard(models.Model):
+    """Snapshot dashboard portal per peserta.
+
+    Dibuat saat peserta dibuat (peserta lama oleh cron), lalu dijaga oleh hook
+    create/write/unlink model terkait sehingga ``/my/dashboard`` cukup membaca satu baris ini
+    dan mem-browse record yang ditampilkan. Baris hanya ditulis jika isinya berubah, sehingga
+    ``write_date`` (dan ETag portal) tetap selama dashboard sama. Perubahan tingkat batch (tugas, agenda) memperbarui semua
+    snapshot batch sekaligus; perubahan peserta hanya menyentuh snapshot peserta itu.
+    """
+    _name = 'ojt.participant.dashboard'
+    _description = 'OJT Participant Dashboard Snapshot'
+
+    participant_id = fields.Many2one(
+        'ojt.participant', string='Participant', required=True, readonly=True, ondelete='cascade', index=True)
+    batch_id = fields.Many2one('ojt.batch', string='OJT Batch', readonly=True, ondelete='cascade', index=True)
+
+    assignment_ids = fields.Json(
+        string='Assignments', readonly=True, help="Published assignment ids of the batch, in display order.")
+    submitted_assignment_ids = fields.Json(
+        string='Submitted Assignments', readonly=True, help="Assignment ids the participant has a submission for.")
+    agenda_ids = fields.Json(
+        string='Agenda', readonly=True, help="Session ids of the batch, ordered by start date.")
+    survey_done = fields.Boolean(string='Survey Completed', readonly=True)
+    certificate_id = fields.Many2one('ojt.certificate', string='Certificate', readonly=True, ondelete='set null')
+
+    assignment_total_count = fields.Integer(compute='_compute_assignment_counts')
+    assignment_completed_count = fields.Integer(compute='_compute_assignment_counts')
+
+    _sql_constraints = [
+        ('participant_uniq', 'unique(participant_id)', 'A participant can only have one dashboard snapshot!'),
+    ]
+
+    @api.depends('assignment_ids', 'submitted_assignment_ids')
+    def _compute_assignment_counts(self):
+        for dashboard in self:
+            assignment_ids = dashboard.assignment_ids or []
+            dashboard.assignment_total_count = len(assignment_ids)
+            dashboard.assignment_completed_count = len(set(assignment_ids) & set(dashboard.submitted_assignment_ids or []))
+
+    @api.model
+    def _get_snapshot(self, participant):
+        """Snapshot ``participant``. Hanya membaca: jika baris belum dibuat cron, snapshot
+        dihitung dengan jumlah query tetap sebagai record baru yang tidak disimpan."""
+        Dashboard = self.sudo()
+        dashboard = Dashboard.search([('participant_id', '=', participant.id)], limit=1)
+        if dashboard:
+            return dashboard
+        vals = Dashboard._prepare_values(participant.sudo())[participant.id]
+        return Dashboard.new(dict(vals, participant_id=participant.id))
+
+    @api.model
+    def _create_snapshots(self, participants):
+        """Buat snapshot ``participants`` yang belum punya, dengan query berkelompok."""
+        Dashboard = self.sudo()
+        participants = participants.sudo() - Dashboard.search([('participant_id', 'in', participants.ids)]).participant_id
+        if not participants:
+            return Dashboard
+        values = Dashboard._prepare_values(participants)
+        return Dashboard.create([
+            dict(values[participant.id], participant_id=participant.id) for participant in participants
+        ])
+
+    @api.autovacuum
+    def _create_missing_snapshots(self):
+        """Buat snapshot peserta yang belum punya (mis. peserta dari sebelum snapshot ada)."""
+        self.env.cr.execute(SQL(
+            """
+            SELECT p.id
+              FROM ojt_participant p
+         LEFT JOIN ojt_participant_dashboard d ON d.participant_id = p.id
+             WHERE d.id IS NULL
+            """
+        ))
+        participant_ids = [row[0] for row in self.env.cr.fetchall()]
+        for ids in split_every(1000, participant_ids):
+            self._create_snapshots(self.env['ojt.participant'].browse(ids))
+
+    def _get_changed_values(self, vals):
+        """Bagian ``vals`` yang berbeda dari isi snapshot saat ini."""
+        self.ensure_one()
+        return {
+            name: value for name, value in vals.items()
+            if self._fields[name].convert_to_write(self[name], self) != value
+        }
+
+    @api.model
+    def _prepare_values(self, participants):
+        """``{participant_id: vals}`` snapshot lengkap, dengan query berkelompok."""
+        batch_values = self._get_batch_values(participants.batch_id.ids)
+        participant_values = self._get_participant_values(participants)
+        return {
+            participant.id: dict(batch_values[participant.batch_id.id], **participant_values[participant.id])
+            for participant in participants
+        }
+
+    @api.model
+    def _get_batch_values(self, batch_ids):
+        """``{batch_id: vals}`` bagian snapshot yang sama untuk semua peserta batch."""
+        values = {batch_id: {'assignment_ids': [], 'agenda_ids': []} for batch_id in batch_ids}
+        if not batch_ids:
+            return values
+        assignments = self.env['ojt.assignment'].sudo().search_fetch(
+            [('batch_id', 'in', batch_ids), ('state', '!=', 'draft')], ['batch_id'], order='id')
+        for assignment in assignments:
+            values[assignment.batch_id.id]['assignment_ids'].append(assignment.id)
+        links = self.env['ojt.event.link'].sudo().search_fetch(
+            [('batch_id', 'in', batch_ids)], ['batch_id'], order='date_start, id')
+        for link in links:
+            values[link.batch_id.id]['agenda_ids'].append(link.id)
+        return values
+
+    @api.model
+    def _get_participant_values(self, participants):
+        """``{participant_id: vals}`` bagian snapshot milik peserta sendiri."""
+        submitted = defaultdict(list)
+        for participant_id, assignment_id in participants._read_grouped_counts(
+                'ojt.assignment.submit', [('participant_id', 'in', participants.ids)],
+                ['participant_id', 'assignment_id']):
+            submitted[participant_id].append(assignment_id)
+
+        certificates = {}
+        for certificate in self.env['ojt.certificate'].sudo().search_fetch(
+                [('participant_id', 'in', participants.ids), ('state', '=', 'issued')], ['participant_id'], order='id'):
+            certificates.setdefault(certificate.participant_id.id, certificate.id)
+
+        surveys_done = {}
+        if participants.batch_id.survey_id:
+            surveys_done = participants._read_grouped_counts('survey.user_input', [
+                ('partner_id', 'in', participants.partner_id.ids),
+                ('survey_id', 'in', participants.batch_id.survey_id.ids),
+                ('state', '=', 'done'),
+            ], ['partner_id', 'survey_id'])
+
+        return {participant.id: {
+            'batch_id': participant.batch_id.id,
+            'submitted_assignment_ids': sorted(submitted[participant.id]),
+            'certificate_id': certificates.get(participant.id, False),
+            'survey_done': bool(surveys_done.get((participant.partner_id.id, participant.batch_id.survey_id.id))),
+        } for participant in participants}
+
+    @api.model
+    def _refresh(self, participants):
+        """Perbarui snapshot ``participants`` yang sudah ada; peserta tanpa snapshot dilewati."""
+        dashboards = self.sudo().search([('participant_id', 'in', participants.ids)])
+        if not dashboards:
+            return
+        values = self._prepare_values(dashboards.participant_id)
+        for dashboard in dashboards:
+            changed = dashboard._get_changed_values(values[dashboard.participant_id.id])
+            if changed:
+                dashboard.write(changed)
+
+    @api.model
+    def _refresh_batches(self, batches):
+        """Perbarui daftar tugas dan agenda semua snapshot ``batches``: paling banyak satu
+        UPDATE per batch, hanya untuk snapshot yang isinya berubah."""
+        dashboards = self.sudo().search([('batch_id', 'in', batches.ids)])
+        if not dashboards:
+            return
+        values = self._get_batch_values(dashboards.batch_id.ids)
+        for batch, batch_dashboards in dashboards.grouped('batch_id').items():
+            stale = batch_dashboards.filtered(lambda dashboard: dashboard._get_changed_values(values[batch.id]))
+            if stale:
+                stale.write(values[batch.id])
+
+    @api.model
+    def _refresh_surveys(self, partners, surveys):
+        """Perbarui status survei peserta dari ``partners`` di batch dengan salah satu ``surveys``."""
+        if not partners or not surveys:
+            return
+        participants = self.env['ojt.participant'].sudo().search([
+            ('partner_id', 'in', partners.ids),
+            ('batch_id.survey_id', 'in', surveys.ids),
+        ])
+        self._refresh(participants)
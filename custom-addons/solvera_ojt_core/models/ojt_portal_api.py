@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+DEFAULT_API_LIMIT = 100
+MAX_API_LIMIT = 500
+
+# Counter beranda portal (/my/home), sesuai urutan kolom di ojt.portal.api._get_counters
+PORTAL_COUNTERS = ('ojt_certificate_count', 'ojt_assignment_count', 'ojt_agenda_count', 'ojt_attendance_count')
+
+# Resource API portal: model, field yang dicocokkan dengan batch/peserta milik user,
+# field tanggal untuk urutan keyset (date, id), domain tambahan dan field yang boleh dibaca
+PORTAL_API_RESOURCES = {
+    'batches': {
+        'model': 'ojt.batch',
+        'scope': 'id',
+        'date': 'start_date',
+        'fields': ('name', 'code', 'state', 'mode', 'start_date', 'end_date', 'description'),
+    },
+    'agenda': {
+        'model': 'ojt.event.link',
+        'scope': 'batch_id',
+        'date': 'date_start',
+        'fields': ('batch_id', 'event_id', 'title', 'date_start', 'date_end', 'is_mandatory', 'online_meeting_url'),
+    },
+    'assignments': {
+        'model': 'ojt.assignment',
+        'scope': 'batch_id',
+        'date': 'create_date',
+        'domain': [('state', '!=', 'draft')],
+        'fields': ('batch_id', 'event_link_id', 'name', 'type', 'deadline', 'max_score', 'weight',
+                   'attachment_required', 'state', 'description'),
+    },
+    'submissions': {
+        'model': 'ojt.assignment.submit',
+        'scope': 'participant_id',
+        'date': 'create_date',
+        'fields': ('assignment_id', 'participant_id', 'submitted_on', 'url_link', 'score', 'late', 'state', 'feedback'),
+    },
+    'attendance': {
+        'model': 'ojt.attendance',
+        'scope': 'participant_id',
+        'date': 'create_date',
+        'fields': ('event_link_id', 'participant_id', 'check_in', 'check_out', 'presence', 'method'),
+    },
+    'certificates': {
+        'model': 'ojt.certificate',
+        'scope': 'participant_id',
+        'date': 'create_date',
+        'domain': [('state', 'in', ('issued', 'revoked'))],
+        'fields': ('batch_id', 'participant_id', 'name', 'serial', 'issued_date', 'final_score',
+                   'attendance_rate', 'grade', 'state'),
+    },
+}
+
+
+class OjtPortalApi(models.AbstractModel):
+    """Data portal peserta untuk API JSON dan halaman daftar portal (hanya baca).
+
+    Setiap permintaan memakai jumlah query tetap: satu untuk peserta milik user, satu
+    ``search_fetch`` untuk halaman resource, ditambah paling banyak satu query per field
+    related yang tidak disimpan. Halaman diurutkan dan dilanjutkan dengan keyset
+    ``(tanggal, id)`` sehingga biayanya tidak bergantung pada posisi halaman.
+    """
+    _name = 'ojt.portal.api'
+    _description = 'OJT Portal JSON API'
+
+    @api.model
+    def _encode_cursor(self, date, record_id):
+        raw = json.dumps([date, record_id], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+    @api.model
+    def _decode_cursor(self, cursor):
+        try:
+            date, record_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            fields.Datetime.to_datetime(date)
+            return date, int(record_id)
+        except (ValueError, TypeError, AttributeError):
+            raise ValueError("Invalid cursor.")
+
+    @api.model
+    def _serialize_value(self, field, value):
+        if field.type == 'many2one':
+            return value.id or None
+        if field.type == 'boolean':
+            return bool(value)
+        if not value and value != 0:
+            return None
+        if field.type in ('date', 'datetime'):
+            return value.isoformat()
+        if field.type == 'html':
+            return str(value)
+        return value
+
+    @api.model
+    def _get_counters(self, partner_id):
+        """Jumlah sertifikat terbit, tugas, sesi dan absensi milik ``partner_id`` untuk
+        counter beranda portal, dalam satu query."""
+        for model in ('ojt.participant', 'ojt.certificate', 'ojt.assignment', 'ojt.event.link', 'ojt.attendance'):
+            self.env[model].flush_model()
+        self.env.cr.execute(SQL(
+            """
+            WITH participant AS (
+                SELECT id, batch_id
+                  FROM ojt_participant
+                 WHERE partner_id = %(partner_id)s
+                   AND state IN ('active', 'completed')
+            )
+            SELECT (SELECT COUNT(*) FROM ojt_certificate
+                     WHERE participant_id IN (SELECT id FROM participant) AND state = 'issued'),
+                   (SELECT COUNT(*) FROM ojt_assignment
+                     WHERE batch_id IN (SELECT batch_id FROM participant) AND state != 'draft'),
+                   (SELECT COUNT(*) FROM ojt_event_link
+                     WHERE batch_id IN (SELECT batch_id FROM participant)),
+                   (SELECT COUNT(*) FROM ojt_attendance
+                     WHERE participant_id IN (SELECT id FROM participant))
+            """, partner_id=partner_id,
+        ))
+        return dict(zip(PORTAL_COUNTERS, self.env.cr.fetchone()))
+
+    @api.model
+    def _get_scope_ids(self, partner_id):
+        """``(participant_ids, batch_ids)`` peserta aktif/selesai milik ``partner_id``; satu query."""
+        participants = self.env['ojt.participant'].sudo().search_fetch([
+            ('partner_id', '=', partner_id),
+            ('state', 'in', ('active', 'completed')),
+        ], ['batch_id'])
+        return participants.ids, participants.batch_id.ids
+
+    @api.model
+    def _search_page(self, partner_id, resource, field_names=(), cursor=None, limit=DEFAULT_API_LIMIT,
+                     domain=None, reverse=False, scope_ids=None):
+        """Satu halaman record ``resource`` milik ``partner_id`` dengan keyset ``(tanggal, id)``.
+
+        ``domain`` menambah filter, ``reverse`` mengurutkan dari yang terbaru, dan
+        ``scope_ids`` (hasil :meth:`_get_scope_ids`) menghemat query peserta bila sudah
+        tersedia. Mengembalikan ``(records, next_cursor)``; ``next_cursor`` ``None`` di
+        halaman terakhir.
+        """
+        spec = PORTAL_API_RESOURCES[resource]
+        limit = max(1, min(int(limit), MAX_API_LIMIT))
+        participant_ids, batch_ids = scope_ids or self._get_scope_ids(partner_id)
+
+        date_field = spec['date']
+        domain = [(spec['scope'], 'in', participant_ids if spec['scope'] == 'participant_id' else batch_ids)] \
+            + spec.get('domain', []) + list(domain or [])
+        if cursor:
+            date, last_id = self._decode_cursor(cursor)
+            after = '<' if reverse else '>'
+            domain += ['|', (date_field, after, date), '&', (date_field, '=', date), ('id', after, last_id)]
+
+        Model = self.env[spec['model']].sudo()
+        direction = 'desc' if reverse else 'asc'
+        records = Model.search_fetch(
+            domain, [date_field, 'write_date'] + list(field_names),
+            order=f'{date_field} {direction}, id {direction}', limit=limit + 1)
+        if len(records) <= limit:
+            return records, None
+        records = records[:limit]
+        last = records[-1]
+        return records, self._encode_cursor(Model._fields[date_field].to_string(last[date_field]), last.id)
+
+    @api.model
+    def _fetch(self, partner_id, resource, field_names=None, cursor=None, limit=DEFAULT_API_LIMIT, updated_since=None):
+        """Satu halaman ``resource`` milik peserta aktif/selesai dari ``partner_id``, dalam JSON.
+
+        ``field_names`` membatasi field yang dikembalikan (``id`` dan ``write_date`` selalu
+        ada), ``cursor`` adalah ``next_cursor`` dari halaman sebelumnya, dan
+        ``updated_since`` (datetime UTC) hanya mengembalikan record yang ditulis setelahnya.
+        Parameter yang tidak valid menimbulkan ``ValueError``.
+        """
+        spec = PORTAL_API_RESOURCES[resource]
+        field_names = list(field_names or spec['fields'])
+        unknown = set(field_names) - set(spec['fields'])
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+
+        domain = []
+        if updated_since:
+            # >= : record yang ditulis pada detik yang sama dengan server_time sinkron sebelumnya ikut terkirim
+            domain.append(('write_date', '>=', fields.Datetime.to_datetime(str(updated_since).replace('T', ' '))))
+        records, next_cursor = self._search_page(
+            partner_id, resource, field_names, cursor=cursor, limit=limit, domain=domain)
+
+        Model = self.env[spec['model']]
+        model_fields = [(fname, Model._fields[fname]) for fname in field_names]
+        data = []
+        for record in records:
+            row = {'id': record.id, 'write_date': record.write_date.isoformat()}
+            row.update((fname, self._serialize_value(field, record[fname])) for fname, field in model_fields)
+            data.append(row)
+        return {
+            'resource': resource,
+            'data': data,
+            'has_more': bool(next_cursor),
+            'next_cursor': next_cursor,
+            'server_time': fields.Datetime.now().isoformat(),
+        }
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+import io
+import logging
+
+try:
+    import qrcode
+except ImportError:
+    qrcode = None
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Ukuran piksel per modul QR (box_size pada library qrcode)
+DEFAULT_QR_SIZE = 10
+
+
+def render_qr_png(payload, size=DEFAULT_QR_SIZE):
+    """PNG mentah untuk ``payload``, atau ``None`` jika library qrcode tidak terpasang."""
+    if not qrcode:
+        return None
+    qr = qrcode.QRCode(box_size=size)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    temp = io.BytesIO()
+    qr.make_image().save(temp, format="PNG")
+    return temp.getvalue()
+
+
+class OjtQrImage(models.Model):
+    """Cache gambar QR berbasis isi: satu baris per (payload, ukuran).
+
+    Kunci adalah hash dari payload sehingga token atau base URL yang berubah otomatis
+    menghasilkan kunci baru; baris lama dihapus oleh pemiliknya atau oleh autovacuum.
+    Gambar dibuat oleh pemiliknya saat token berubah (``_ensure_images``), sedangkan field
+    compute hanya membaca (``_get_images``) sehingga aman di cursor read-only.
+    """
+    _name = 'ojt.qr.image'
+    _description = 'OJT QR Code Image Cache'
+
+    key = fields.Char(string='Key', required=True, readonly=True)
+    payload = fields.Char(string='Payload', required=True, readonly=True)
+    size = fields.Integer(string='Size', required=True, readonly=True)
+    image = fields.Binary(string='Image', attachment=False, readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'The QR image key must be unique!'),
+    ]
+
+    @api.model
+    def _get_key(self, payload, size=DEFAULT_QR_SIZE):
+        return hashlib.sha256(f'{size}\n{payload}'.encode()).hexdigest()
+
+    @api.model
+    def _get_images(self, payloads, size=DEFAULT_QR_SIZE):
+        """``{payload: ojt.qr.image}`` untuk ``payloads`` yang gambarnya sudah disimpan.
+        Hanya membaca, satu query; payload tanpa gambar tidak ada di hasil."""
+        keys = {payload: self._get_key(payload, size) for payload in set(payloads) if payload}
+        if not keys:
+            return {}
+        images = {image.key: image for image in self.sudo().search([('key', 'in', list(keys.values()))])}
+        return {payload: images[key] for payload, key in keys.items() if key in images}
+
+    @api.model
+    def _ensure_images(self, payloads, size=DEFAULT_QR_SIZE):
+        """Simpan gambar untuk ``payloads`` yang belum punya gambar. Kunci yang bentrok
+        (dibuat bersamaan oleh transaksi lain) dilewati tanpa membatalkan baris lain."""
+        keys = {payload: self._get_key(payload, size) for payload in set(payloads) if payload}
+        if not keys:
+            return
+        existing = set(self.sudo().search([('key', 'in', list(keys.values()))]).mapped('key'))
+        rows = []
+        for payload, key in keys.items():
+            if key in existing:
+                continue
+            png = render_qr_png(payload, size)
+            if png:
+                rows.append((key, payload, base64.b64encode(png)))
+        if not rows:
+            return
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO ojt_qr_image (key, payload, size, image, create_uid, create_date, write_uid, write_date)
+                 VALUES %(values)s
+            ON CONFLICT (key) DO NOTHING
+            """,
+            values=SQL(", ").join(
+                SQL("(%s, %s, %s, %s, %s, %s, %s, %s)", key, payload, size, image, self.env.uid, now, self.env.uid, now)
+                for key, payload, image in rows
+            ),
+        ))
+
+    @api.model
+    def _drop_images(self, payloads, size=DEFAULT_QR_SIZE):
+        keys = [self._get_key(payload, size) for payload in payloads if payload]
+        if keys:
+            self.sudo().search([('key', 'in', keys)]).unlink()
+
+    def _get_url(self):
+        self.ensure_one()
+        return f'/ojt/qr/{self.key}.png'
+
+    @api.autovacuum
+    def _gc_stale_images(self):
+        """Hapus gambar untuk base URL lama; sampai gambar baru dibuat, QR dirender langsung."""
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        stale = self.sudo().search(['!', ('payload', '=like', f'{base_url}/%')])
+        _logger.info("OJT: removing %s stale QR images", len(stale))
+        stale.unlink()
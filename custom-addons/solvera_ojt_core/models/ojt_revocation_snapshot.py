@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+import math
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+SNAPSHOTS_TO_KEEP = 50
+
+
+def bloom_parameters(count, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+    """``(m, k)``: jumlah bit dan jumlah hash optimal untuk ``count`` item."""
+    count = max(count, 1)
+    bits = max(8, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    return bits, max(1, round(bits / count * math.log(2)))
+
+
+def bloom_positions(item, bits, hashes):
+    """Posisi bit untuk ``item``: double hashing dari dua 64 bit pertama SHA-256."""
+    digest = hashlib.sha256(item.encode()).digest()
+    h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:16], 'big')
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def bloom_build(items, bits, hashes):
+    array = bytearray((bits + 7) // 8)
+    for item in items:
+        for position in bloom_positions(item, bits, hashes):
+            array[position // 8] |= 1 << (position % 8)
+    return bytes(array)
+
+
+def bloom_contains(array, bits, hashes, item):
+    return all(array[position // 8] & (1 << (position % 8)) for position in bloom_positions(item, bits, hashes))
+
+
+class OjtRevocationSnapshot(models.Model):
+    """Snapshot daftar sertifikat yang dicabut, untuk verifier offline.
+
+    Setiap versi menyimpan nomor seri terurut dan Bloom filter; versi baru hanya dibuat
+    jika isinya berubah. Klien sinkron secara inkremental dengan membandingkan versi.
+    """
+    _name = 'ojt.revocation.snapshot'
+    _description = 'OJT Certificate Revocation Snapshot'
+    _order = 'version desc'
+    _rec_name = 'version'
+
+    version = fields.Integer(string='Version', required=True, readonly=True, index=True)
+    serials = fields.Text(string='Revoked Serials', readonly=True, help="Sorted, one serial per line.")
+    serial_count = fields.Integer(string='Count', readonly=True)
+    digest = fields.Char(string='Digest', readonly=True)
+    bloom_filter = fields.Binary(string='Bloom Filter', attachment=False, readonly=True)
+    bloom_bits = fields.Integer(string='Bloom Bits', readonly=True)
+    bloom_hashes = fields.Integer(string='Bloom Hashes', readonly=True)
+
+    _sql_constraints = [
+        ('version_uniq', 'unique(version)', 'The snapshot version must be unique!'),
+    ]
+
+    def _get_serials(self):
+        self.ensure_one()
+        return self.serials.split('\n') if self.serials else []
+
+    @api.model
+    def _get_latest(self):
+        """Versi terbaru, atau recordset kosong jika belum ada. Hanya membaca: snapshot
+        dibangun saat instalasi/pembaruan modul dan oleh cron, tidak oleh request publik."""
+        return self.search([], limit=1)
+
+    @api.model
+    def _rebuild(self):
+        """Buat versi baru jika daftar sertifikat yang dicabut berubah; kembalikan versi terbaru."""
+        self.env['ojt.certificate'].flush_model(['serial', 'state'])
+        self.env.cr.execute(SQL(
+            "SELECT serial FROM ojt_certificate WHERE state = 'revoked' ORDER BY serial"
+        ))
+        serials = [serial for serial, in self.env.cr.fetchall()]
+        text = '\n'.join(serials)
+        digest = hashlib.sha256(text.encode()).hexdigest()
+
+        latest = self.sudo().search([], limit=1)
+        if latest and latest.digest == digest:
+            return latest
+
+        bits, hashes = bloom_parameters(len(serials))
+        snapshot = self.sudo().create({
+            'version': latest.version + 1,
+            'serials': text,
+            'serial_count': len(serials),
+            'digest': digest,
+            'bloom_filter': base64.b64encode(bloom_build(serials, bits, hashes)),
+            'bloom_bits': bits,
+            'bloom_hashes': hashes,
+        })
+        self.sudo().search([], offset=SNAPSHOTS_TO_KEEP).unlink()
+        return snapshot
+
+    @api.model
+    def _cron_rebuild(self):
+        self._rebuild()
+        return True
+
+    @api.model
+    def _trigger_rebuild(self):
+        cron = self.env.ref('solvera_ojt_core.ir_cron_ojt_revocation_snapshot', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _get_delta(self, since_version):
+        """``(added, removed)`` sejak ``since_version``, atau ``None`` jika versi itu sudah tidak disimpan."""
+        self.ensure_one()
+        previous = self.search([('version', '=', since_version)], limit=1)
+        if not previous:
+            return None
+        current, old = set(self._get_serials()), set(previous._get_serials())
+        return sorted(current - old), sorted(old - current)
+
+    def _get_bloom_values(self):
+        self.ensure_one()
+        return {
+            'version': self.version,
+            'count': self.serial_count,
+            'bits': self.bloom_bits,
+            'hashes': self.bloom_hashes,
+            'hash': 'sha256-double',
+            'filter': self.bloom_filter.decode() if self.bloom_filter else '',
+        }
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+# Field yang memengaruhi hasil evaluasi; perubahannya menaikkan versi kebijakan
+SCORING_FIELDS = {
+    'weight_assignment', 'weight_mentor', 'weight_quiz', 'grade_a_min', 'grade_b_min', 'drop_lowest',
+}
+
+
+class ScoringEvaluator:
+    """Hasil kompilasi ``ojt.scoring.policy``: objek immutable tanpa akses ORM,
+    aman disimpan di cache registry dan dipakai untuk satu batch sekaligus."""
+
+    __slots__ = ('weight_assignment', 'weight_mentor', 'weight_quiz', 'grade_a_min', 'grade_b_min', 'drop_lowest')
+
+    def __init__(self, weight_assignment, weight_mentor, weight_quiz, grade_a_min, grade_b_min, drop_lowest=False):
+        self.weight_assignment = weight_assignment
+        self.weight_mentor = weight_mentor
+        self.weight_quiz = weight_quiz
+        self.grade_a_min = grade_a_min
+        self.grade_b_min = grade_b_min
+        self.drop_lowest = drop_lowest
+
+    def evaluate(self, matrix):
+        """Hitung nilai akhir untuk setiap baris ``(nilai tugas, nilai mentor, nilai kuis)``."""
+        wa, wm, wq = self.weight_assignment, self.weight_mentor, self.weight_quiz
+        return [assignment * wa + mentor * wm + quiz * wq for assignment, mentor, quiz in matrix]
+
+    def grade(self, score):
+        if score >= self.grade_a_min:
+            return 'A'
+        if score >= self.grade_b_min:
+            return 'B'
+        return 'C'
+
+
+DEFAULT_EVALUATOR = ScoringEvaluator(0.7, 0.2, 0.1, 85.0, 75.0)
+
+
+class OjtScoringPolicy(models.Model):
+    _name = 'ojt.scoring.policy'
+    _description = 'OJT Scoring Policy'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Name', required=True)
+    sequence = fields.Integer(default=10)
+    active = fields.Boolean(default=True)
+
+    weight_assignment = fields.Float(string='Assignment Weight', default=0.7, required=True)
+    weight_mentor = fields.Float(string='Mentor Weight', default=0.2, required=True)
+    weight_quiz = fields.Float(string='Quiz Weight', default=0.1, required=True)
+    drop_lowest = fields.Boolean(
+        string='Drop Lowest Assignment',
+        help="Ignore each participant's lowest normalized assignment score "
+             "when at least two assignments are scored.")
+
+    grade_a_min = fields.Float(string='Min. Score for A', default=85.0, required=True)
+    grade_b_min = fields.Float(string='Min. Score for B', default=75.0, required=True)
+
+    version = fields.Integer(string='Version', default=1, readonly=True, copy=False)
+    batch_ids = fields.One2many('ojt.batch', 'scoring_policy_id', string='Batches')
+    batch_count = fields.Integer(string='Batch Count', compute='_compute_batch_count')
+
+    @api.constrains('weight_assignment', 'weight_mentor', 'weight_quiz', 'grade_a_min', 'grade_b_min')
+    def _check_policy(self):
+        for policy in self:
+            if min(policy.weight_assignment, policy.weight_mentor, policy.weight_quiz) < 0:
+                raise ValidationError("Scoring weights cannot be negative.")
+            if policy.grade_a_min < policy.grade_b_min:
+                raise ValidationError("The minimum score for grade A cannot be lower than for grade B.")
+
+    def _compute_batch_count(self):
+        counts = dict(self.env['ojt.batch']._read_group(
+            [('scoring_policy_id', 'in', self.ids)], ['scoring_policy_id'], ['__count']))
+        for policy in self:
+            policy.batch_count = counts.get(policy, 0)
+
+    def write(self, vals):
+        if not SCORING_FIELDS.intersection(vals):
+            return super(OjtScoringPolicy, self).write(vals)
+
+        for policy in self:
+            # nilai peserta dihitung ulang sekaligus lewat dependensi pada versi kebijakan
+            super(OjtScoringPolicy, policy).write(dict(vals, version=policy.version + 1))
+        return True
+
+    def _get_evaluator(self):
+        """Evaluator untuk kebijakan ini; tanpa kebijakan dipakai bobot bawaan."""
+        if not self:
+            return DEFAULT_EVALUATOR
+        self.ensure_one()
+        # write_date membedakan versi yang sama dari transaksi yang dibatalkan, sehingga
+        # evaluator lama tidak perlu dibuang dari cache
+        return self._compile_evaluator(self.id, self.version, self.write_date)
+
+    @api.model
+    @tools.ormcache('policy_id', 'version', 'write_date')
+    def _compile_evaluator(self, policy_id, version, write_date):
+        policy = self.browse(policy_id)
+        return ScoringEvaluator(
+            policy.weight_assignment, policy.weight_mentor, policy.weight_quiz,
+            policy.grade_a_min, policy.grade_b_min, policy.drop_lowest,
+        )
+
+    def action_view_batches(self):
+        self.ensure_one()
+        return {
+            'name': 'Batches', 'type': 'ir.actions.act_window', 'res_model': 'ojt.batch',
+            'view_mode': 'list,form', 'domain': [('scoring_policy_id', '=', self.id)],
+        }
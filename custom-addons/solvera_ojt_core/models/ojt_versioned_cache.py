@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+
+class VersionedCache:
+    """Cache LRU per worker untuk lookup jalur cepat, terpisah dari ormcache registry.
+
+    Versi cache adalah ID terbesar ``ojt.cache.version`` untuk ``name``. Perubahan data
+    menyisipkan baris versi baru di transaksi penulis, sehingga versi yang dibaca selalu
+    sesuai dengan snapshot data transaksi pembaca: nilai yang dihitung dari snapshot lama
+    tersimpan di bawah versi lama dan tidak dipakai oleh transaksi yang lebih baru. Nilai
+    ``None`` (data tidak ditemukan) tidak disimpan agar kunci acak dari luar tidak bisa
+    memenuhi cache.
+    """
+
+    def __init__(self, name, max_entries=4096):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, env, key, compute):
+        """Nilai untuk ``key``; jika belum ada atau versinya lain, ``compute()`` dipanggil."""
+        cache_key = (env.cr.dbname, key)
+        version = env['ojt.cache.version']._get_version(self.name)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(cache_key)
+                return entry[1]
+        value = compute()
+        if value is not None:
+            with self._lock:
+                self._entries[cache_key] = (version, value)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, env):
+        """Buang semua entri cache ini; berlaku untuk transaksi lain setelah commit."""
+        env['ojt.cache.version']._bump(self.name)
+
+
+class OjtCacheVersion(models.Model):
+    """Versi ``VersionedCache``: satu baris per invalidasi, hanya ID terbesar per nama yang
+    dipakai. Penulis hanya menyisipkan baris sehingga tidak ada baris yang diperebutkan."""
+    _name = 'ojt.cache.version'
+    _description = 'OJT Cache Version'
+    _log_access = False
+
+    name = fields.Char(string='Cache', required=True, readonly=True)
+
+    def init(self):
+        create_index(self.env.cr, 'ojt_cache_version_name_id_idx', self._table, ['name', 'id'])
+
+    @api.model
+    def _get_version(self, name):
+        self.env.cr.execute(SQL("SELECT max(id) FROM ojt_cache_version WHERE name = %s", name))
+        return self.env.cr.fetchone()[0] or 0
+
+    @api.model
+    def _bump(self, name):
+        self.env.cr.execute(SQL("INSERT INTO ojt_cache_version (name) VALUES (%s)", name))
+
+    @api.autovacuum
+    def _gc_old_versions(self):
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM ojt_cache_version v
+                  USING (SELECT name, max(id) AS id FROM ojt_cache_version GROUP BY name) latest
+                  WHERE v.name = latest.name AND v.id < latest.id
+            """
+        ))
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def write(self, vals):
+        res = super(ResPartner, self).write(vals)
+        if 'name' in vals:
+            # nama peserta tampil di hasil verifikasi sertifikat publik
+            self.env['ojt.certificate']._invalidate_verification([('partner_id', 'in', self.ids)])
+        return res
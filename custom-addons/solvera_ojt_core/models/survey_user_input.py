@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api
+from odoo.addons.solvera_ojt_core.models.ojt_participant import QUIZ_SCORE_INPUT_FIELDS
+from odoo.addons.solvera_ojt_core.models.ojt_participant_dashboard import DASHBOARD_SURVEY_INPUT_FIELDS
+
+class SurveyUserInput(models.Model):
+    _inherit = 'survey.user_input'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        user_inputs = super(SurveyUserInput, self).create(vals_list)
+        self.env['ojt.participant.dashboard']._refresh_surveys(user_inputs.partner_id, user_inputs.survey_id)
+        self.env['ojt.participant']._refresh_quiz_scores(user_inputs.partner_id, user_inputs.survey_id)
+        return user_inputs
+
+    def write(self, vals):
+        partners, surveys = (self.partner_id, self.survey_id) \
+            if DASHBOARD_SURVEY_INPUT_FIELDS.intersection(vals) else (None, None)
+        quiz_partners, quiz_surveys = (self.partner_id, self.survey_id) \
+            if QUIZ_SCORE_INPUT_FIELDS.intersection(vals) else (None, None)
+        res = super(SurveyUserInput, self).write(vals)
+        if partners is not None:
+            self.env['ojt.participant.dashboard']._refresh_surveys(
+                partners | self.partner_id, surveys | self.survey_id)
+        if quiz_partners is not None:
+            self.env['ojt.participant']._refresh_quiz_scores(
+                quiz_partners | self.partner_id, quiz_surveys | self.survey_id)
+        return res
+
+    def unlink(self):
+        partners, surveys = self.partner_id, self.survey_id
+        res = super(SurveyUserInput, self).unlink()
+        self.env['ojt.participant.dashboard']._refresh_surveys(partners, surveys)
+        self.env['ojt.participant']._refresh_quiz_scores(partners, surveys)
+        return res
@@ -5,4 +5,16 @@ from . import test_ojt_participant
 from . import test_ojt_event_link
 from . import test_ojt_attendance
 from . import test_ojt_assignment
-from . import test_ojt_assignment_submit
\ No newline at end of file
+from . import test_ojt_assignment_submit
+from . import test_ojt_notification_queue
+from . import test_ojt_mail_broadcast
+from . import test_ojt_scoring_policy
+from . import test_ojt_counters
+from . import test_ojt_qr_image
+from . import test_ojt_certificate_job
+from . import test_ojt_certificate_verify
+from . import test_ojt_certificate_key
+from . import test_ojt_revocation_snapshot
+from . import test_ojt_participant_dashboard
+from . import test_ojt_portal_api
+from . import test_ojt_calendar_feed
\ No newline at end of file
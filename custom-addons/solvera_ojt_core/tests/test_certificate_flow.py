@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
+from unittest.mock import patch
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import UserError, ValidationError
 from datetime import date
@@ -101,6 +102,7 @@ class TestCertificateFlow(TransactionCase):
             'batch_id': self.batch.id
         })
         wizard.action_generate_certificates()
+        self.env['ojt.certificate.job']._process_jobs()
 
         # Verifikasi bahwa sertifikat telah dibuat
         self.assertEqual(len(self.participant_lulus.certificate_ids), 1, "Seharusnya ada 1 sertifikat setelah wizard dijalankan.")
@@ -122,10 +124,63 @@ class TestCertificateFlow(TransactionCase):
         })
 
         wizard.action_generate_certificates()
+        self.env['ojt.certificate.job']._process_jobs()
 
         # Cek bahwa sertifikat telah dibuat
         existing_certs_after = self.env['ojt.certificate'].search([('participant_id', '=', self.participant_lulus.id)])
         self.assertEqual(len(existing_certs_after), 1, "Seharusnya ada 1 sertifikat setelah wizard dijalankan.")
         
         cert = existing_certs_after[0]
-        self.assertEqual(cert.state, 'issued', "Sertifikat yang di-generate harus langsung berstatus 'issued'.")
\ No newline at end of file
+        self.assertEqual(cert.state, 'issued', "Sertifikat yang di-generate harus langsung berstatus 'issued'.")
+
+    def test_04_certificate_pdf_rendered_once(self):
+        """Tes: PDF sertifikat dirender sekali dan dibuang saat sertifikat dicabut atau diterbitkan ulang."""
+        cert = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat PDF',
+            'batch_id': self.batch.id,
+            'participant_id': self.participant_lulus.id,
+        })
+        cert.action_issue()
+
+        Report = type(self.env['ir.actions.report'])
+        with patch.object(Report, '_render_qweb_pdf', return_value=(b'%PDF-1.4 tes', 'pdf')) as render:
+            attachment = cert._get_pdf_attachment()
+            self.assertEqual(cert._get_pdf_attachment(), attachment)
+            self.assertEqual(render.call_count, 1, "PDF yang sudah dirender tidak boleh dirender ulang.")
+            self.assertEqual(attachment.raw, b'%PDF-1.4 tes')
+            self.assertEqual((attachment.res_model, attachment.res_id), ('ojt.certificate', cert.id))
+
+            cert.action_revoke()
+            self.assertFalse(cert.pdf_attachment_id)
+            self.assertFalse(attachment.exists(), "PDF sertifikat yang dicabut harus dihapus.")
+
+            cert.action_issue()
+            self.assertNotEqual(cert._get_pdf_attachment(), attachment)
+            self.assertEqual(render.call_count, 2)
+
+    def test_05_certificate_pdf_follows_printed_values(self):
+        """Tes: PDF dirender ulang saat nama peserta, nama batch atau grade yang tercetak berubah."""
+        cert = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat Nama',
+            'batch_id': self.batch.id,
+            'participant_id': self.participant_lulus.id,
+        })
+        cert.action_issue()
+
+        Report = type(self.env['ir.actions.report'])
+        with patch.object(Report, '_render_qweb_pdf', return_value=(b'%PDF-1.4 tes', 'pdf')) as render:
+            attachment = cert._get_pdf_attachment()
+
+            self.participant_lulus.partner_id.name = 'Nama Baru Peserta'
+            renamed = cert._get_pdf_attachment()
+            self.assertNotEqual(renamed, attachment)
+            self.assertFalse(attachment.exists(), "PDF lama dihapus setelah dirender ulang.")
+
+            self.batch.name = 'Nama Batch Baru'
+            self.assertNotEqual(cert._get_pdf_attachment(), renamed)
+
+            cert.write({'final_score': 10.0})
+            self.assertEqual(cert.grade, 'C')
+            cert._get_pdf_attachment()
+            self.assertEqual(render.call_count, 4)
+            self.assertFalse(cert._needs_pdf_render())
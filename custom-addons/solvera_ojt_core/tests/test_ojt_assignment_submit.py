@@ -36,6 +36,7 @@ class TestOjtAssignmentSubmit(TransactionCase):
         # --- Act ---
         # Mentor menekan tombol "Mark as Scored"
         submission.action_mark_as_scored()
+        self.env['ojt.notification.queue']._process_queue()
 
         # --- Assert ---
         final_mail_count = self.env['mail.mail'].search_count([])
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
+from unittest.mock import patch
+
 from odoo.tests.common import TransactionCase
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 from datetime import datetime, timedelta
 
 
@@ -134,4 +136,210 @@ class TestOjtAttendance(TransactionCase):
             self.env['ojt.attendance'].create({
                 'participant_id': self.participant.id,
                 'event_link_id': self.event_link.id,
-            })
\ No newline at end of file
+            })
+
+    def test_qr_checkin_fast_path(self):
+        """Check-in QR memakai cache target/peserta dan INSERT idempoten"""
+        target = self.env['ojt.event.link']._get_checkin_target(self.event_link.access_token)
+        self.assertEqual(target, (self.event_link.id, self.batch.id, self.event.id))
+        self.assertIsNone(self.env['ojt.event.link']._get_checkin_target('token-tidak-ada'))
+
+        participant_id = self.env['ojt.participant']._get_active_participant_id(self.partner.id, self.batch.id)
+        self.assertEqual(participant_id, self.participant.id)
+
+        Attendance = self.env['ojt.attendance']
+        vals = {'participant_id': participant_id, 'event_link_id': target[0], 'method': 'qr'}
+        attendance_id, created = Attendance._upsert_attendance([vals])[(participant_id, target[0])]
+        self.assertTrue(created)
+        self.assertEqual(Attendance._upsert_attendance([vals])[(participant_id, target[0])], (attendance_id, False),
+                         "Scan ulang tidak boleh membuat absensi baru.")
+
+        attendance = Attendance.search([('participant_id', '=', self.participant.id)])
+        self.assertEqual(len(attendance), 1)
+        self.assertEqual(attendance.method, 'qr')
+        self.assertEqual(self.participant.attendance_rate, 100.0)
+
+    def test_qr_checkin_caches_invalidated(self):
+        """Cache check-in dibersihkan saat token atau keanggotaan peserta berubah, tanpa cache registry"""
+        registry_class = type(self.env.registry)
+        with patch.object(registry_class, 'clear_cache', side_effect=AssertionError("cache registry dikosongkan")):
+            old_token = self.event_link.access_token
+            self.assertTrue(self.env['ojt.event.link']._get_checkin_target(old_token))
+            self.event_link.access_token = 'token-baru'
+            self.assertIsNone(self.env['ojt.event.link']._get_checkin_target(old_token))
+            self.assertTrue(self.env['ojt.event.link']._get_checkin_target('token-baru'))
+
+            self.assertTrue(self.env['ojt.participant']._get_active_participant_id(self.partner.id, self.batch.id))
+            # versi naik di transaksi penulis, jadi konsisten dengan snapshot data pembaca
+            version = self.env['ojt.cache.version']._get_version('ojt.participant.active')
+            self.participant.state = 'left'
+            self.assertGreater(self.env['ojt.cache.version']._get_version('ojt.participant.active'), version)
+            self.assertIsNone(self.env['ojt.participant']._get_active_participant_id(self.partner.id, self.batch.id))
+
+    def test_upsert_attendance_bulk(self):
+        """Upsert banyak absensi sekaligus: baris baru dibuat, baris lama dipertahankan atau ditimpa"""
+        other_participant = self.env['ojt.participant'].create({
+            'partner_id': self.env['res.partner'].create({'name': 'Jane Doe'}).id,
+            'batch_id': self.batch.id,
+        })
+        existing = self.env['ojt.attendance'].create({
+            'participant_id': self.participant.id,
+            'event_link_id': self.event_link.id,
+            'presence': 'late',
+        })
+
+        result = self.env['ojt.attendance']._upsert_attendance([
+            {'participant_id': self.participant.id, 'event_link_id': self.event_link.id, 'presence': 'absent'},
+            {'participant_id': other_participant.id, 'event_link_id': self.event_link.id, 'presence': 'absent'},
+            {'participant_id': other_participant.id, 'event_link_id': self.event_link.id, 'presence': 'present'},
+        ])
+        self.assertEqual(result[(self.participant.id, self.event_link.id)], (existing.id, False))
+        new_id, created = result[(other_participant.id, self.event_link.id)]
+        self.assertTrue(created)
+
+        new_attendance = self.env['ojt.attendance'].browse(new_id)
+        self.assertEqual(existing.presence, 'late', "Baris lama tidak boleh diubah tanpa overwrite.")
+        self.assertEqual(new_attendance.presence, 'absent', "Pasangan duplikat memakai item pertama.")
+        self.assertEqual(new_attendance.batch_id, self.batch)
+        self.assertEqual(new_attendance.event_id, self.event)
+        self.assertEqual(other_participant.attendance_rate, 0.0)
+
+        self.env['ojt.attendance']._upsert_attendance([
+            {'participant_id': other_participant.id, 'event_link_id': self.event_link.id, 'presence': 'present'},
+        ], overwrite=True)
+        self.assertEqual(new_attendance.presence, 'present')
+        self.assertEqual(other_participant.attendance_rate, 100.0)
+
+    def test_ingest_kiosk_scans(self):
+        """Scan kiosk offline diproses massal dengan status dari waktu scan"""
+        late_partner = self.env['res.partner'].create({'name': 'Late Comer'})
+        late_participant = self.env['ojt.participant'].create({
+            'partner_id': late_partner.id,
+            'batch_id': self.batch.id,
+        })
+        self.env['ojt.attendance'].create({
+            'participant_id': late_participant.id,
+            'event_link_id': self.event_link.id,
+            'presence': 'absent',
+        })
+        start = self.event_link.date_start
+        token = self.event_link.access_token
+
+        results = self.env['ojt.attendance']._ingest_scans([
+            # waktu lokal +07:00, setara 5 menit setelah sesi dimulai
+            {'access_token': token, 'partner_id': self.partner.id,
+             'scanned_at': (start + timedelta(hours=7, minutes=5)).isoformat() + '+07:00'},
+            {'access_token': token, 'participant_id': late_participant.id,
+             'scanned_at': (start + timedelta(minutes=20)).isoformat()},
+            {'access_token': token, 'partner_id': self.partner.id,
+             'scanned_at': (start + timedelta(minutes=30)).isoformat()},
+            {'access_token': 'token-tidak-ada', 'partner_id': self.partner.id, 'scanned_at': start.isoformat()},
+            {'access_token': token, 'partner_id': self.env['res.partner'].create({'name': 'Tamu'}).id,
+             'scanned_at': start.isoformat()},
+            {'access_token': token, 'partner_id': self.partner.id, 'scanned_at': 'bukan-tanggal'},
+        ])
+
+        self.assertEqual([result['status'] for result in results],
+                         ['created', 'existing', 'existing', 'error', 'error', 'error'])
+        self.assertEqual([result.get('error') for result in results[3:]],
+                         ['unknown_session', 'not_registered', 'invalid_scan'])
+
+        attendance = self.env['ojt.attendance'].browse(results[0]['attendance_id'])
+        self.assertEqual(attendance.presence, 'present')
+        self.assertEqual(attendance.check_in, start + timedelta(minutes=5), "Scan paling awal yang dipakai.")
+        self.assertEqual(results[2]['attendance_id'], attendance.id)
+
+        late_attendance = self.env['ojt.attendance'].browse(results[1]['attendance_id'])
+        self.assertEqual(late_attendance.presence, 'late', "Absensi 'absent' digantikan oleh scan kiosk.")
+        self.assertEqual(late_participant.attendance_rate, 100.0)
+
+    def test_signed_checkin_token(self):
+        """Token QR bertanda tangan hanya berlaku pada window aktif dan window sebelumnya"""
+        EventLink = self.env['ojt.event.link']
+        static_token = self.event_link.access_token
+        self.event_link.write({'qr_mode': 'signed', 'qr_rotation_interval': 30})
+        self.assertTrue(self.event_link.sudo().qr_secret)
+        self.assertIsNone(EventLink._resolve_checkin_token(static_token),
+                          "Token statis ditolak untuk sesi mode bertanda tangan.")
+
+        now = 1_800_000_000
+        token = self.event_link._get_checkin_token(at=now)
+        target = (self.event_link.id, self.batch.id, self.event.id)
+        self.assertEqual(EventLink._resolve_checkin_token(token, at=now), target)
+        self.assertEqual(EventLink._resolve_checkin_token(token, at=now + 30), target)
+        self.assertIsNone(EventLink._resolve_checkin_token(token, at=now + 60), "Token kedaluwarsa.")
+
+        link_id, window, signature = token.split('.')
+        forged = f'{link_id}.{int(window) + 1}.{signature}'
+        self.assertIsNone(EventLink._resolve_checkin_token(forged, at=now + 30), "Tanda tangan palsu ditolak.")
+
+        self.event_link.action_rotate_qr_secret()
+        self.assertIsNone(EventLink._resolve_checkin_token(token, at=now), "Rotasi secret membatalkan token lama.")
+        with patch.object(type(EventLink), 'write', side_effect=AssertionError("token QR menulis ke database")):
+            self.event_link.invalidate_recordset()
+            self.event_link._get_checkin_token(at=now)
+
+        scanned_at = datetime.utcfromtimestamp(now)
+        results = self.env['ojt.attendance']._ingest_scans([{
+            'access_token': self.event_link._get_checkin_token(at=now),
+            'partner_id': self.partner.id,
+            'scanned_at': scanned_at.isoformat(),
+        }])
+        self.assertEqual(results[0]['status'], 'created')
+
+    def test_mark_absentees_multi_session(self):
+        """Absensi 'absent' dibuat sekaligus untuk semua sesi terpilih, tanpa menimpa yang sudah ada"""
+        other_participant = self.env['ojt.participant'].create({
+            'partner_id': self.env['res.partner'].create({'name': 'Jane Doe'}).id,
+            'batch_id': self.batch.id,
+        })
+        second_link = self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.env['event.event'].create({
+                'name': 'OJT Session 2',
+                'date_begin': datetime.now(),
+                'date_end': datetime.now() + timedelta(hours=2),
+            }).id,
+        })
+        self.env['ojt.attendance'].create({
+            'participant_id': self.participant.id,
+            'event_link_id': self.event_link.id,
+            'presence': 'present',
+        })
+
+        sessions = self.event_link | second_link
+        sessions.action_mark_absentees()
+
+        attendances = self.env['ojt.attendance'].search([('event_link_id', 'in', sessions.ids)])
+        self.assertEqual(len(attendances), 4)
+        self.assertEqual(len(attendances.filtered(lambda a: a.presence == 'absent')), 3)
+        self.assertTrue(all(sessions.mapped('absentees_marked')))
+        self.assertEqual(self.participant.attendance_rate, 50.0)
+        self.assertEqual(other_participant.attendance_rate, 0.0)
+
+        with self.assertRaises(UserError):
+            sessions.action_mark_absentees()
+
+    def test_cron_mark_absentees_after_grace(self):
+        """Cron hanya memproses sesi batch berjalan yang berakhir lebih dari masa tenggang"""
+        self.env['ir.config_parameter'].sudo().set_param('solvera_ojt_core.absentee_grace_minutes', 30)
+        self.event.write({
+            'date_begin': datetime.now() - timedelta(hours=1),
+            'date_end': datetime.now() - timedelta(minutes=10),
+        })
+        self.batch.write({'state': 'ongoing'})
+        self.env['ojt.event.link']._cron_mark_absentees()
+        self.assertFalse(self.event_link.absentees_marked)
+
+        self.event.date_end = datetime.now() - timedelta(minutes=40)
+        self.batch.write({'state': 'done'})
+        self.env['ojt.event.link']._cron_mark_absentees()
+        self.assertFalse(self.event_link.absentees_marked, "Sesi batch yang sudah selesai tidak diproses.")
+
+        self.batch.write({'state': 'ongoing'})
+        self.env['ojt.event.link']._cron_mark_absentees()
+        self.assertTrue(self.event_link.absentees_marked)
+        attendance = self.env['ojt.attendance'].search([('event_link_id', '=', self.event_link.id)])
+        self.assertEqual(attendance.participant_id, self.participant)
+        self.assertEqual(attendance.presence, 'absent')
+        self.assertTrue(attendance.check_in)
@@ -262,6 +262,7 @@ class TestOjtBatch(TransactionCase):
 
         # Lakukan aksi: ubah status batch menjadi 'ongoing'
         self.batch.action_ongoing()
+        self.env['ojt.notification.queue']._process_queue()
 
         # Hitung kembali jumlah email setelah aksi
         final_mail_count = self.env['mail.mail'].search_count([])
@@ -291,6 +292,7 @@ class TestOjtBatch(TransactionCase):
         # --- Act (Aksi) ---
         # Lakukan aksi: ubah status batch menjadi 'done'
         self.batch.action_done()
+        self.env['ojt.notification.queue']._process_queue()
 
         # --- Assert (Verifikasi) ---
         # Hitung kembali jumlah email setelah aksi
@@ -334,6 +336,7 @@ class TestOjtBatch(TransactionCase):
         # --- Act ---
         # Mentor menambahkan survei ke batch
         self.batch.write({'survey_id': survey.id})
+        self.env['ojt.notification.queue']._process_queue()
 
         # --- Assert ---
         final_mail_count = self.env['mail.mail'].search_count([])
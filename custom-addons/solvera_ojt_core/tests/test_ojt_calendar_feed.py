@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo.addons.solvera_ojt_core.controllers.ojt_calendar_controller import (
+    CalendarFeedCache, ics_escape, ics_line, iter_calendar,
+)
+
+
+class TestOjtCalendarFeed(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtCalendarFeed, self).setUp()
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Kalender', 'start_date': '2025-11-01', 'end_date': '2025-11-30',
+        })
+        self.participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': 'Peserta Kalender'}).id,
+        })
+        events = self.env['event.event'].create([{
+            'name': name,
+            'date_begin': date_begin,
+            'date_end': date_end,
+        } for name, date_begin, date_end in [
+            ('Sesi Kedua; Lanjutan, Praktik', '2025-11-12 02:00:00', '2025-11-12 05:00:00'),
+            ('Sesi Pertama', '2025-11-05 02:00:00', '2025-11-05 04:00:00'),
+        ]])
+        self.links = self.env['ojt.event.link'].create([{
+            'batch_id': self.batch.id,
+            'event_id': event.id,
+        } for event in events])
+
+    def test_01_line_folding(self):
+        """Tes: Baris panjang dilipat per 75 oktet tanpa memotong karakter UTF-8."""
+        value = ics_escape('Sesi orientasi peserta — ' * 10)
+        folded = ics_line('DESCRIPTION', value)
+        physical = folded.split(b'\r\n')[:-1]
+        self.assertTrue(all(len(line) <= 75 for line in physical))
+        self.assertTrue(all(line.startswith(b' ') for line in physical[1:]))
+        unfolded = folded.decode().replace('\r\n ', '').rstrip('\r\n')
+        self.assertEqual(unfolded, f'DESCRIPTION:{value}')
+
+    def test_02_feed_content(self):
+        """Tes: Feed berisi satu VEVENT per sesi, terurut dan ter-escape."""
+        self.assertTrue(self.participant.portal_token)
+        self.assertTrue(self.participant.calendar_url.endswith(f'/ojt/calendar/{self.participant.portal_token}.ics'))
+        feed = b''.join(iter_calendar(
+            self.batch.name, self.batch._get_calendar_events(), 'https://ojt.example.com')).decode()
+        self.assertTrue(feed.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(feed.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(feed.count('BEGIN:VEVENT'), 2)
+        self.assertLess(feed.index('SUMMARY:Sesi Pertama'), feed.index('SUMMARY:Sesi Kedua'))
+        self.assertIn('SUMMARY:Sesi Kedua\\; Lanjutan\\, Praktik', feed)
+        self.assertIn(f'UID:ojt-session-{self.links[1].id}@ojt.example.com', feed)
+        self.assertIn('DTSTART:20251105T020000Z', feed)
+
+    def test_03_calendar_target(self):
+        """Tes: Token diresolusi dengan satu query; versi berubah saat agenda berubah."""
+        Participant = self.env['ojt.participant']
+        self.env.flush_all()
+        query_count = self.env.cr.sql_log_count
+        batch_id, version, last_modified = Participant._get_calendar_target(self.participant.portal_token)
+        self.assertEqual(self.env.cr.sql_log_count - query_count, 1)
+        self.assertEqual(batch_id, self.batch.id)
+        self.assertTrue(last_modified)
+
+        self.links[0].unlink()
+        self.assertNotEqual(Participant._get_calendar_target(self.participant.portal_token)[1], version)
+
+        old_token = self.participant.portal_token
+        self.participant.action_reset_portal_token()
+        self.assertIsNone(Participant._get_calendar_target(old_token))
+        self.participant.state = 'left'
+        self.assertIsNone(Participant._get_calendar_target(self.participant.portal_token))
+
+    def test_04_feed_cache(self):
+        """Tes: Cache feed membuang entri yang paling lama tidak dipakai."""
+        cache = CalendarFeedCache(max_entries=2)
+        cache.set('a', b'A')
+        cache.set('b', b'B')
+        self.assertEqual(cache.get('a'), b'A')
+        cache.set('c', b'C')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'A')
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import zipfile
+from unittest.mock import patch
+
+from odoo import Command
+from odoo.tests.common import TransactionCase
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+
+def _blank_pdf():
+    writer = PdfFileWriter()
+    writer.addBlankPage(595, 842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class TestOjtCertificateJob(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtCertificateJob, self).setUp()
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Ekspor',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+            'state': 'done',
+        })
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Ekspor {i}'}).id,
+        } for i in range(3)])
+        self.certificates = self.env['ojt.certificate'].create([{
+            'name': 'Sertifikat Ekspor',
+            'batch_id': self.batch.id,
+            'participant_id': participant.id,
+        } for participant in participants])
+        self.certificates[:2].action_issue()
+        self.render = patch.object(
+            type(self.env['ir.actions.report']), '_render_qweb_pdf', return_value=(_blank_pdf(), 'pdf')).start()
+        self.addCleanup(patch.stopall)
+
+    def _export(self, export_format):
+        action = self.batch.with_context(export_format=export_format).action_export_certificates()
+        job = self.env['ojt.certificate.job'].browse(action['res_id'])
+        self.env['ojt.certificate.job']._process_jobs()
+        self.assertEqual(job.state, 'done')
+        return job
+
+    def test_01_merged_pdf_export(self):
+        """Tes: Ekspor PDF menggabungkan semua sertifikat terbit menjadi satu dokumen."""
+        job = self._export('pdf')
+        self.assertEqual((job.done_count, job.total_count, job.progress), (2, 2, 100.0))
+        self.assertEqual(job.attachment_id.mimetype, 'application/pdf')
+        self.assertEqual(PdfFileReader(io.BytesIO(job.attachment_id.raw)).getNumPages(), 2)
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_02_zip_export_reuses_cached_pdfs(self):
+        """Tes: Ekspor ZIP berisi satu PDF per peserta dan memakai PDF yang sudah dirender."""
+        self._export('pdf')
+        job = self._export('zip')
+        self.assertEqual(self.render.call_count, 2, "PDF yang sudah ada tidak boleh dirender ulang.")
+        with zipfile.ZipFile(io.BytesIO(job.attachment_id.raw)) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.endswith('.pdf') for name in names))
+
+        # hasil disalin langsung ke filestore dengan metadata yang sama seperti ir.attachment
+        attachment = job.attachment_id
+        if attachment._storage() == 'file':
+            raw = attachment.raw
+            self.assertTrue(attachment.store_fname)
+            self.assertEqual(attachment.file_size, len(raw))
+            self.assertEqual(attachment.checksum, hashlib.sha1(raw).hexdigest())
+
+    def test_03_export_render_failure(self):
+        """Tes: Render yang gagal dicatat di pekerjaan dan pekerjaan berstatus gagal, bukan tertahan running."""
+        self.render.side_effect = [(_blank_pdf(), 'pdf'), Exception("wkhtmltopdf crashed")]
+        action = self.batch.with_context(export_format='zip').action_export_certificates()
+        job = self.env['ojt.certificate.job'].browse(action['res_id'])
+        self.env['ojt.certificate.job']._process_jobs()
+        self.assertEqual(job.state, 'failed')
+        self.assertIn('wkhtmltopdf crashed', job.last_error)
+        self.assertFalse(job.attachment_id)
+        self.assertEqual(len(self.certificates.filtered('pdf_attachment_id')), 1,
+                         "Sertifikat lain di chunk yang sama tetap dirender.")
+
+    def test_04_generate_job_in_chunks(self):
+        """Tes: Pekerjaan generate membuat sertifikat per chunk dengan nomor seri berurutan."""
+        self.env['ir.config_parameter'].sudo().set_param('solvera_ojt_core.certificate_generate_chunk_size', 2)
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Generate {i}'}).id,
+        } for i in range(5)])
+        existing = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat Lama',
+            'batch_id': self.batch.id,
+            'participant_id': participants[0].id,
+        })
+        queue_count = self.env['ojt.notification.queue'].search_count([])
+
+        job = self.env['ojt.certificate.job'].create({
+            'batch_id': self.batch.id,
+            'job_type': 'generate',
+            'participant_ids': [Command.set(participants.ids)],
+        })
+        self.env['ojt.certificate.job']._process_jobs()
+
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.progress, 100.0)
+        self.assertEqual(job.certificate_ids.participant_id, participants[1:],
+                         "Peserta yang sudah punya sertifikat dilewati tanpa overwrite.")
+        self.assertTrue(existing.exists())
+        self.assertEqual(set(job.certificate_ids.mapped('state')), {'issued'})
+        serials = job.certificate_ids.sorted('id').mapped('serial')
+        self.assertEqual(len(set(serials)), 4)
+        self.assertEqual(serials, sorted(serials), "Nomor seri dipesan berurutan per chunk.")
+        self.assertEqual(self.env['ojt.notification.queue'].search_count([]), queue_count + 4,
+                         "Email sertifikat diantrekan, satu per sertifikat baru.")
+
+    def test_05_generate_job_overwrite(self):
+        """Tes: Dengan overwrite, sertifikat lama diganti sertifikat baru."""
+        participant = self.certificates[0].participant_id
+        job = self.env['ojt.certificate.job'].create({
+            'batch_id': self.batch.id,
+            'job_type': 'generate',
+            'participant_ids': [Command.set(participant.ids)],
+            'overwrite_existing': True,
+        })
+        self.env['ojt.certificate.job']._process_jobs()
+        self.assertFalse(self.certificates[0].exists())
+        self.assertEqual(job.certificate_ids.participant_id, participant)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+from odoo.addons.solvera_ojt_core.models import ojt_certificate_key
+from odoo.addons.solvera_ojt_core.models.ojt_certificate_key import Ed25519PrivateKey
+
+
+@unittest.skipIf(not Ed25519PrivateKey, "cryptography library not installed")
+class TestOjtCertificateKey(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtCertificateKey, self).setUp()
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Tanda Tangan',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+            'certificate_signed_qr': True,
+        })
+        self.certificate = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat Bertanda Tangan',
+            'batch_id': self.batch.id,
+            'participant_id': self.env['ojt.participant'].create({
+                'batch_id': self.batch.id,
+                'partner_id': self.env['res.partner'].create({'name': 'Peserta Tanda Tangan'}).id,
+            }).id,
+        })
+        self.Key = self.env['ojt.certificate.key']
+
+    def test_01_issued_certificate_is_signed(self):
+        """Tes: Sertifikat terbit membawa payload bertanda tangan yang dapat diverifikasi."""
+        self.assertFalse(self.certificate.signed_payload, "Draft tidak ditandatangani.")
+        self.certificate.action_issue()
+
+        token = self.certificate.signed_payload
+        self.assertTrue(token.startswith('ojt1.'))
+        self.assertTrue(self.certificate._get_verify_url().endswith(f'#{token}'))
+        claims = self.Key._verify_signed_payload(token)
+        self.assertEqual(claims['s'], self.certificate.serial)
+        self.assertEqual(claims['n'], 'Peserta Tanda Tangan')
+        self.assertEqual(claims['b'], 'Batch Tanda Tangan')
+        self.assertEqual(claims['k'], self.Key._get_signing_key().kid)
+
+        prefix, payload, signature = token.split('.')
+        tampered = self.certificate.signed_payload.replace(payload, payload[:-2] + ('AA' if payload[-2:] != 'AA' else 'BB'))
+        self.assertIsNone(self.Key._verify_signed_payload(tampered))
+        self.assertIsNone(self.Key._verify_signed_payload('bukan-token'))
+
+    def test_02_retired_key_still_verifies(self):
+        """Tes: Kunci yang dipensiunkan tetap dipublikasikan dan memverifikasi sertifikat lama."""
+        self.certificate.action_issue()
+        old_token = self.certificate.signed_payload
+        old_key = self.Key._get_signing_key()
+        old_key.action_retire()
+        new_key = self.Key._ensure_signing_key()
+        self.assertNotEqual(new_key, old_key)
+
+        self.assertTrue(self.Key._verify_signed_payload(old_token))
+        kids = {key['kid']: key['status'] for key in self.Key._get_key_set()['keys']}
+        self.assertEqual(kids[old_key.kid], 'retired')
+        self.assertEqual(kids[new_key.kid], 'active')
+
+    def test_03_key_changes_keep_registry_cache(self):
+        """Tes: Kunci yang dihapus tidak lagi memverifikasi, tanpa mengosongkan cache registry."""
+        registry_class = type(self.env.registry)
+        with patch.object(registry_class, 'clear_cache', side_effect=AssertionError("cache registry dikosongkan")):
+            self.certificate.action_issue()
+            token = self.certificate.signed_payload
+            self.assertTrue(self.Key._verify_signed_payload(token))
+
+            key = self.Key._get_signing_key()
+            key.action_retire()
+            self.assertTrue(self.Key._verify_signed_payload(token))
+            key.unlink()
+            self.assertIsNone(self.Key._verify_signed_payload(token))
+
+
+class TestOjtCertificateKeyUnavailable(TransactionCase):
+
+    def test_01_signed_qr_without_cryptography(self):
+        """Tes: Tanpa library 'cryptography', batch QR bertanda tangan tetap bisa dibuat dan
+        sertifikat terbit dengan QR tanpa tanda tangan."""
+        with patch.object(ojt_certificate_key, 'Ed25519PrivateKey', None):
+            batch = self.env['ojt.batch'].create({
+                'name': 'Batch Tanpa Cryptography',
+                'start_date': '2025-11-01',
+                'end_date': '2025-11-30',
+                'certificate_signed_qr': True,
+            })
+            certificate = self.env['ojt.certificate'].create({
+                'name': 'Sertifikat Tanpa Tanda Tangan',
+                'batch_id': batch.id,
+                'participant_id': self.env['ojt.participant'].create({
+                    'batch_id': batch.id,
+                    'partner_id': self.env['res.partner'].create({'name': 'Peserta Tanpa Tanda Tangan'}).id,
+                }).id,
+            })
+            certificate.action_issue()
+
+        self.assertTrue(batch.certificate_signed_qr)
+        self.assertEqual(certificate.state, 'issued')
+        self.assertFalse(certificate.signed_payload)
+        self.assertNotIn('#', certificate._get_verify_url())
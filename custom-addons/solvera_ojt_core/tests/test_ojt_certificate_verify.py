@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+from odoo.addons.solvera_ojt_core.controllers.ojt_rate_limit import TokenBucketLimiter
+from odoo.addons.solvera_ojt_core.models.ojt_certificate import verification_cache
+
+
+class TestOjtCertificateVerify(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtCertificateVerify, self).setUp()
+        batch = self.env['ojt.batch'].create({
+            'name': 'Batch Verifikasi',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+        })
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Verifikasi {i}'}).id,
+        } for i in range(2)])
+        self.certificates = self.env['ojt.certificate'].create([{
+            'name': 'Sertifikat Verifikasi',
+            'batch_id': batch.id,
+            'participant_id': participant.id,
+        } for participant in participants])
+        self.certificates.action_issue()
+
+    def test_01_verify_is_cached_and_invalidated(self):
+        """Tes: Hasil verifikasi di-cache dan diperbarui saat status sertifikat berubah."""
+        Certificate = self.env['ojt.certificate']
+        certificate = self.certificates[0]
+        result = Certificate._verify(token=certificate.qr_token)
+        self.assertEqual((result['status'], result['valid'], result['serial']), ('issued', True, certificate.serial))
+        self.assertEqual(result['participant'], 'Peserta Verifikasi 0')
+
+        # hanya membaca versi cache
+        with self.assertQueryCount(1):
+            Certificate._verify(token=certificate.qr_token)
+
+        registry_class = type(self.env.registry)
+        with patch.object(registry_class, 'clear_cache', side_effect=AssertionError("cache registry dikosongkan")):
+            certificate.action_revoke()
+        result = Certificate._verify(serial=certificate.serial)
+        self.assertEqual((result['status'], result['valid']), ('revoked', False))
+
+        self.assertIsNone(Certificate._verify(token='token-tidak-ada'))
+        self.assertNotIn((self.env.cr.dbname, ('qr_token', 'token-tidak-ada')), verification_cache._entries,
+                         "Token yang tidak ditemukan tidak boleh disimpan di cache.")
+
+    def test_02_verify_bulk(self):
+        """Tes: Verifikasi massal mengembalikan satu hasil per token atau nomor seri."""
+        self.certificates[1].action_revoke()
+        results = self.env['ojt.certificate']._verify_bulk(
+            tokens=[self.certificates[0].qr_token, 'token-tidak-ada'],
+            serials=[self.certificates[1].serial],
+        )
+        self.assertEqual([(result['status'], result['valid']) for result in results],
+                         [('issued', True), ('not_found', False), ('revoked', False)])
+        self.assertEqual(results[2]['serial'], self.certificates[1].serial)
+
+    def test_03_token_bucket(self):
+        """Tes: Token bucket menolak permintaan setelah burst habis lalu terisi kembali."""
+        limiter = TokenBucketLimiter(max_keys=2)
+        with patch('time.monotonic', return_value=100.0):
+            self.assertEqual(limiter.consume('1.1.1.1', 60, 2), 0)
+            self.assertEqual(limiter.consume('1.1.1.1', 60, 2), 0)
+            self.assertEqual(limiter.consume('1.1.1.1', 60, 2), 1)
+            self.assertEqual(limiter.consume('2.2.2.2', 60, 2, cost=5), 3)
+        with patch('time.monotonic', return_value=101.0):
+            self.assertEqual(limiter.consume('1.1.1.1', 60, 2), 0)
+            limiter.consume('3.3.3.3', 60, 2)
+        self.assertNotIn('2.2.2.2', limiter._buckets, "Kunci yang paling lama tidak dipakai dibuang.")
+
+    def test_04_verify_follows_displayed_names(self):
+        """Tes: Mengganti nama peserta atau batch memperbarui hasil verifikasi yang di-cache."""
+        Certificate = self.env['ojt.certificate']
+        certificate = self.certificates[0]
+        Certificate._verify(token=certificate.qr_token)
+
+        certificate.partner_id.name = 'Nama Baru'
+        certificate.batch_id.name = 'Batch Baru'
+        result = Certificate._verify(token=certificate.qr_token)
+        self.assertEqual((result['participant'], result['batch']), ('Nama Baru', 'Batch Baru'))
+
+        other_partner = self.env['res.partner'].create({'name': 'Peserta Pengganti'})
+        certificate.participant_id.partner_id = other_partner
+        self.assertEqual(Certificate._verify(token=certificate.qr_token)['participant'], 'Peserta Pengganti')
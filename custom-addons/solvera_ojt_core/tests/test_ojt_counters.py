@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+
+
+class TestOjtCounters(TransactionCase):
+    """
+    Kelompok tes jumlah query untuk smart button counter (ojt.counter.mixin).
+    """
+
+    def setUp(self):
+        super(TestOjtCounters, self).setUp()
+        self.survey = self.env['survey.survey'].create({'title': 'Survei Counter'})
+
+    def _create_batches(self, count):
+        batches = self.env['ojt.batch'].create([{
+            'name': f'Batch Counter {count}-{i}',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+            'survey_id': self.survey.id,
+        } for i in range(count)])
+        links = self.env['ojt.event.link'].create([{
+            'batch_id': batch.id,
+            'event_id': self.env['event.event'].create({'name': f'Sesi Counter {batch.id}'}).id,
+        } for batch in batches])
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Counter {batch.id}-{i}'}).id,
+        } for batch in batches for i in range(2)])
+        self.env['ojt.attendance'].create([{
+            'participant_id': participant.id,
+            'event_link_id': links.filtered(lambda l: l.batch_id == participant.batch_id).id,
+        } for participant in participants])
+        self.env['survey.user_input'].create([{
+            'survey_id': self.survey.id,
+            'partner_id': participant.partner_id.id,
+        } for participant in participants])
+        self.env.flush_all()
+        return batches, links, participants
+
+    def _count_queries(self, records, fnames):
+        records.invalidate_recordset()
+        records = records.browse(records.ids)
+        query_count = self.env.cr.sql_log_count
+        values = [records.mapped(fname) for fname in fnames]
+        return self.env.cr.sql_log_count - query_count, values
+
+    def _assert_flat(self, small, large, fnames):
+        small_count, small_values = self._count_queries(small, fnames)
+        large_count, large_values = self._count_queries(large, fnames)
+        self.assertEqual(small_count, large_count, "Jumlah query tidak boleh bergantung pada jumlah record.")
+        return small_values, large_values
+
+    def test_01_batch_counters(self):
+        """Tes: Counter batch dihitung dengan jumlah query tetap."""
+        small = self._create_batches(2)[0]
+        large = self._create_batches(20)[0]
+        small_values, large_values = self._assert_flat(small, large, ['participant_count', 'event_link_count'])
+        self.assertEqual(set(large_values[0]), {2})
+        self.assertEqual(set(large_values[1]), {1})
+
+    def test_02_event_link_counters(self):
+        """Tes: Counter sesi dihitung dengan jumlah query tetap."""
+        small = self._create_batches(2)[1]
+        large = self._create_batches(20)[1]
+        small_values, large_values = self._assert_flat(
+            small, large, ['participant_count', 'attendance_count', 'assignment_count'])
+        self.assertEqual(set(large_values[0]), {2})
+        self.assertEqual(set(large_values[1]), {2})
+        self.assertEqual(set(large_values[2]), {0})
+
+    def test_03_participant_counters(self):
+        """Tes: Counter peserta, termasuk jumlah survei, dihitung dengan jumlah query tetap."""
+        small = self._create_batches(2)[2]
+        large = self._create_batches(20)[2]
+        small_values, large_values = self._assert_flat(
+            small, large, ['assignment_submit_count', 'certificate_count', 'survey_count'])
+        self.assertEqual(set(large_values[0]), {0})
+        self.assertEqual(set(large_values[2]), {1})
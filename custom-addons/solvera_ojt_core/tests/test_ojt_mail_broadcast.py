@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class OjtBroadcastCase(TransactionCase):
+
+    def setUp(self):
+        super(OjtBroadcastCase, self).setUp()
+        self.queue = self.env['ojt.notification.queue']
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Broadcast',
+            'start_date': fields.Date.today(),
+            'end_date': fields.Date.today() + timedelta(days=30),
+        })
+        self.event = self.env['event.event'].create({
+            'name': 'Sesi Broadcast',
+            'date_begin': fields.Datetime.now() + timedelta(days=1),
+            'date_end': fields.Datetime.now() + timedelta(days=1, hours=2),
+        })
+
+
+class TestOjtMailBroadcast(OjtBroadcastCase):
+
+    def test_01_agenda_rendered_once_per_record(self):
+        """Tes: Agenda baru dirender sekali lalu dipersonalisasi untuk setiap peserta."""
+        partners = self.env['res.partner'].create([{
+            'name': f'Peserta <{i}>',
+            'email': f'broadcast{i}@example.com',
+        } for i in range(3)])
+        self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': partner.id,
+        } for partner in partners])
+        link = self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.event.id,
+        })
+        initial_mail_count = self.env['mail.mail'].search_count([])
+
+        MailTemplate = type(self.env['mail.template'])
+        with patch.object(MailTemplate, '_generate_template', autospec=True,
+                          side_effect=MailTemplate._generate_template) as generate:
+            self.queue._process_queue()
+        self.assertEqual(generate.call_count, 1, "Template seharusnya hanya dirender sekali.")
+
+        mails = self.env['mail.mail'].search([], order='id desc', limit=3)
+        self.assertEqual(self.env['mail.mail'].search_count([]), initial_mail_count + 3)
+        self.assertEqual(set(mails.mapped('email_to')), set(partners.mapped('email')))
+        for mail in mails:
+            partner = partners.filtered(lambda p: p.email == mail.email_to)
+            self.assertIn('Peserta &lt;', mail.body_html, "Nama peserta harus di-escape di body HTML.")
+            self.assertIn(partner.name.replace('<', '&lt;').replace('>', '&gt;'), mail.body_html)
+            self.assertIn(f'/my/agenda/join/{link.id}', mail.body_html)
+            self.assertNotIn('__ojt_broadcast_', mail.body_html)
+
+    def test_02_render_broadcast_shared_values(self):
+        """Tes: Nilai context yang sama untuk semua penerima tidak diganti token."""
+        link = self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.event.id,
+        })
+        template = self.env.ref('solvera_ojt_core.mail_template_new_ojt_agenda')
+        vals_list = self.queue._render_broadcast(template, link.id, [{
+            'res_id': link.id,
+            'context': {
+                'participant_name_placeholder': name,
+                'participant_email_placeholder': f'{name.lower()}@example.com',
+                'autolog_join_url': 'https://example.com/join',
+            },
+        } for name in ('Ani', 'Budi')])
+
+        self.assertEqual([vals['email_to'] for vals in vals_list], ['ani@example.com', 'budi@example.com'])
+        self.assertIn('Ani', vals_list[0]['body_html'])
+        self.assertIn('Budi', vals_list[1]['body_html'])
+        self.assertIn('https://example.com/join', vals_list[1]['body_html'])
+
+    def test_03_failed_broadcast_mails_requeued(self):
+        """Tes: Email broadcast yang gagal diantrikan ulang per penerima dan dikirim ulang oleh outbox."""
+        partners = self.env['res.partner'].create([
+            {'name': 'Peserta Berhasil', 'email': 'berhasil@example.com'},
+            {'name': 'Peserta Gagal', 'email': 'gagal@example.com'},
+        ])
+        self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': partner.id,
+        } for partner in partners])
+        self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.event.id,
+        })
+
+        def send_email(message, *args, **kwargs):
+            if 'gagal@example.com' in message['To']:
+                raise ConnectionError("SMTP menolak penerima")
+            return message['Message-Id']
+
+        IrMailServer = type(self.env['ir.mail_server'])
+        with patch.object(IrMailServer, 'send_email', side_effect=send_email):
+            self.queue._process_queue()
+
+        retry = self.queue.search([('res_model', '=', 'mail.mail')])
+        self.assertEqual(len(retry), 1, "Hanya email yang gagal yang diantrikan ulang.")
+        failed_mail = self.env['mail.mail'].browse(retry.res_id)
+        self.assertEqual(failed_mail.email_to, 'gagal@example.com')
+        self.assertEqual(failed_mail.state, 'exception')
+        self.assertEqual((retry.state, retry.attempts), ('pending', 1))
+        self.assertGreater(retry.next_attempt, fields.Datetime.now())
+
+        retry.next_attempt = fields.Datetime.now()
+        self.queue._process_queue()
+        self.assertEqual(retry.state, 'sent')
+
+
+@tagged('-standard', 'ojt_perf')
+class TestOjtMailBroadcastBenchmark(OjtBroadcastCase):
+    """Benchmark render agenda: broadcast vs render penuh per penerima.
+
+    Jalankan dengan ``--test-tags ojt_perf``.
+    """
+
+    def _messages(self, link, count):
+        return [{
+            'res_id': link.id,
+            'context': {
+                'participant_name_placeholder': f'Peserta {i}',
+                'participant_email_placeholder': f'peserta{i}@example.com',
+                'autolog_join_url': f'https://example.com/my/agenda/join/{link.id}',
+            },
+        } for i in range(count)]
+
+    def test_render_scaling(self):
+        link = self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.event.id,
+        })
+        template = self.env.ref('solvera_ojt_core.mail_template_new_ojt_agenda')
+        MailTemplate = type(self.env['mail.template'])
+
+        for count in (50, 500, 5000):
+            messages = self._messages(link, count)
+
+            with patch.object(MailTemplate, '_generate_template', autospec=True,
+                              side_effect=MailTemplate._generate_template) as generate:
+                start = time.perf_counter()
+                vals_list = self.queue._render_broadcast(template, link.id, messages)
+                broadcast_time = time.perf_counter() - start
+            self.assertEqual(generate.call_count, 1)
+            self.assertEqual(len(vals_list), count)
+            self.assertEqual(len({vals['email_to'] for vals in vals_list}), count)
+
+            # render penuh per penerima hanya diukur untuk sebagian sampel lalu diekstrapolasi
+            sample = messages[:50]
+            start = time.perf_counter()
+            for message in sample:
+                template.with_context(**message['context'])._generate_template([link.id], ('body_html', 'subject', 'email_to'))
+            per_recipient_time = (time.perf_counter() - start) / len(sample) * count
+
+            _logger.info(
+                "OJT broadcast render, %s recipients: broadcast %.3fs, per-recipient ~%.3fs",
+                count, broadcast_time, per_recipient_time,
+            )
+            self.assertLess(broadcast_time, per_recipient_time)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestOjtNotificationQueue(TransactionCase):
+    """
+    Kelompok tes untuk antrian notifikasi (outbox) OJT.
+    """
+
+    def setUp(self):
+        super(TestOjtNotificationQueue, self).setUp()
+        self.queue = self.env['ojt.notification.queue']
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Outbox',
+            'start_date': fields.Date.today(),
+            'end_date': fields.Date.today(),
+            'state': 'recruit',
+        })
+        self.participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({
+                'name': f'Peserta Outbox {i}',
+                'email': f'outbox{i}@example.com',
+            }).id,
+        } for i in range(3)])
+
+    def test_01_hook_only_enqueues(self):
+        """Tes: Memulai batch hanya membuat satu baris antrian, tanpa mengirim email."""
+        initial_mail_count = self.env['mail.mail'].search_count([])
+
+        self.batch.action_ongoing()
+
+        jobs = self.queue.search([('res_model', '=', 'ojt.batch'), ('res_id', '=', self.batch.id)])
+        self.assertEqual(len(jobs), 1, "Seharusnya hanya ada satu baris fan-out untuk batch.")
+        self.assertEqual(jobs.state, 'pending')
+        self.assertEqual(self.env['mail.mail'].search_count([]), initial_mail_count,
+                         "Email tidak boleh dibuat di dalam transaksi pengguna.")
+
+    def test_02_worker_fans_out_and_sends(self):
+        """Tes: Worker memecah baris fan-out menjadi satu email per peserta."""
+        initial_mail_count = self.env['mail.mail'].search_count([])
+        self.batch.action_ongoing()
+
+        self.queue._process_queue(chunk_size=2)
+
+        jobs = self.queue.search([('template_id', '=', self.env.ref('solvera_ojt_core.mail_template_batch_ongoing').id)])
+        self.assertEqual(len(jobs), 4, "Satu baris fan-out dan tiga baris per peserta.")
+        self.assertEqual(set(jobs.mapped('state')), {'sent'})
+        self.assertEqual(self.env['mail.mail'].search_count([]), initial_mail_count + 3)
+
+    def test_03_failed_send_is_retried_with_backoff(self):
+        """Tes: Pengiriman yang gagal dijadwalkan ulang dengan jeda yang makin panjang."""
+        template = self.env.ref('solvera_ojt_core.mail_template_mentor_score')
+        job = self.queue._enqueue(template, [{'res_id': self.participants[0].id}])
+
+        with patch.object(type(self.env['mail.template']), 'send_mail', side_effect=Exception('SMTP down')):
+            self.queue._process_queue()
+            self.assertEqual(job.state, 'pending')
+            self.assertEqual(job.attempts, 1)
+            self.assertIn('SMTP down', job.last_error)
+            first_delay = job.next_attempt - fields.Datetime.now()
+
+            job.next_attempt = fields.Datetime.now() - timedelta(seconds=1)
+            self.queue._process_queue()
+            self.assertEqual(job.attempts, 2)
+            self.assertGreater(job.next_attempt - fields.Datetime.now(), first_delay)
+
+        self.env['ir.config_parameter'].sudo().set_param('solvera_ojt_core.notification_max_attempts', 3)
+        with patch.object(type(self.env['mail.template']), 'send_mail', side_effect=Exception('SMTP down')):
+            job.next_attempt = fields.Datetime.now() - timedelta(seconds=1)
+            self.queue._process_queue()
+        self.assertEqual(job.state, 'failed', "Setelah batas percobaan tercapai, status menjadi 'failed'.")
+
+        job.action_retry()
+        self.queue._process_queue()
+        self.assertEqual(job.state, 'sent')
+
+    def test_04_digest_mode_buffers_and_consolidates(self):
+        """Tes: Peserta dengan mode digest menerima satu email ringkasan."""
+        self.batch.notification_mode = 'digest'
+        participant = self.participants[0]
+        assignments = self.env['ojt.assignment'].create([{
+            'name': f'Tugas Digest {i}',
+            'batch_id': self.batch.id,
+        } for i in range(2)])
+        submissions = self.env['ojt.assignment.submit'].create([{
+            'assignment_id': assignment.id,
+            'participant_id': participant.id,
+            'score': 80.0,
+        } for assignment in assignments])
+
+        submissions.action_mark_as_scored()
+        self.queue._process_queue()
+
+        digest_template = self.env.ref('solvera_ojt_core.mail_template_ojt_digest')
+        scored_template = self.env.ref('solvera_ojt_core.mail_template_assignment_scored')
+        self.assertFalse(self.queue.search([('template_id', '=', scored_template.id)]),
+                         "Notifikasi nilai tidak boleh dikirim langsung dalam mode digest.")
+        items = self.env['ojt.notification.digest'].search([('participant_id', '=', participant.id)])
+        self.assertEqual(len(items), 2)
+
+        self.env['ojt.notification.digest']._cron_send_digests()
+        jobs = self.queue.search([('template_id', '=', digest_template.id)])
+        self.assertEqual(len(jobs), 1, "Seharusnya hanya ada satu email digest per peserta.")
+        self.assertEqual(set(items.mapped('state')), {'sent'})
+
+        self.queue._process_queue()
+        mail = self.env['mail.mail'].search([], order='id desc', limit=1)
+        self.assertIn('Tugas Digest 0', mail.body_html)
+        self.assertIn('Tugas Digest 1', mail.body_html)
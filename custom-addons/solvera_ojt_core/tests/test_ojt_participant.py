@@ -114,6 +114,7 @@ class TestOjtParticipant(TransactionCase):
 
         # Aksi: Mentor memberikan nilai
         participant.write({'mentor_score': 90.0})
+        self.env['ojt.notification.queue']._process_queue()
 
         # Verifikasi
         final_mail_count = self.env['mail.mail'].search_count([])
@@ -127,7 +128,178 @@ class TestOjtParticipant(TransactionCase):
         # --- Bagian 2: Tes TIDAK ada email saat nilai dikoreksi ---
         # Aksi: Mentor mengoreksi nilai dari 90 menjadi 95
         participant.write({'mentor_score': 95.0})
+        self.env['ojt.notification.queue']._process_queue()
 
         # Verifikasi
         count_after_correction = self.env['mail.mail'].search_count([])
-        self.assertEqual(count_after_correction, final_mail_count, "Seharusnya TIDAK ada email baru yang dibuat saat skor dikoreksi.")
\ No newline at end of file
+        self.assertEqual(count_after_correction, final_mail_count, "Seharusnya TIDAK ada email baru yang dibuat saat skor dikoreksi.")
+    def _score_query_count(self, count):
+        """Buat ``count`` peserta dengan tugas ter-nilai dan hitung query untuk menghitung ulang nilainya."""
+        assignments = self.env['ojt.assignment'].create([{
+            'name': f'Tugas Skala {i}', 'batch_id': self.batch.id, 'max_score': 50.0, 'weight': 1.0 + i,
+        } for i in range(2)])
+        partners = self.env['res.partner'].create([{'name': f'Peserta Skala {count}-{i}'} for i in range(count)])
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id, 'partner_id': partner.id, 'mentor_score': 70.0,
+        } for partner in partners])
+        self.env['ojt.assignment.submit'].create([{
+            'participant_id': participant.id, 'assignment_id': assignment.id, 'score': 40.0, 'state': 'scored',
+        } for participant in participants for assignment in assignments])
+        self.env.flush_all()
+        self.env.invalidate_all()
+
+        participants = self.env['ojt.participant'].browse(participants.ids)
+        for fname in ('score_weighted_sum', 'score_weight_total', 'score_quiz', 'score_avg', 'score_final'):
+            self.env.add_to_compute(participants._fields[fname], participants)
+        query_count = self.env.cr.sql_log_count
+        participants.mapped('score_final')
+        query_count = self.env.cr.sql_log_count - query_count
+
+        for participant in participants:
+            self.assertAlmostEqual(participant.score_avg, 80.0, places=2)
+            self.assertAlmostEqual(participant.score_final, 70.0, places=2)
+        return query_count
+
+    def test_06_compute_scores_query_count_is_flat(self):
+        """Tes: Jumlah query hitung nilai tidak bertambah seiring jumlah peserta."""
+        self.batch.survey_id = self.env['survey.survey'].create({'title': 'Kuis Skala'})
+        small = self._score_query_count(3)
+        large = self._score_query_count(30)
+        self.assertEqual(small, large, "Jumlah query tidak boleh bergantung pada jumlah peserta.")
+
+    def test_07_scores_maintained_by_delta(self):
+        """Tes: Akumulator nilai peserta diperbarui secara delta tanpa hitung ulang penuh, dan
+        rata-rata batch dihitung saat dibaca tanpa menulis baris batch."""
+        assignment = self.env['ojt.assignment'].create({'name': 'Tugas Delta', 'batch_id': self.batch.id, 'max_score': 100.0, 'weight': 1.0})
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Delta {i}'}).id,
+        } for i in range(2)])
+        submissions = self.env['ojt.assignment.submit'].create([{
+            'participant_id': participant.id, 'assignment_id': assignment.id, 'score': 80.0,
+        } for participant in participants])
+        self.env.flush_all()
+
+        Participant = type(self.env['ojt.participant'])
+        Batch = type(self.env['ojt.batch'])
+        with patch.object(Participant, '_get_assignment_score_sums', side_effect=AssertionError("hitung ulang penuh")), \
+                patch.object(Batch, 'write', side_effect=AssertionError("baris batch ditulis")):
+            submissions[0].action_mark_as_scored()
+            self.assertAlmostEqual(participants[0].score_avg, 80.0, places=2)
+            self.assertAlmostEqual(participants[1].score_avg, 0.0, places=2)
+            # (80 * 0.7 + 0) / 2 peserta
+            self.assertAlmostEqual(self.batch.progress_ratio, 28.0, places=2)
+
+            submissions[0].score = 60.0
+            assignment.max_score = 120.0
+            self.assertAlmostEqual(participants[0].score_avg, 50.0, places=2)
+            self.assertAlmostEqual(self.batch.progress_ratio, 17.5, places=2)
+
+            submissions[0].unlink()
+            self.assertAlmostEqual(participants[0].score_avg, 0.0, places=2)
+            self.assertAlmostEqual(self.batch.progress_ratio, 0.0, places=2)
+
+    def test_08_rebuild_scores(self):
+        """Tes: Tombol rebuild memperbaiki akumulator yang tidak sinkron."""
+        assignment = self.env['ojt.assignment'].create({'name': 'Tugas Rebuild', 'batch_id': self.batch.id, 'max_score': 100.0})
+        participant = self.env['ojt.participant'].create({'batch_id': self.batch.id, 'partner_id': self.partner.id})
+        self.env['ojt.assignment.submit'].create({
+            'participant_id': participant.id, 'assignment_id': assignment.id, 'score': 90.0, 'state': 'scored',
+        })
+        participant.write({'score_weighted_sum': 0.0, 'score_weight_total': 0.0})
+        self.assertEqual(participant.score_final, 0.0)
+
+        self.batch.action_rebuild_scores()
+
+        self.assertAlmostEqual(participant.score_avg, 90.0, places=2)
+        self.assertAlmostEqual(participant.score_final, 63.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 63.0, places=2)
+
+    def test_09_quiz_score_follows_survey(self):
+        """Tes: Survei yang diselesaikan setelah pendaftaran memperbarui nilai peserta dan batch."""
+        self.batch.survey_id = self.env['survey.survey'].create({'title': 'Kuis Akhir'})
+        participant = self.env['ojt.participant'].create({'batch_id': self.batch.id, 'partner_id': self.partner.id})
+        self.assertEqual(participant.score_quiz, 0.0)
+
+        user_input = self.env['survey.user_input'].create({
+            'survey_id': self.batch.survey_id.id,
+            'partner_id': self.partner.id,
+            'state': 'in_progress',
+            'scoring_percentage': 80.0,
+        })
+        self.assertEqual(participant.score_quiz, 0.0)
+
+        user_input.write({'state': 'done'})
+        self.assertAlmostEqual(participant.score_quiz, 80.0, places=2)
+        self.assertAlmostEqual(participant.score_final, 8.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 8.0, places=2)
+
+        user_input.unlink()
+        self.assertEqual(participant.score_quiz, 0.0)
+        self.assertAlmostEqual(self.batch.progress_ratio, 0.0, places=2)
+
+    def _attendance_toggle_query_count(self, count):
+        """Buat ``count`` peserta yang hadir di satu sesi, ubah status wajib sesi lain, lalu hitung query."""
+        batch = self.env['ojt.batch'].create({
+            'name': f'Batch Absensi {count}', 'start_date': '2025-11-01', 'end_date': '2025-11-30',
+        })
+        links = self.env['ojt.event.link'].create([{
+            'batch_id': batch.id,
+            'event_id': self.env['event.event'].create({'name': f'Sesi Absensi {count}-{i}'}).id,
+            'is_mandatory': True,
+        } for i in range(2)])
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Absensi {count}-{i}'}).id,
+        } for i in range(count)])
+        self.env['ojt.attendance'].create([{
+            'participant_id': participant.id, 'event_link_id': links[0].id, 'presence': 'present',
+        } for participant in participants])
+        self.assertEqual(set(participants.mapped('attendance_rate')), {50.0})
+        self.env.flush_all()
+
+        links[1].is_mandatory = False
+        query_count = self.env.cr.sql_log_count
+        self.assertEqual(set(participants.mapped('attendance_rate')), {100.0})
+        return self.env.cr.sql_log_count - query_count
+
+    def test_10_attendance_rate_query_count_is_flat(self):
+        """Tes: Mengubah sesi wajib menghitung ulang seluruh peserta batch dengan jumlah query tetap."""
+        self.assertEqual(self._attendance_toggle_query_count(3), self._attendance_toggle_query_count(30),
+                         "Jumlah query tidak boleh bergantung pada jumlah peserta.")
+
+    def test_11_portal_versions(self):
+        """Tes: Versi konten portal berubah saat data peserta atau batch berubah, dalam satu query."""
+        participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id,
+            'partner_id': self.partner.id,
+        })
+        other_batch = self.env['ojt.batch'].create({
+            'name': 'OJT Lain', 'start_date': '2025-11-01', 'end_date': '2025-11-30',
+        })
+        self.env['ojt.participant'].create({'batch_id': other_batch.id, 'partner_id': self.partner.id})
+        assignment = self.env['ojt.assignment'].create({'name': 'Tugas Versi', 'batch_id': self.batch.id})
+        Participant = self.env['ojt.participant']
+
+        self.env.flush_all()
+        query_count = self.env.cr.sql_log_count
+        versions = Participant._get_portal_versions(self.partner.id)
+        self.assertEqual(self.env.cr.sql_log_count - query_count, 1)
+        self.assertEqual(len(versions), 2)
+
+        scoped = Participant._get_portal_versions(self.partner.id, 'ojt.assignment', assignment.id)
+        self.assertEqual(scoped, {participant.id: versions[participant.id]})
+
+        submission = self.env['ojt.assignment.submit'].create({
+            'assignment_id': assignment.id,
+            'participant_id': participant.id,
+        })
+        after_submit = Participant._get_portal_versions(self.partner.id)
+        self.assertNotEqual(after_submit[participant.id], versions[participant.id])
+        self.assertEqual(len({version for _batch_id, version in after_submit.values()}), 2)
+
+        submission.unlink()
+        self.assertNotEqual(Participant._get_portal_versions(self.partner.id)[participant.id],
+                            after_submit[participant.id])
+        participant.state = 'left'
+        self.assertNotIn(participant.id, Participant._get_portal_versions(self.partner.id))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestOjtParticipantDashboard(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtParticipantDashboard, self).setUp()
+        self.survey = self.env['survey.survey'].create({'title': 'Survei Dashboard'})
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Dashboard',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+            'survey_id': self.survey.id,
+        })
+        self.participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Dashboard {i}'}).id,
+        } for i in range(2)])
+        self.participant = self.participants[0]
+        self.assignments = self.env['ojt.assignment'].create([{
+            'name': f'Tugas Dashboard {i}',
+            'batch_id': self.batch.id,
+            'state': 'open',
+        } for i in range(3)])
+        self.events = self.env['event.event'].create([{
+            'name': f'Sesi Dashboard {i}',
+            'date_begin': f'2025-11-{10 - i:02d} 09:00:00',
+            'date_end': f'2025-11-{10 - i:02d} 12:00:00',
+        } for i in range(2)])
+        self.links = self.env['ojt.event.link'].create([{
+            'batch_id': self.batch.id,
+            'event_id': event.id,
+        } for event in self.events])
+        self.Dashboard = self.env['ojt.participant.dashboard']
+
+    def test_01_snapshot_values(self):
+        """Tes: Snapshot berisi tugas terbit, status submit, agenda terurut dan survei."""
+        self.env['ojt.assignment'].create({'name': 'Tugas Draft', 'batch_id': self.batch.id})
+        self.env['ojt.assignment.submit'].create({
+            'assignment_id': self.assignments[1].id,
+            'participant_id': self.participant.id,
+        })
+        dashboard = self.Dashboard._get_snapshot(self.participant)
+        self.assertEqual(dashboard.assignment_ids, self.assignments.ids)
+        self.assertEqual(dashboard.submitted_assignment_ids, [self.assignments[1].id])
+        self.assertEqual((dashboard.assignment_completed_count, dashboard.assignment_total_count), (1, 3))
+        self.assertEqual(dashboard.agenda_ids, self.links.sorted(lambda l: l.event_id.date_begin).ids)
+        self.assertFalse(dashboard.survey_done)
+        self.assertFalse(dashboard.certificate_id)
+        self.assertEqual(self.Dashboard._get_snapshot(self.participant), dashboard)
+
+    def test_02_incremental_updates(self):
+        """Tes: Hook model terkait memperbarui snapshot tanpa membangunnya ulang."""
+        dashboard, other = (self.Dashboard._get_snapshot(participant) for participant in self.participants)
+
+        submission = self.env['ojt.assignment.submit'].create({
+            'assignment_id': self.assignments[0].id,
+            'participant_id': self.participant.id,
+        })
+        self.assertEqual(dashboard.submitted_assignment_ids, [self.assignments[0].id])
+        self.assertEqual(other.submitted_assignment_ids, [])
+        submission.unlink()
+        self.assertEqual(dashboard.submitted_assignment_ids, [])
+
+        self.assignments[2].action_reset_to_draft()
+        self.assertEqual(dashboard.assignment_ids, self.assignments[:2].ids)
+        self.assertEqual(other.assignment_ids, self.assignments[:2].ids)
+
+        self.events[0].write({'date_begin': '2025-11-01 09:00:00', 'date_end': '2025-11-01 12:00:00'})
+        self.assertEqual(dashboard.agenda_ids, self.links.ids)
+
+        certificate = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat Dashboard',
+            'batch_id': self.batch.id,
+            'participant_id': self.participant.id,
+        })
+        self.assertFalse(dashboard.certificate_id)
+        certificate.action_issue()
+        self.assertEqual(dashboard.certificate_id, certificate)
+        self.assertFalse(other.certificate_id)
+
+        user_input = self.env['survey.user_input'].create({
+            'survey_id': self.survey.id,
+            'partner_id': self.participant.partner_id.id,
+        })
+        self.assertFalse(dashboard.survey_done)
+        user_input.write({'state': 'done'})
+        self.assertTrue(dashboard.survey_done)
+        self.assertFalse(other.survey_done)
+
+    def test_03_constant_queries(self):
+        """Tes: Membaca snapshot tidak bergantung pada jumlah submission batch."""
+        def count_queries():
+            self.Dashboard._get_snapshot(self.participant)
+            self.env.invalidate_all()
+            query_count = self.env.cr.sql_log_count
+            dashboard = self.Dashboard._get_snapshot(self.participant)
+            (dashboard.assignment_completed_count, dashboard.survey_done, dashboard.certificate_id.id)
+            self.env['ojt.assignment'].browse(dashboard.assignment_ids).mapped('name')
+            return self.env.cr.sql_log_count - query_count
+
+        small = count_queries()
+        self.env['ojt.assignment.submit'].create([{
+            'assignment_id': assignment.id,
+            'participant_id': participant.id,
+        } for assignment in self.assignments for participant in self.participants])
+        self.env['ojt.assignment'].create([{
+            'name': f'Tugas Tambahan {i}',
+            'batch_id': self.batch.id,
+            'state': 'open',
+        } for i in range(10)])
+        self.env.flush_all()
+        self.assertEqual(count_queries(), small)
+
+    def test_04_read_and_refresh_without_writes(self):
+        """Tes: Dashboard tanpa snapshot tidak ditulis saat dibaca; refresh tanpa perubahan tidak menulis."""
+        dashboard = self.Dashboard.search([('participant_id', '=', self.participant.id)])
+        self.assertTrue(dashboard, "Snapshot dibuat bersama peserta.")
+        with patch.object(type(self.Dashboard), 'write', side_effect=AssertionError("snapshot ditulis ulang")):
+            self.Dashboard._refresh(self.participants)
+            self.Dashboard._refresh_batches(self.batch)
+
+        dashboard.unlink()
+        snapshot = self.Dashboard._get_snapshot(self.participant)
+        self.assertFalse(snapshot.id)
+        self.assertEqual(snapshot.assignment_ids, self.assignments.ids)
+        self.assertFalse(self.Dashboard.search_count([('participant_id', '=', self.participant.id)]))
+
+        self.Dashboard._create_missing_snapshots()
+        self.assertEqual(self.Dashboard.search([('participant_id', '=', self.participant.id)]).assignment_ids,
+                         self.assignments.ids)
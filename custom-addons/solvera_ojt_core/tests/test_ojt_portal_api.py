@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestOjtPortalApi(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtPortalApi, self).setUp()
+        self.partner = self.env['res.partner'].create({'name': 'Peserta API'})
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch API', 'start_date': '2025-11-01', 'end_date': '2025-11-30',
+        })
+        self.participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id, 'partner_id': self.partner.id,
+        })
+        other_batch = self.env['ojt.batch'].create({
+            'name': 'Batch API Lain', 'start_date': '2025-11-01', 'end_date': '2025-11-30',
+        })
+        self.env['ojt.assignment'].create({'name': 'Tugas Batch Lain', 'batch_id': other_batch.id, 'state': 'open'})
+        self.Api = self.env['ojt.portal.api']
+
+    def _create_assignments(self, count):
+        return self.env['ojt.assignment'].create([{
+            'name': f'Tugas API {i}',
+            'batch_id': self.batch.id,
+            'state': 'open',
+        } for i in range(count)])
+
+    def test_01_keyset_pagination(self):
+        """Tes: Cursor melanjutkan halaman tanpa duplikat atau record yang terlewat."""
+        assignments = self._create_assignments(5)
+        self.env['ojt.assignment'].create({'name': 'Tugas Draft', 'batch_id': self.batch.id})
+        seen, cursor = [], None
+        while True:
+            page = self.Api._fetch(self.partner.id, 'assignments', cursor=cursor, limit=2)
+            seen += [row['id'] for row in page['data']]
+            if not page['has_more']:
+                self.assertIsNone(page['next_cursor'])
+                break
+            cursor = page['next_cursor']
+        self.assertEqual(seen, assignments.ids)
+
+    def test_02_sparse_fields(self):
+        """Tes: Hanya field yang diminta dikembalikan; field di luar daftar ditolak."""
+        self._create_assignments(1)
+        row = self.Api._fetch(self.partner.id, 'assignments', field_names=['name', 'batch_id'])['data'][0]
+        self.assertEqual(set(row), {'id', 'write_date', 'name', 'batch_id'})
+        self.assertEqual(row['batch_id'], self.batch.id)
+        with self.assertRaises(ValueError):
+            self.Api._fetch(self.partner.id, 'assignments', field_names=['submit_ids'])
+        with self.assertRaises(ValueError):
+            self.Api._fetch(self.partner.id, 'assignments', cursor='bukan-cursor')
+
+    def test_03_updated_since(self):
+        """Tes: updated_since hanya mengembalikan record yang ditulis setelahnya."""
+        self._create_assignments(2)
+        self.env.flush_all()
+        past = (fields.Datetime.now() - timedelta(hours=1)).isoformat()
+        future = (fields.Datetime.now() + timedelta(hours=1)).isoformat()
+        self.assertEqual(len(self.Api._fetch(self.partner.id, 'assignments', updated_since=past)['data']), 2)
+        self.assertEqual(self.Api._fetch(self.partner.id, 'assignments', updated_since=future)['data'], [])
+
+    def test_04_query_budget(self):
+        """Tes: Jumlah query tidak bergantung pada jumlah record."""
+        def count_queries(resource, limit):
+            self.env.flush_all()
+            self.env.invalidate_all()
+            query_count = self.env.cr.sql_log_count
+            page = self.Api._fetch(self.partner.id, resource, limit=limit)
+            return self.env.cr.sql_log_count - query_count, len(page['data'])
+
+        self._create_assignments(2)
+        events = self.env['event.event'].create([{'name': f'Sesi API {i}'} for i in range(2)])
+        self.env['ojt.event.link'].create([{'batch_id': self.batch.id, 'event_id': event.id} for event in events])
+        small = count_queries('assignments', 100), count_queries('agenda', 100)
+
+        self._create_assignments(30)
+        events = self.env['event.event'].create([{'name': f'Sesi API Besar {i}'} for i in range(30)])
+        self.env['ojt.event.link'].create([{'batch_id': self.batch.id, 'event_id': event.id} for event in events])
+        large = count_queries('assignments', 100), count_queries('agenda', 100)
+
+        self.assertEqual([queries for queries, _rows in small], [queries for queries, _rows in large])
+        self.assertEqual([rows for _queries, rows in large], [32, 32])
+
+    def test_05_portal_counters(self):
+        """Tes: Counter beranda portal dihitung dalam satu query."""
+        self._create_assignments(3)
+        self.env['ojt.assignment'].create({'name': 'Tugas Draft', 'batch_id': self.batch.id})
+        event = self.env['event.event'].create({'name': 'Sesi Counter'})
+        self.env['ojt.event.link'].create({'batch_id': self.batch.id, 'event_id': event.id})
+        self.env.flush_all()
+        query_count = self.env.cr.sql_log_count
+        counters = self.Api._get_counters(self.partner.id)
+        self.assertEqual(self.env.cr.sql_log_count - query_count, 1)
+        self.assertEqual(counters, {
+            'ojt_certificate_count': 0,
+            'ojt_assignment_count': 3,
+            'ojt_agenda_count': 1,
+            'ojt_attendance_count': 0,
+        })
+
+    def test_06_reverse_filtered_page(self):
+        """Tes: Halaman terbaru-dulu dengan filter tugas yang belum dikumpulkan."""
+        assignments = self._create_assignments(5)
+        self.env['ojt.assignment.submit'].create({
+            'assignment_id': assignments[0].id, 'participant_id': self.participant.id,
+        })
+        pending = [('submit_ids', 'not any', [('participant_id', '=', self.participant.id)])]
+        seen, cursor = [], None
+        while True:
+            records, cursor = self.Api._search_page(
+                self.partner.id, 'assignments', cursor=cursor, limit=2, domain=pending, reverse=True)
+            seen += records.ids
+            if not cursor:
+                break
+        self.assertEqual(seen, list(reversed(assignments[1:].ids)))
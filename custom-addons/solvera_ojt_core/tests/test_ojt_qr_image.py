@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+RENDER_PATH = 'odoo.addons.solvera_ojt_core.models.ojt_qr_image.render_qr_png'
+
+
+class TestOjtQrImage(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtQrImage, self).setUp()
+        self.render = self.startPatcher(patch(RENDER_PATH, return_value=b'png'))
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch QR',
+            'start_date': datetime.now(),
+            'end_date': datetime.now() + timedelta(days=30),
+        })
+        self.event_link = self.env['ojt.event.link'].create({
+            'batch_id': self.batch.id,
+            'event_id': self.env['event.event'].create({
+                'name': 'Sesi QR',
+                'date_begin': datetime.now(),
+                'date_end': datetime.now() + timedelta(hours=2),
+            }).id,
+        })
+
+    def test_01_images_are_cached_by_payload(self):
+        """Tes: Gambar QR disimpan saat sesi dibuat lalu dipakai ulang tanpa dirender lagi."""
+        self.assertEqual(self.render.call_count, 1)
+        url = self.event_link.qr_code_url
+        self.assertTrue(url.startswith('/ojt/qr/') and url.endswith('.png'))
+
+        self.event_link.invalidate_recordset(['qr_code_image', 'qr_code_url'])
+        self.assertEqual(self.event_link.qr_code_url, url)
+        self.assertEqual(self.render.call_count, 1, "Gambar yang sudah ada tidak boleh dibuat ulang.")
+
+    def test_02_token_change_drops_old_image(self):
+        """Tes: Mengganti token menghapus gambar lama dan menyimpan gambar untuk URL baru."""
+        QrImage = self.env['ojt.qr.image']
+        old_url = self.event_link.qr_code_url
+        old_key = old_url.split('/')[-1][:-len('.png')]
+        self.event_link.access_token = 'token-qr-baru'
+        new_url = self.event_link.qr_code_url
+
+        self.assertTrue(new_url)
+        self.assertNotEqual(new_url, old_url)
+        self.assertFalse(QrImage.search([('key', '=', old_key)]))
+
+    def test_03_certificates_share_one_lookup(self):
+        """Tes: QR banyak sertifikat disimpan saat dibuat dan berbeda per token."""
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta QR {i}'}).id,
+        } for i in range(3)])
+        self.render.reset_mock()
+        certificates = self.env['ojt.certificate'].create([{
+            'name': 'Sertifikat QR',
+            'batch_id': self.batch.id,
+            'participant_id': participant.id,
+        } for participant in participants])
+        self.assertEqual(self.render.call_count, 3)
+
+        urls = certificates.mapped('qr_code_url')
+        self.assertEqual(self.render.call_count, 3, "Membaca QR tidak boleh merender ulang.")
+        self.assertTrue(all(urls))
+        self.assertEqual(len(set(urls)), 3)
+
+    def test_04_stale_base_url_is_collected(self):
+        """Tes: Autovacuum menghapus gambar untuk base URL yang sudah tidak dipakai."""
+        QrImage = self.env['ojt.qr.image']
+        QrImage._ensure_images(['http://old.example.com/ojt/attend/abc'])
+        QrImage._gc_stale_images()
+        self.assertFalse(QrImage.search([('payload', '=like', 'http://old.example.com/%')]))
+        self.assertTrue(QrImage.search([('payload', 'like', self.event_link.access_token)]))
+
+    def test_05_concurrent_insert_conflict(self):
+        """Tes: Konflik kunci hanya melewati baris yang bentrok; baris lain tetap disimpan."""
+        QrImage = self.env['ojt.qr.image']
+        existing_payload = 'https://ojt.example.com/ojt/attend/bentrok'
+        new_payload = 'https://ojt.example.com/ojt/attend/baru'
+        QrImage._ensure_images([existing_payload])
+        # transaksi lain sudah menyisipkan baris yang belum terlihat oleh pencarian kita
+        with patch.object(type(QrImage), 'search', return_value=QrImage.browse()):
+            QrImage._ensure_images([existing_payload, new_payload])
+
+        self.assertEqual(QrImage.search_count([('payload', '=', existing_payload)]), 1)
+        self.assertEqual(QrImage.search_count([('payload', '=', new_payload)]), 1)
+
+    def test_06_compute_does_not_write(self):
+        """Tes: Compute QR hanya membaca; gambar yang belum disimpan dirender langsung."""
+        QrImage = self.env['ojt.qr.image']
+        QrImage.search([]).unlink()
+        self.event_link.invalidate_recordset(['qr_code_image', 'qr_code_url'])
+
+        with patch.object(type(QrImage), '_ensure_images', side_effect=AssertionError("compute menulis gambar QR")):
+            self.assertTrue(self.event_link.qr_code_image)
+            self.assertFalse(self.event_link.qr_code_url)
+        self.assertFalse(QrImage.search_count([]))
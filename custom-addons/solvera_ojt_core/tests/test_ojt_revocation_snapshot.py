@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import base64
+
+from odoo.tests.common import TransactionCase
+from odoo.addons.solvera_ojt_core.models.ojt_revocation_snapshot import (
+    bloom_build, bloom_contains, bloom_parameters,
+)
+
+
+class TestOjtRevocationSnapshot(TransactionCase):
+
+    def setUp(self):
+        super(TestOjtRevocationSnapshot, self).setUp()
+        batch = self.env['ojt.batch'].create({
+            'name': 'Batch Pencabutan',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+        })
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': batch.id,
+            'partner_id': self.env['res.partner'].create({'name': f'Peserta Pencabutan {i}'}).id,
+        } for i in range(3)])
+        self.certificates = self.env['ojt.certificate'].create([{
+            'name': 'Sertifikat Pencabutan',
+            'batch_id': batch.id,
+            'participant_id': participant.id,
+        } for participant in participants])
+        self.certificates.action_issue()
+        self.Snapshot = self.env['ojt.revocation.snapshot']
+
+    def test_01_bloom_filter(self):
+        """Tes: Bloom filter memuat semua item dan jarang memberi positif palsu."""
+        items = [f'OJTCERT/2025/{i:06d}' for i in range(500)]
+        bits, hashes = bloom_parameters(len(items))
+        array = bloom_build(items, bits, hashes)
+        self.assertTrue(all(bloom_contains(array, bits, hashes, item) for item in items))
+        false_positives = sum(bloom_contains(array, bits, hashes, f'OJTCERT/2026/{i:06d}') for i in range(2000))
+        self.assertLess(false_positives, 20)
+
+    def test_02_snapshot_versions_and_delta(self):
+        """Tes: Versi baru hanya dibuat saat daftar berubah, dan delta antarversi benar."""
+        base = self.Snapshot._rebuild()
+        self.assertEqual(self.Snapshot._rebuild(), base, "Tanpa perubahan tidak ada versi baru.")
+
+        self.certificates[:2].action_revoke()
+        revoked = self.Snapshot._rebuild()
+        self.assertEqual(revoked.version, base.version + 1)
+        self.assertEqual(revoked._get_serials(), sorted(self.certificates[:2].mapped('serial')))
+        bloom = base64.b64decode(revoked.bloom_filter)
+        for serial in self.certificates[:2].mapped('serial'):
+            self.assertTrue(bloom_contains(bloom, revoked.bloom_bits, revoked.bloom_hashes, serial))
+
+        self.certificates[0].action_issue()
+        latest = self.Snapshot._rebuild()
+        self.assertEqual(latest._get_delta(base.version), ([self.certificates[1].serial], []))
+        self.assertEqual(latest._get_delta(revoked.version), ([], [self.certificates[0].serial]))
+        self.assertIsNone(latest._get_delta(base.version - 100))
+
+    def test_03_latest_does_not_build(self):
+        """Tes: Tanpa snapshot, ``_get_latest`` hanya membaca: tidak membuat versi atau trigger cron."""
+        self.Snapshot.search([]).unlink()
+        cron = self.env.ref('solvera_ojt_core.ir_cron_ojt_revocation_snapshot')
+        triggers = self.env['ir.cron.trigger'].search_count([('cron_id', '=', cron.id)])
+
+        self.assertFalse(self.Snapshot._get_latest())
+        self.assertEqual(self.Snapshot.search_count([]), 0)
+        self.assertEqual(self.env['ir.cron.trigger'].search_count([('cron_id', '=', cron.id)]), triggers)
+
+        self.Snapshot._cron_rebuild()
+        self.assertEqual(self.Snapshot._get_latest().version, 1)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class OjtScoringPolicyCase(TransactionCase):
+
+    def setUp(self):
+        super(OjtScoringPolicyCase, self).setUp()
+        self.policy = self.env['ojt.scoring.policy'].create({
+            'name': 'Kebijakan Tes',
+            'weight_assignment': 0.5,
+            'weight_mentor': 0.5,
+            'weight_quiz': 0.0,
+            'grade_a_min': 90.0,
+            'grade_b_min': 60.0,
+        })
+        self.batch = self.env['ojt.batch'].create({
+            'name': 'Batch Kebijakan',
+            'start_date': '2025-11-01',
+            'end_date': '2025-11-30',
+            'scoring_policy_id': self.policy.id,
+        })
+
+
+class TestOjtScoringPolicy(OjtScoringPolicyCase):
+
+    def test_01_policy_weights_and_recompute(self):
+        """Tes: Nilai akhir mengikuti bobot kebijakan dan dihitung ulang saat kebijakan diubah."""
+        assignment = self.env['ojt.assignment'].create({'name': 'Tugas Kebijakan', 'batch_id': self.batch.id})
+        participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': 'Peserta Kebijakan'}).id,
+            'mentor_score': 60.0,
+        })
+        self.env['ojt.assignment.submit'].create({
+            'participant_id': participant.id, 'assignment_id': assignment.id, 'score': 80.0, 'state': 'scored',
+        })
+        self.assertAlmostEqual(participant.score_final, 70.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 70.0, places=2)
+
+        version = self.policy.version
+        self.policy.write({'weight_assignment': 1.0, 'weight_mentor': 0.0})
+        self.assertEqual(self.policy.version, version + 1)
+        self.assertAlmostEqual(participant.score_final, 80.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 80.0, places=2)
+
+        self.batch.scoring_policy_id = False
+        # tanpa kebijakan: 80 * 0.7 + 60 * 0.2
+        self.assertAlmostEqual(participant.score_final, 68.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 68.0, places=2)
+
+    def test_02_drop_lowest_assignment(self):
+        """Tes: Nilai tugas terendah diabaikan jika kebijakan mengaktifkan drop lowest."""
+        assignments = self.env['ojt.assignment'].create([{
+            'name': f'Tugas Drop {i}', 'batch_id': self.batch.id,
+        } for i in range(3)])
+        participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': 'Peserta Drop'}).id,
+        })
+        submissions = self.env['ojt.assignment.submit'].create([{
+            'participant_id': participant.id, 'assignment_id': assignment.id, 'score': score, 'state': 'scored',
+        } for assignment, score in zip(assignments[:2], (90.0, 40.0))])
+        self.assertAlmostEqual(participant.score_avg, 65.0, places=2)
+
+        self.policy.drop_lowest = True
+        self.assertAlmostEqual(participant.score_avg, 90.0, places=2)
+        self.assertAlmostEqual(participant.score_final, 45.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 45.0, places=2)
+
+        # submission baru menjadi nilai terendah, nilai 40 kembali dihitung
+        self.env['ojt.assignment.submit'].create({
+            'participant_id': participant.id, 'assignment_id': assignments[2].id, 'score': 10.0, 'state': 'scored',
+        })
+        self.assertAlmostEqual(participant.score_avg, 65.0, places=2)
+
+        submissions[0].unlink()
+        self.assertAlmostEqual(participant.score_avg, 40.0, places=2)
+        self.assertAlmostEqual(self.batch.progress_ratio, 20.0, places=2)
+
+        self.policy.drop_lowest = False
+        self.assertAlmostEqual(participant.score_avg, 25.0, places=2)
+
+    def test_03_certificate_grade_bands(self):
+        """Tes: Grade sertifikat memakai batas nilai dari kebijakan batch."""
+        participant = self.env['ojt.participant'].create({
+            'batch_id': self.batch.id,
+            'partner_id': self.env['res.partner'].create({'name': 'Peserta Grade'}).id,
+            'mentor_score': 140.0,
+        })
+        certificate = self.env['ojt.certificate'].create({
+            'name': 'Sertifikat Grade',
+            'batch_id': self.batch.id,
+            'participant_id': participant.id,
+        })
+        # 140 * 0.5 = 70: grade B pada kebijakan ini, grade C pada bobot standar
+        self.assertEqual(certificate.grade, 'B')
+
+    def test_04_evaluator_cached_per_version(self):
+        """Tes: Evaluator dikompilasi sekali per versi kebijakan."""
+        evaluator = self.policy._get_evaluator()
+        self.assertIs(self.policy._get_evaluator(), evaluator)
+
+        registry_class = type(self.env.registry)
+        with patch.object(registry_class, 'clear_cache', side_effect=AssertionError("cache registry dikosongkan")):
+            self.policy.weight_quiz = 0.2
+        new_evaluator = self.policy._get_evaluator()
+        self.assertIsNot(new_evaluator, evaluator)
+        self.assertEqual(new_evaluator.weight_quiz, 0.2)
+        self.assertEqual(new_evaluator.evaluate([(100.0, 50.0, 10.0)]), [77.0])
+
+    def test_05_invalid_grade_bands(self):
+        """Tes: Batas nilai A tidak boleh di bawah batas nilai B."""
+        with self.assertRaises(ValidationError):
+            self.policy.grade_a_min = 50.0
+
+
+@tagged('-standard', 'ojt_perf')
+class TestOjtScoringPolicyBenchmark(OjtScoringPolicyCase):
+    """Benchmark hitung ulang batch besar setelah kebijakan diubah.
+
+    Jalankan dengan ``--test-tags ojt_perf``.
+    """
+
+    def test_policy_change_recompute(self):
+        assignments = self.env['ojt.assignment'].create([{
+            'name': f'Tugas Benchmark {i}', 'batch_id': self.batch.id,
+        } for i in range(5)])
+        partners = self.env['res.partner'].create([{'name': f'Peserta Benchmark {i}'} for i in range(2000)])
+        participants = self.env['ojt.participant'].create([{
+            'batch_id': self.batch.id, 'partner_id': partner.id, 'mentor_score': 50.0 + i % 50,
+        } for i, partner in enumerate(partners)])
+        self.env['ojt.assignment.submit'].create([{
+            'participant_id': participant.id, 'assignment_id': assignment.id,
+            'score': float((participant.id + assignment.id) % 100), 'state': 'scored',
+        } for participant in participants for assignment in assignments])
+        self.env.flush_all()
+
+        start = time.perf_counter()
+        self.policy.write({'weight_assignment': 0.6, 'weight_mentor': 0.3, 'weight_quiz': 0.1})
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+
+        _logger.info("OJT scoring policy change, %s participants: %.3fs", len(participants), elapsed)
+        self.assertLess(elapsed, 1.0)
@@ -1,5 +1,4 @@
-import uuid
-from odoo import models, fields, api
+from odoo import models, fields, api, Command
 
 class GenerateCertificatesWizard(models.TransientModel):
     _name = 'ojt.generate.certificates.wizard'
@@ -38,35 +37,20 @@ class GenerateCertificatesWizard(models.TransientModel):
                 wizard.participant_count = 0
 
     def action_generate_certificates(self):
+        """Serahkan pembuatan sertifikat ke pekerjaan latar belakang dan tampilkan progresnya."""
         self.ensure_one()
-
-        template = self.env.ref('solvera_ojt_core.mail_template_certificate_issued', raise_if_not_found=False)
-        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-        
-        for participant in self.eligible_participant_ids:
-            access_token = str(uuid.uuid4())
-            existing_certificate = self.env['ojt.certificate'].search([
-                ('participant_id', '=', participant.id)
-            ])
-            
-            if existing_certificate and not self.overwrite_existing:
-                continue
-
-            if existing_certificate and self.overwrite_existing:
-                existing_certificate.unlink()
-
-            new_certificate = self.env['ojt.certificate'].create({
-                'name': f"Certificate for {participant.name}",
-                'participant_id': participant.id,
-                'batch_id': self.batch_id.id,
-                'state': 'issued',
-                'access_token': access_token
-            })
-
-            if template and new_certificate:
-                new_certificate.action_issue()
-                download_url = f"{base_url}/my/certificate/download/{new_certificate.id}?access_token={access_token}"
-                tmp_ctx = {'url_certificate_download': download_url}
-                template.with_context(tmp_ctx).send_mail(new_certificate.id, force_send=True)
-        
-        return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
+        job = self.env['ojt.certificate.job'].create({
+            'batch_id': self.batch_id.id,
+            'job_type': 'generate',
+            'participant_ids': [Command.set(self.eligible_participant_ids.ids)],
+            'overwrite_existing': self.overwrite_existing,
+            'total_count': len(self.eligible_participant_ids),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Certificate Generation',
+            'res_model': 'ojt.certificate.job',
+            'res_id': job.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
@@ -14,6 +14,7 @@ class HrApplicantEnroll(models.TransientModel):
         participant_obj = self.env['ojt.participant']
         ojt_stage = self.env['hr.recruitment.stage'].search([('name', '=ilike', 'OJT')], limit=1)
         template = self.env.ref('solvera_ojt_core.mail_template_ojt_portal_invitation', raise_if_not_found=False)
+        messages = []
 
         for applicant in self.applicant_ids:
             partner = applicant.partner_id
@@ -38,8 +39,9 @@ class HrApplicantEnroll(models.TransientModel):
                 })
 
                 if template and new_participant:
-                    template.send_mail(new_participant.id, force_send=True)
+                    messages.append({'res_id': new_participant.id})
 
+        self.env['ojt.notification.queue']._enqueue(template, messages)
         if ojt_stage:
             self.applicant_ids.with_context(enroll_from_wizard=True).write({'stage_id': ojt_stage.id})
         